@@ -9,17 +9,49 @@ from models.schemas import (
     ImpactAssessment,
     DecisionResponse
 )
-from services.analysis_service import AnalysisService
-from services.repository_service import RepositoryService
+from chains.llm_cache import bypass_llm_cache
+from embeddings.vector_store import hnsw_ef_search
+from loaders.dependency_graph import get_dependency_index
+from loaders.endpoint_catalogue import get_endpoint_index
+from utils.config import get_settings
 from utils.logger import get_logger
+from utils.metrics import request_timings
 from pydantic import ValidationError
 
 logger = get_logger()
 bp = Blueprint("api", __name__, url_prefix="/api/v1")
 
-# Initialize services
-analysis_service = AnalysisService()
-repository_service = RepositoryService()
+# Services are created on first request so importing the blueprint (worker boot) stays cheap
+_analysis_service = None
+_repository_service = None
+_upload_service = None
+
+
+def get_analysis_service():
+    """Get the analysis service (created on first use)"""
+    global _analysis_service
+    if _analysis_service is None:
+        from services.analysis_service import AnalysisService
+        _analysis_service = AnalysisService()
+    return _analysis_service
+
+
+def get_repository_service():
+    """Get the repository service (created on first use)"""
+    global _repository_service
+    if _repository_service is None:
+        from services.repository_service import RepositoryService
+        _repository_service = RepositoryService()
+    return _repository_service
+
+
+def get_upload_service():
+    """Get the upload service (created on first use)"""
+    global _upload_service
+    if _upload_service is None:
+        from services.upload_service import UploadService
+        _upload_service = UploadService()
+    return _upload_service
 
 
 def validate_request(schema_class, data):
@@ -30,6 +62,43 @@ def validate_request(schema_class, data):
         raise ValueError(f"Validation error: {e.json()}")
 
 
+def wants_timings() -> bool:
+    """Whether the caller asked for a per-request timing breakdown (?timings=true or X-Include-Timings)"""
+    flag = request.args.get("timings") or request.headers.get("X-Include-Timings") or ""
+    return flag.lower() in ("1", "true", "yes")
+
+
+def wants_cache_bypass() -> bool:
+    """Whether the caller asked to skip cached LLM responses (?bypass_cache=true or X-Bypass-Cache)"""
+    flag = request.args.get("bypass_cache") or request.headers.get("X-Bypass-Cache") or ""
+    return flag.lower() in ("1", "true", "yes")
+
+
+def requested_ef_search() -> Optional[int]:
+    """Per-request hnsw.ef_search override (?ef_search=N or X-HNSW-EF-Search)"""
+    value = request.args.get("ef_search") or request.headers.get("X-HNSW-EF-Search")
+    if not value:
+        return None
+    try:
+        ef_search = int(value)
+    except ValueError:
+        raise ValueError(f"ef_search must be an integer, got '{value}'")
+    if not 1 <= ef_search <= 1000:
+        raise ValueError("ef_search must be between 1 and 1000")
+    return ef_search
+
+
+def run_timed(handler, request_obj) -> dict:
+    """Run a service call and optionally attach its stage timings under metadata.timings"""
+    with bypass_llm_cache(wants_cache_bypass()), hnsw_ef_search(requested_ef_search()), \
+            request_timings() as timings:
+        response = handler(request_obj)
+    payload = response.model_dump()
+    if wants_timings():
+        payload.setdefault("metadata", {})["timings"] = timings
+    return payload
+
+
 @bp.route("/question", methods=["POST"])
 def ask_question():
     """Answer architecture or framework questions about the repository"""
@@ -39,8 +108,7 @@ def ask_question():
             return jsonify({"error": "Request body is required"}), 400
         
         request_obj = validate_request(QuestionRequest, data)
-        response = analysis_service.answer_question(request_obj)
-        return jsonify(response.model_dump()), 200
+        return jsonify(run_timed(get_analysis_service().answer_question, request_obj)), 200
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         return jsonify({"error": str(e)}), 400
@@ -58,8 +126,7 @@ def validate_change():
             return jsonify({"error": "Request body is required"}), 400
         
         request_obj = validate_request(ChangeRequest, data)
-        response = analysis_service.validate_change(request_obj)
-        return jsonify(response.model_dump()), 200
+        return jsonify(run_timed(get_analysis_service().validate_change, request_obj)), 200
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         return jsonify({"error": str(e)}), 400
@@ -77,8 +144,7 @@ def analyze_impact():
             return jsonify({"error": "Request body is required"}), 400
         
         request_obj = validate_request(ChangeRequest, data)
-        response = analysis_service.analyze_impact(request_obj)
-        return jsonify(response.model_dump()), 200
+        return jsonify(run_timed(get_analysis_service().analyze_impact, request_obj)), 200
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         return jsonify({"error": str(e)}), 400
@@ -96,8 +162,7 @@ def full_analysis():
             return jsonify({"error": "Request body is required"}), 400
         
         request_obj = validate_request(ChangeRequest, data)
-        response = analysis_service.full_analysis(request_obj)
-        return jsonify(response.model_dump()), 200
+        return jsonify(run_timed(get_analysis_service().full_analysis, request_obj)), 200
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         return jsonify({"error": str(e)}), 400
@@ -136,7 +201,7 @@ def index_repository():
                 }), 400
         
         try:
-            success = repository_service.index_repository(repository_path, cleanup=cleanup)
+            success = get_repository_service().index_repository(repository_path, cleanup=cleanup)
             
             if success:
                 source_type = "GitHub URL" if "github.com" in repository_path.lower() else (
@@ -167,48 +232,140 @@ def index_repository():
 @bp.route("/index/file", methods=["POST"])
 def index_file():
     """
-    Index a single file (e.g., PDF)
+    Index uploaded files (e.g., PDFs)
     
-    Accepts multipart/form-data with 'file' field
+    Accepts multipart/form-data with one or more 'file' fields. Each file is streamed to
+    disk while its SHA-256 is computed; content that is already live in the index is not
+    re-indexed. Other files are indexed in the background: the response is 202 with a job
+    per file (poll /index/jobs/<job_id>), or pass ?wait=true to block until they finish.
     """
+    from services.upload_service import UploadTooLarge
+    from werkzeug.exceptions import RequestEntityTooLarge
+    
     try:
-        if 'file' not in request.files:
+        settings = get_settings()
+        files = [f for f in request.files.getlist('file') if f.filename]
+        if not files:
             return jsonify({"error": "No file provided"}), 400
+        if len(files) > settings.upload_max_files:
+            return jsonify({"error": f"At most {settings.upload_max_files} files per request"}), 400
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({"error": "No file selected"}), 400
-        
-        # Save uploaded file temporarily
-        import tempfile
-        import os
-        temp_dir = tempfile.mkdtemp(prefix="uploaded_file_")
-        file_path = os.path.join(temp_dir, file.filename)
-        file.save(file_path)
+        service = get_upload_service()
+        wait = request.args.get("wait", "false").lower() == "true"
+        results, jobs = [], {}
+        for file in files:
+            try:
+                upload = service.save(file.stream, file.filename)
+            except UploadTooLarge as e:
+                return jsonify({"error": str(e), "results": results}), 413
+            
+            record = service.find_indexed(upload.sha256)
+            if record is not None:
+                service.discard(upload)
+                logger.info(f"Skipping upload {upload.filename}: content already indexed as {record.get('repository')}")
+                results.append({
+                    "filename": upload.filename,
+                    "sha256": upload.sha256,
+                    "status": "already_indexed",
+                    "repository": record.get("repository"),
+                    "index_version": record.get("index_version")
+                })
+                continue
+            
+            logger.info(f"Indexing uploaded file: {upload.filename} ({upload.size} bytes)")
+            job = service.submit(upload)
+            jobs[job.id] = job
+            results.append({
+                "filename": upload.filename,
+                "sha256": upload.sha256,
+                "job_id": job.id,
+                "status_url": f"{bp.url_prefix}/index/jobs/{job.id}"
+            })
         
-        logger.info(f"Indexing uploaded file: {file.filename}")
-        success = repository_service.index_repository(file_path, cleanup=True)
+        for result in results:
+            if "job_id" in result:
+                if wait:
+                    service.wait(result["job_id"])
+                job = jobs[result["job_id"]]
+                result["status"] = job.status
+                if job.error:
+                    result["error"] = job.error
         
-        # Cleanup temp file
-        try:
-            os.remove(file_path)
-            os.rmdir(temp_dir)
-        except:
-            pass
+        if wait:
+            failed = any(result["status"] == "failed" for result in results)
+            return jsonify({"status": "failed" if failed else "success", "results": results}), 500 if failed else 200
         
-        if success:
-            return jsonify({
-                "status": "success",
-                "message": f"Successfully indexed file: {file.filename}"
-            }), 200
-        else:
-            return jsonify({"error": "Failed to index file"}), 500
+        pending = [result for result in results if "job_id" in result]
+        return jsonify({
+            "status": "accepted" if pending else "success",
+            "results": results
+        }), 202 if pending else 200
             
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"Request exceeds the {get_settings().upload_max_request_mb} MB upload limit"}), 413
     except Exception as e:
         logger.error(f"Error indexing file: {e}", exc_info=True)
         return jsonify({"error": f"Failed to index file: {str(e)}"}), 500
 
 
+@bp.route("/index/jobs/<job_id>", methods=["GET"])
+def index_job_status(job_id: str):
+    """Status of a background indexing job started by /index/file"""
+    service = get_upload_service()
+    job = service.get_job(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(service.job_dict(job)), 200
+
+
+@bp.route("/endpoints", methods=["GET"])
+def lookup_endpoints():
+    """
+    Look up HTTP endpoints from the index-time endpoint catalogue
+    
+    Query parameters (all optional):
+    - module: module name or path; matched like ChangeRequest.target_modules
+    - include_dependents: also return endpoints of modules that import `module`
+    - path: substring of the route path
+    - method: HTTP method
+    - repository: restrict to one indexed repository
+    """
+    try:
+        module = request.args.get("module")
+        include_dependents = request.args.get("include_dependents", "").lower() in ("1", "true", "yes")
+        
+        modules = None
+        if module:
+            impacted = get_dependency_index().impacted_modules([module])
+            modules = impacted["targets"] + (impacted["dependents"] if include_dependents else [])
+            # Non-Python sources (e.g. OpenAPI specs) are keyed by file path
+            modules.append(module)
+        
+        endpoints = get_endpoint_index().search(
+            path=request.args.get("path"),
+            method=request.args.get("method"),
+            modules=modules,
+            repository=request.args.get("repository")
+        )
+        return jsonify({"count": len(endpoints), "endpoints": endpoints}), 200
+    except Exception as e:
+        logger.error(f"Error looking up endpoints: {e}", exc_info=True)
+        return jsonify({"error": f"Failed to look up endpoints: {str(e)}"}), 500
+
+
+@bp.route("/stats", methods=["GET"])
+def get_stats():
+    """Runtime statistics (model routing, token usage, cache hit ratios)"""
+    from chains.llm_router import get_llm_router
+    from embeddings.vector_store import get_vector_store
+    return jsonify({
+        "llm": get_llm_router().get_stats(),
+        "llm_cache": get_llm_router().cache.get_stats() if get_llm_router().cache else {"enabled": False},
+        "query_embedding_cache": get_vector_store().get_query_cache_stats(),
+        **get_analysis_service().get_stats()
+    }), 200
+
+
 @bp.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
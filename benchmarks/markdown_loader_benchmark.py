@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Markdown loading throughput: heading-aware MarkdownLoader vs UnstructuredMarkdownLoader
+Usage: python benchmarks/markdown_loader_benchmark.py [docs_path] [--runs 3] [--output report.json]
+
+Loads and splits every .md/.markdown file under docs_path (default: the repository root)
+with each loader in a fresh subprocess and reports files/s, chunks, mean chunk size and
+the share of chunks that carry a heading path. The Unstructured run needs
+`pip install unstructured` and is reported as an error without it.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add src to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+LOADERS = ("unstructured", "markdown")
+IGNORED_DIRS = {".git", "node_modules", ".venv", "venv", "__pycache__"}
+
+
+def find_markdown(root: Path) -> List[Path]:
+    files = []
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+        files.extend(Path(directory) / name for name in names if name.lower().endswith((".md", ".markdown")))
+    return sorted(files)
+
+
+def run_worker(name: str, root: str, runs: int, chunk_size: int):
+    """Load and split the corpus `runs` times with one loader; prints a JSON result line"""
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from loaders.repository_loader import MarkdownLoader
+
+    files = find_markdown(Path(root))
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=0)
+    import_start = time.perf_counter()
+    if name == "unstructured":
+        from langchain_community.document_loaders import UnstructuredMarkdownLoader
+        make_loader = UnstructuredMarkdownLoader
+        if files:
+            # The first load pulls in unstructured's lazily imported partitioners
+            UnstructuredMarkdownLoader(str(files[0])).load()
+    else:
+        def make_loader(path: str):
+            return MarkdownLoader(path, chunk_size=chunk_size)
+    import_s = time.perf_counter() - import_start
+
+    timings, chunks = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        chunks = []
+        for path in files:
+            chunks.extend(splitter.split_documents(make_loader(str(path)).load()))
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings) if timings else 0.0
+    print(json.dumps({
+        "files": len(files),
+        "first_use_s": round(import_s, 3),
+        "best_s": round(best, 4),
+        "files_per_s": round(len(files) / best, 1) if best else None,
+        "chunks": len(chunks),
+        "mean_chunk_chars": round(sum(len(c.page_content) for c in chunks) / len(chunks), 1) if chunks else 0,
+        "chunks_with_heading_path": sum(1 for c in chunks if c.metadata.get("heading_path")),
+        "unstructured_imported": "unstructured" in sys.modules,
+    }))
+
+
+def measure(name: str, root: Path, runs: int, chunk_size: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, __file__, str(root), "--worker", name, "--runs", str(runs), "--chunk-size", str(chunk_size)],
+        capture_output=True,
+        text=True,
+        cwd=ROOT
+    )
+    if result.returncode != 0:
+        return {"error": (result.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Markdown loader files/s benchmark")
+    parser.add_argument("docs_path", nargs="?", default=str(ROOT), help="Directory with Markdown files")
+    parser.add_argument("--runs", type=int, default=3, help="Passes over the corpus (best is reported)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--worker", choices=LOADERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.docs_path, args.runs, args.chunk_size)
+        return
+
+    report = {
+        "docs_path": args.docs_path,
+        "runs": args.runs,
+        "loaders": {name: measure(name, Path(args.docs_path), args.runs, args.chunk_size) for name in LOADERS},
+    }
+    rates = [report["loaders"][name].get("files_per_s") for name in LOADERS]
+    if all(rates):
+        report["speedup"] = round(rates[1] / rates[0], 1)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
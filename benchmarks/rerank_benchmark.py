@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark retrieval re-ranking: recall@N against prompt tokens
+Usage: python benchmarks/rerank_benchmark.py <questions.jsonl> [--top-n 5] [--fetch-k 50]
+
+Each line of the question set is a JSON object:
+    {"question": "...", "relevant_files": ["path/to/file.py", ...]}
+
+For every question the script compares:
+    - raw top-N from the vector store
+    - raw top-fetch_k (the "over-fetch for recall" baseline)
+    - top-N after local re-ranking of fetch_k candidates
+    - adaptive top-k (at most N) cut at ADAPTIVE_K_MIN_SCORE / the score knee
+and reports mean recall@N, mean prompt tokens and mean chunks for each strategy as JSON.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def count_tokens(text: str) -> int:
+    """Count prompt tokens with tiktoken, falling back to a 4-chars-per-token estimate"""
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except ImportError:
+        return len(text) // 4
+
+
+def load_questions(path: str) -> List[Dict]:
+    """Load a labelled question set from JSONL"""
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                questions.append(json.loads(line))
+    return questions
+
+
+def recall(docs, relevant_files: List[str]) -> float:
+    """Fraction of relevant files present among the retrieved documents"""
+    if not relevant_files:
+        return 0.0
+    retrieved = {doc.metadata.get("file_path", "") for doc in docs}
+    return sum(1 for f in relevant_files if f in retrieved) / len(relevant_files)
+
+
+def run_benchmark(vector_store, questions: List[Dict], top_n: int, fetch_k: int) -> Dict:
+    """Evaluate raw, re-ranked and adaptive retrieval over a labelled question set"""
+    from embeddings.adaptive_k import select_k
+    
+    settings = vector_store.settings
+    strategies = {
+        f"raw_top_{top_n}": [],
+        f"raw_top_{fetch_k}": [],
+        f"reranked_top_{top_n}": [],
+        f"adaptive_top_{top_n}": [],
+    }
+    
+    for item in questions:
+        question = item["question"]
+        relevant = item.get("relevant_files", [])
+        
+        candidates = vector_store.similarity_search_with_score(question, k=fetch_k)
+        raw_all = [doc for doc, _ in candidates]
+        reranked = [doc for doc, _ in vector_store.get_reranker().rerank(question, candidates, top_n)]
+        adaptive_k, _ = select_k(
+            [score for _, score in candidates],
+            min_k=settings.adaptive_k_min,
+            max_k=top_n,
+            min_score=settings.adaptive_k_min_score,
+            knee_factor=settings.adaptive_k_knee_factor
+        )
+        
+        for name, docs in (
+            (f"raw_top_{top_n}", raw_all[:top_n]),
+            (f"raw_top_{fetch_k}", raw_all),
+            (f"reranked_top_{top_n}", reranked),
+            (f"adaptive_top_{top_n}", raw_all[:adaptive_k]),
+        ):
+            strategies[name].append({
+                "chunks": len(docs),
+                "recall": recall(docs, relevant),
+                "prompt_tokens": count_tokens("\n\n".join(doc.page_content for doc in docs)),
+            })
+    
+    report = {}
+    for name, rows in strategies.items():
+        n = len(rows) or 1
+        report[name] = {
+            "mean_recall": round(sum(r["recall"] for r in rows) / n, 4),
+            "mean_prompt_tokens": round(sum(r["prompt_tokens"] for r in rows) / n, 1),
+            "mean_chunks": round(sum(r["chunks"] for r in rows) / n, 2),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-ranking recall@N vs prompt tokens benchmark")
+    parser.add_argument("questions", help="Labelled question set (JSONL)")
+    parser.add_argument("--top-n", type=int, default=5, help="Chunks passed to the LLM")
+    parser.add_argument("--fetch-k", type=int, default=50, help="Candidates fetched before re-ranking")
+    args = parser.parse_args()
+    
+    from embeddings.vector_store import get_vector_store
+    
+    questions = load_questions(args.questions)
+    report = run_benchmark(get_vector_store(), questions, args.top_n, args.fetch_k)
+    print(json.dumps({
+        "questions": len(questions),
+        "top_n": args.top_n,
+        "fetch_k": args.fetch_k,
+        "strategies": report,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Offline retrieval quality and latency benchmark suite
+Usage: python benchmarks/run_benchmarks.py [corpus_path] [--output report.json]
+
+Runs entirely in-process with deterministic fake embeddings, a fake chat model
+with simulated latency and the local vector backend, so results are comparable
+across commits without OpenAI or Supabase. Measures:
+    - indexing throughput (files/s, chunks/s) for loading and embedding
+    - peak RSS
+    - search latency percentiles
+    - end-to-end latency of RepositoryQAChain and AnalysisService.full_analysis
+    - DecisionChain latency for rule-decided vs LLM-decided cases
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add src to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Offline configuration must be in place before settings are first loaded
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+os.environ["VECTOR_BACKEND"] = "local"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+SEARCH_QUERIES = [
+    "How are change requests validated?",
+    "Where is the vector store initialized?",
+    "How are repository files chunked before embedding?",
+    "Which endpoint performs full analysis?",
+    "How does the decision chain choose SAFE TO IMPLEMENT?",
+    "How are GitHub repositories cloned?",
+    "What settings control chunk size and overlap?",
+    "How is impact severity mapped to ImpactLevel?",
+]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean in milliseconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "samples": len(ordered),
+    }
+
+
+def time_calls(fn: Callable[[], object], iterations: int) -> List[float]:
+    """Wall-clock durations (seconds) of repeated calls"""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(usage / divisor, 1)
+
+
+def git_commit() -> str:
+    """Current commit hash, if available"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def setup_offline(llm_delay_s: float, embedding_delay_s: float):
+    """Install fake embeddings, the local backend and a fake LLM as the app singletons"""
+    import embeddings.vector_store as vector_store_module
+    import chains.llm_router as llm_router_module
+    from benchmarks.fakes import FakeEmbeddings, FakeChatModel
+    from embeddings.local_store import LocalVectorStore
+
+    fake_embeddings = FakeEmbeddings(delay_s=embedding_delay_s)
+    vector_store_module._vector_store = vector_store_module.VectorStore(
+        embeddings=fake_embeddings,
+        store=LocalVectorStore(fake_embeddings),
+        summary_store=LocalVectorStore(fake_embeddings)
+    )
+    llm_router_module._llm_router = llm_router_module.LLMRouter(
+        llm_factory=lambda model: FakeChatModel(model, delay_s=llm_delay_s)
+    )
+    return vector_store_module._vector_store
+
+
+def run(corpus_path: str, iterations: int, llm_delay_s: float, embedding_delay_s: float) -> Dict:
+    """Run every benchmark stage and return the report"""
+    vector_store = setup_offline(llm_delay_s, embedding_delay_s)
+
+    from loaders.repository_loader import RepositoryLoader
+    from models.schemas import QuestionRequest, ChangeRequest
+    from chains.qa_chain import RepositoryQAChain
+    from services.analysis_service import AnalysisService
+
+    report: Dict[str, object] = {}
+
+    # Indexing: load + split
+    start = time.perf_counter()
+    loader = RepositoryLoader(corpus_path)
+    chunks = loader.load_repository()
+    load_s = time.perf_counter() - start
+    n_files = len({c.metadata.get("file_path") for c in chunks})
+
+    # Indexing: embed + store (plus file summaries for hierarchical retrieval)
+    start = time.perf_counter()
+    vector_store.add_documents(chunks)
+    if vector_store.settings.hierarchical_retrieval:
+        vector_store.add_summary_documents(loader.summary_documents)
+    embed_s = time.perf_counter() - start
+
+    report["indexing"] = {
+        "files": n_files,
+        "chunks": len(chunks),
+        "load_s": round(load_s, 3),
+        "embed_store_s": round(embed_s, 3),
+        "files_per_s": round(n_files / load_s, 1) if load_s else None,
+        "chunks_per_s": round(len(chunks) / (load_s + embed_s), 1) if (load_s + embed_s) else None,
+    }
+
+    # Search latency (embedding cache disabled per query by varying text)
+    search_samples = []
+    for i in range(iterations):
+        query = f"{SEARCH_QUERIES[i % len(SEARCH_QUERIES)]} #{i}"
+        start = time.perf_counter()
+        vector_store.similarity_search(query, k=10)
+        search_samples.append(time.perf_counter() - start)
+    report["search"] = percentiles(search_samples)
+
+    # End-to-end chains with simulated LLM latency
+    qa_chain = RepositoryQAChain()
+    report["qa_chain"] = percentiles(time_calls(
+        lambda: qa_chain.answer_question(QuestionRequest(question=SEARCH_QUERIES[0], max_results=5)),
+        iterations
+    ))
+
+    analysis_service = AnalysisService()
+    change = ChangeRequest(
+        description="Add rate limiting to the analysis endpoints",
+        feature_type="new_feature",
+        target_modules=["api", "services"]
+    )
+    report["full_analysis"] = percentiles(time_calls(
+        lambda: analysis_service.full_analysis(change),
+        iterations
+    ))
+
+    report["decision"] = benchmark_decision(analysis_service.decision_chain, change, iterations)
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def benchmark_decision(decision_chain, change, iterations: int) -> Dict:
+    """Decision latency when a rule fires vs. when the LLM is consulted"""
+    from models.schemas import (
+        ChangeValidationResponse,
+        ImpactAssessment,
+        ImpactLevel,
+        RepositoryEvidence,
+        AnalysisResult
+    )
+
+    def validation(is_valid: bool) -> ChangeValidationResponse:
+        return ChangeValidationResponse(
+            summary="benchmark",
+            repository_evidence=RepositoryEvidence(chunks=[], file_paths=[]),
+            analysis=AnalysisResult(reasoning="benchmark", confidence=0.8),
+            is_valid=is_valid
+        )
+
+    def impact(level: ImpactLevel) -> ImpactAssessment:
+        return ImpactAssessment(
+            impact=level != ImpactLevel.NONE,
+            level=level,
+            details="benchmark",
+            client_impact="benchmark"
+        )
+
+    rule_case = (validation(False), impact(ImpactLevel.MEDIUM))
+    llm_case = (validation(True), impact(ImpactLevel.MEDIUM))
+    rule_samples = time_calls(lambda: decision_chain.make_decision(change, *rule_case), iterations)
+    llm_samples = time_calls(lambda: decision_chain.make_decision(change, *llm_case), iterations)
+    return {
+        "rule_decided": percentiles(rule_samples),
+        "llm_decided": percentiles(llm_samples),
+        "rules": decision_chain.rules_engine.get_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline retrieval and latency benchmarks")
+    parser.add_argument("corpus", nargs="?", default=str(ROOT), help="Repository to index (default: this repo)")
+    parser.add_argument("--iterations", type=int, default=20, help="Samples per latency benchmark")
+    parser.add_argument("--llm-delay-ms", type=float, default=50.0, help="Simulated LLM latency per call")
+    parser.add_argument("--embedding-delay-ms", type=float, default=0.0, help="Simulated embedding latency per call")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = run(
+        args.corpus,
+        args.iterations,
+        args.llm_delay_ms / 1000,
+        args.embedding_delay_ms / 1000
+    )
+    report = {
+        "schema_version": 1,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "corpus": args.corpus,
+            "iterations": args.iterations,
+            "llm_delay_ms": args.llm_delay_ms,
+            "embedding_delay_ms": args.embedding_delay_ms,
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark: import cost of the API and CLI entry points
+Usage: python benchmarks/startup_benchmark.py [--runs 5] [--max-ms 1500] [--output report.json]
+
+Each target is imported in a fresh interpreter under `python -X importtime`. The report
+has median wall time, the importtime total, the slowest top-level imports, and any
+heavy modules (document loaders, Supabase, GitPython, OpenAI, ...) imported at startup
+even though they should only load on first use. The script exits with status 1 if a
+target is slower than --max-ms or imports a deferred module, so CI can catch regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).parent.parent
+
+# name -> python statements run in the child interpreter
+TARGETS = {
+    "api.routes": "import api.routes",
+    "main": "import main",
+    "index_repository --help": (
+        "import runpy, sys; sys.argv = ['index_repository.py', '--help']\n"
+        "try:\n    runpy.run_path('scripts/index_repository.py', run_name='__main__')\n"
+        "except SystemExit:\n    pass"
+    ),
+}
+
+# Modules that must only be imported on first use
+DEFERRED_MODULES = [
+    "langchain_community.document_loaders",
+    "langchain_community.vectorstores",
+    "langchain_openai",
+    "unstructured",
+    "pypdf",
+    "supabase",
+    "git",
+    "openai",
+]
+
+_REPORT_DEFERRED = (
+    "import sys, json\n"
+    f"print(json.dumps(sorted(m for m in {DEFERRED_MODULES!r} if m in sys.modules)))"
+)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for each top-level import in -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        name = fields[2]
+        # Nested imports are indented by two spaces per level
+        if name.startswith("  "):
+            continue
+        rows.append((name.strip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def measure(statement: str, runs: int) -> Dict:
+    """Import-time profile of one target over several fresh interpreters"""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "LOG_LEVEL": "WARNING"}
+    wall_ms, totals_ms = [], []
+    top_level: List[Tuple[str, int, int]] = []
+    deferred: List[str] = []
+    error = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"{statement}\n{_REPORT_DEFERRED}"],
+            cwd=ROOT, env=env, capture_output=True, text=True
+        )
+        wall_ms.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+            break
+        top_level = parse_importtime(proc.stderr)
+        totals_ms.append(sum(row[2] for row in top_level) / 1000)
+        deferred = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    if error:
+        return {"error": error}
+    slowest = sorted(top_level, key=lambda row: row[2], reverse=True)[:15]
+    return {
+        "wall_ms_median": round(statistics.median(wall_ms), 1),
+        "import_ms_median": round(statistics.median(totals_ms), 1),
+        "slowest_imports": [{"module": name, "cumulative_ms": round(cum / 1000, 1)} for name, _, cum in slowest],
+        "deferred_modules_imported": deferred,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup import time of the API and CLI")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--max-ms", type=float, help="Fail if a target's median import time exceeds this")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = {name: measure(statement, args.runs) for name, statement in TARGETS.items()}
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+    failures = []
+    for name, result in results.items():
+        if "error" in result:
+            failures.append(f"{name}: {result['error']}")
+            continue
+        if result["deferred_modules_imported"]:
+            failures.append(f"{name} imports {', '.join(result['deferred_modules_imported'])} at startup")
+        if args.max_ms is not None and result["import_ms_median"] > args.max_ms:
+            failures.append(f"{name}: {result['import_ms_median']} ms > {args.max_ms} ms")
+    for failure in failures:
+        print(f"✗ {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
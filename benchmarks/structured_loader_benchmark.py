@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Large-file benchmark for the streaming JSON loader
+Usage: python benchmarks/structured_loader_benchmark.py [--size-mb 200] [--output report.json]
+
+Generates a synthetic JSON fixture ({"meta": {...}, "data": [records...]}) and loads and
+splits it in a fresh subprocess per loader, so peak RSS is not shared:
+    - jsonloader: the previous JSONLoader(jq_schema='.') path (needs the jq package)
+    - streaming: StreamingJSONLoader.load, all chunks kept in one list
+    - streaming_lazy: StreamingJSONLoader.lazy_load, chunks counted and dropped (parser bound)
+    - indexer: RepositoryLoader.iter_chunk_batches, the batches the indexer embeds
+      (includes the summary and OpenAPI passes)
+Reports wall time, peak RSS above the post-import baseline, and document/chunk counts.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+LOADERS = ("jsonloader", "streaming", "streaming_lazy", "indexer")
+
+
+def write_fixture(path: Path, size_mb: int, seed: int = 0):
+    """Write an array of records under "data" until the file reaches size_mb"""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"meta": {"generator": "structured_loader_benchmark", "version": 1}, "data": [')
+        written, i = 0, 0
+        while written < target:
+            record = {
+                "id": i,
+                "member_id": f"M{rng.randrange(10**8):08d}",
+                "status": rng.choice(["active", "pending", "closed"]),
+                "amounts": [round(rng.random() * 1000, 2) for _ in range(5)],
+                "notes": " ".join(rng.choice(["claim", "policy", "renewal", "audit", "copay"]) for _ in range(30)),
+            }
+            text = ("," if i else "") + json.dumps(record)
+            f.write(text)
+            written += len(text)
+            i += 1
+        f.write("]}")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(name: str, path: str, chunk_size: int):
+    """Load and split the fixture with one loader; prints a JSON result line"""
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from langchain_community.document_loaders import JSONLoader
+    from loaders.structured_loader import StreamingJSONLoader
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=0)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if name == "indexer":
+        # Same split as the other loaders (RepositoryLoader reads it from settings)
+        os.environ["MAX_CHUNK_SIZE"] = str(chunk_size)
+        os.environ["CHUNK_OVERLAP"] = "0"
+        from loaders.repository_loader import RepositoryLoader
+        documents = chunks = 0  # documents: batches handed to the embedder
+        for batch in RepositoryLoader(path).iter_chunk_batches():
+            documents += 1
+            chunks += len(batch)
+    elif name == "streaming_lazy":
+        documents = chunks = 0
+        for document in StreamingJSONLoader(path, chunk_size=chunk_size).lazy_load():
+            documents += 1
+            chunks += len(splitter.split_documents([document]))
+    else:
+        if name == "jsonloader":
+            loaded = JSONLoader(path, jq_schema=".").load()
+        else:
+            loaded = StreamingJSONLoader(path, chunk_size=chunk_size).load()
+        documents, chunks = len(loaded), len(splitter.split_documents(loaded))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": round(peak_rss_mb() - baseline, 1),
+        "documents": documents,
+        "chunks": chunks,
+    }))
+
+
+def measure(name: str, path: Path, chunk_size: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, __file__, "--worker", name, str(path), "--chunk-size", str(chunk_size)],
+        capture_output=True,
+        text=True,
+        cwd=ROOT
+    )
+    if result.returncode != 0:
+        return {"error": (result.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming JSON loader memory/time benchmark")
+    parser.add_argument("--size-mb", type=int, default=200, help="Size of the generated fixture")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--worker", nargs=2, metavar=("LOADER", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], args.worker[1], args.chunk_size)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "fixture.json"
+        write_fixture(path, args.size_mb)
+        report = {
+            "fixture_mb": round(path.stat().st_size / (1024 * 1024), 1),
+            "chunk_size": args.chunk_size,
+            "loaders": {name: measure(name, path, args.chunk_size) for name in LOADERS},
+        }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
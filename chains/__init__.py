@@ -1,12 +1,28 @@
-from .qa_chain import RepositoryQAChain
-from .validation_chain import ChangeValidationChain
-from .impact_chain import ImpactAnalysisChain
-from .decision_chain import DecisionChain
+import importlib
+
+# Re-exports resolve on first attribute access: importing a submodule such as
+# chains.llm_cache must not pull in langchain_openai through every chain.
+_EXPORTS = {
+    "RepositoryQAChain": ".qa_chain",
+    "ChangeValidationChain": ".validation_chain",
+    "ImpactAnalysisChain": ".impact_chain",
+    "DecisionChain": ".decision_chain",
+    "LLMRouter": ".llm_router",
+    "get_llm_router": ".llm_router",
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+
 
 __all__ = [
     "RepositoryQAChain",
     "ChangeValidationChain",
     "ImpactAnalysisChain",
-    "DecisionChain"
+    "DecisionChain",
+    "LLMRouter",
+    "get_llm_router"
 ]
-
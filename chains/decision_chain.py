@@ -1,6 +1,5 @@
-from langchain_openai import ChatOpenAI
+import time
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 
 from models.schemas import (
     ChangeRequest,
@@ -11,8 +10,11 @@ from models.schemas import (
     RepositoryEvidence,
     AnalysisResult
 )
+from chains.decision_rules import DecisionRulesEngine
+from chains.llm_router import get_llm_router, json_confidence_acceptor
 from utils.logger import get_logger
 from utils.config import get_settings
+from utils.metrics import timed
 
 logger = get_logger()
 
@@ -22,10 +24,10 @@ class DecisionChain:
     
     def __init__(self):
         self.settings = get_settings()
-        self.llm = ChatOpenAI(
-            model="gpt-4",
-            temperature=0,
-            openai_api_key=self.settings.openai_api_key
+        self.router = get_llm_router()
+        self.rules_engine = DecisionRulesEngine(
+            [name.strip() for name in self.settings.decision_rules.split(",") if name.strip()]
+            if self.settings.decision_rules_enabled else []
         )
         self._setup_chain()
     
@@ -55,15 +57,16 @@ Respond in JSON format:
     "decision": "SAFE TO IMPLEMENT" or "CHANGE REQUEST WARNING",
     "summary": "executive summary",
     "recommended_steps": ["step1", "step2"],
-    "mitigation_steps": ["mitigation1", "mitigation2"] (only if warning)
+    "mitigation_steps": ["mitigation1", "mitigation2"] (only if warning),
+    "confidence": 0.0-1.0
 }}
 
 Response:"""
         
         self.prompt = ChatPromptTemplate.from_template(prompt_template)
-        
-        self.chain = self.prompt | self.llm | StrOutputParser()
+        self.accept = json_confidence_acceptor(self.settings.llm_cascade_min_confidence)
     
+    @timed("chain.decision")
     def make_decision(
         self,
         request: ChangeRequest,
@@ -73,6 +76,32 @@ Response:"""
         """Make final decision based on validation and impact"""
         logger.info("Making final decision on change request")
         
+        # Merge evidence from validation
+        evidence = validation.repository_evidence
+        
+        # Merge analysis
+        analysis = AnalysisResult(
+            reasoning=f"{validation.analysis.reasoning}\n\nImpact: {impact.details}",
+            confidence=min(validation.analysis.confidence, 0.9),
+            related_modules=list(set(
+                validation.analysis.related_modules + impact.affected_modules
+            )),
+            dependencies=validation.analysis.dependencies
+        )
+        
+        # Fast path: unambiguous cases are decided by rules without an LLM call
+        outcome = self.rules_engine.evaluate(request, validation, impact)
+        if outcome is not None:
+            return DecisionResponse(
+                summary=outcome.summary,
+                repository_evidence=evidence,
+                analysis=analysis,
+                impact_assessment=impact,
+                decision=outcome.decision,
+                recommended_next_steps=outcome.recommended_steps,
+                mitigation_steps=outcome.mitigation_steps if outcome.decision == DecisionType.CHANGE_REQUEST_WARNING else None
+            )
+        
         # Prepare inputs
         change_text = f"""
 Type: {request.feature_type}
@@ -100,11 +129,18 @@ Details: {impact.details}
 """
         
         # Run decision chain
-        result = self.chain.invoke({
-            "change_request": change_text,
-            "validation": validation_text,
-            "impact": impact_text
-        })
+        start = time.perf_counter()
+        result = self.router.invoke(
+            "decision",
+            self.prompt,
+            {
+                "change_request": change_text,
+                "validation": validation_text,
+                "impact": impact_text
+            },
+            accept=self.accept
+        )
+        self.rules_engine.record_llm_fallback(time.perf_counter() - start)
         
         # Parse result
         decision_result = self._parse_decision_result(result)
@@ -116,19 +152,6 @@ Details: {impact.details}
         else:
             decision_type = DecisionType.CHANGE_REQUEST_WARNING
         
-        # Merge evidence from validation
-        evidence = validation.repository_evidence
-        
-        # Merge analysis
-        analysis = AnalysisResult(
-            reasoning=f"{validation.analysis.reasoning}\n\nImpact: {impact.details}",
-            confidence=min(validation.analysis.confidence, 0.9),
-            related_modules=list(set(
-                validation.analysis.related_modules + impact.affected_modules
-            )),
-            dependencies=validation.analysis.dependencies
-        )
-        
         return DecisionResponse(
             summary=decision_result.get("summary", "Decision on change request"),
             repository_evidence=evidence,
@@ -139,6 +162,7 @@ Details: {impact.details}
             mitigation_steps=decision_result.get("mitigation_steps") if decision_type == DecisionType.CHANGE_REQUEST_WARNING else None
         )
     
+    @timed("parse.decision")
     def _parse_decision_result(self, result: str) -> dict:
         """Parse LLM decision result"""
         import json
@@ -0,0 +1,177 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from models.schemas import (
+    ChangeRequest,
+    ChangeValidationResponse,
+    ImpactAssessment,
+    ImpactLevel,
+    DecisionType
+)
+from utils.logger import get_logger
+from utils.metrics import get_metrics
+
+logger = get_logger()
+
+
+@dataclass
+class RuleOutcome:
+    """Decision produced by a rule without calling the LLM"""
+    rule: str
+    decision: DecisionType
+    summary: str
+    recommended_steps: List[str]
+    mitigation_steps: List[str]
+
+
+@dataclass
+class DecisionRule:
+    """A deterministic shortcut for an unambiguous validation/impact combination"""
+    name: str
+    description: str
+    applies: Callable[[ChangeRequest, ChangeValidationResponse, ImpactAssessment], bool]
+    build: Callable[[ChangeRequest, ChangeValidationResponse, ImpactAssessment], RuleOutcome]
+
+
+def _invalid_request(request, validation, impact) -> RuleOutcome:
+    issues = validation.conflicts + validation.contradictions
+    return RuleOutcome(
+        rule="invalid_request",
+        decision=DecisionType.CHANGE_REQUEST_WARNING,
+        summary=f"The {request.feature_type} request failed validation against the repository.",
+        recommended_steps=[
+            "Revise the change request to address the validation findings",
+            "Re-submit the revised request for analysis",
+        ],
+        mitigation_steps=issues or ["Clarify the request so it is consistent with the existing system"],
+    )
+
+
+def _critical_breaking_changes(request, validation, impact) -> RuleOutcome:
+    return RuleOutcome(
+        rule="critical_breaking_changes",
+        decision=DecisionType.CHANGE_REQUEST_WARNING,
+        summary=(
+            f"Critical impact with {len(impact.breaking_changes)} breaking change(s) "
+            f"across {len(impact.affected_modules)} module(s)."
+        ),
+        recommended_steps=[
+            "Review the breaking changes with the owners of the affected modules",
+            "Plan a versioned or phased rollout",
+        ],
+        mitigation_steps=[f"Mitigate breaking change: {change}" for change in impact.breaking_changes],
+    )
+
+
+def _no_impact(request, validation, impact) -> RuleOutcome:
+    return RuleOutcome(
+        rule="no_impact",
+        decision=DecisionType.SAFE_TO_IMPLEMENT,
+        summary="Valid request with no detected impact or conflicts.",
+        recommended_steps=[
+            "Implement the change",
+            "Add tests covering the new behaviour",
+        ],
+        mitigation_steps=[],
+    )
+
+
+BUILTIN_RULES: Dict[str, DecisionRule] = {
+    rule.name: rule for rule in (
+        DecisionRule(
+            name="invalid_request",
+            description="validation.is_valid is False",
+            applies=lambda request, validation, impact: not validation.is_valid,
+            build=_invalid_request,
+        ),
+        DecisionRule(
+            name="critical_breaking_changes",
+            description="impact level is Critical and breaking changes were found",
+            applies=lambda request, validation, impact: (
+                not impact.parse_fallback
+                and impact.level == ImpactLevel.CRITICAL
+                and bool(impact.breaking_changes)
+            ),
+            build=_critical_breaking_changes,
+        ),
+        DecisionRule(
+            name="no_impact",
+            description=(
+                "valid request, impact level None, no conflicts, duplicates, contradictions, "
+                "breaking changes, affected modules or affected endpoints"
+            ),
+            applies=lambda request, validation, impact: (
+                validation.is_valid
+                and not impact.parse_fallback
+                and impact.level == ImpactLevel.NONE
+                and not impact.impact
+                and not (validation.conflicts or validation.duplicates
+                         or validation.contradictions or impact.breaking_changes
+                         or impact.affected_modules or impact.affected_endpoints)
+            ),
+            build=_no_impact,
+        ),
+    )
+}
+
+
+class DecisionRulesEngine:
+    """Evaluates enabled rules in order and tracks how often each one short-circuits the LLM"""
+
+    def __init__(self, enabled_rules: List[str]):
+        unknown = [name for name in enabled_rules if name not in BUILTIN_RULES]
+        if unknown:
+            raise ValueError(
+                f"Unknown decision rules: {', '.join(unknown)}. "
+                f"Available: {', '.join(BUILTIN_RULES)}"
+            )
+        self.rules = [BUILTIN_RULES[name] for name in enabled_rules]
+        self._hits: Dict[str, int] = {rule.name: 0 for rule in self.rules}
+        self._evaluations = 0
+        self._llm_fallbacks = 0
+        self._llm_latency_s = 0.0
+        self._lock = threading.Lock()
+
+    def evaluate(
+        self,
+        request: ChangeRequest,
+        validation: ChangeValidationResponse,
+        impact: ImpactAssessment
+    ) -> Optional[RuleOutcome]:
+        """First matching rule's outcome, or None when the case is ambiguous"""
+        with self._lock:
+            self._evaluations += 1
+        for rule in self.rules:
+            if rule.applies(request, validation, impact):
+                with self._lock:
+                    self._hits[rule.name] += 1
+                get_metrics().inc(
+                    "decision_rule_hits_total",
+                    labels={"rule": rule.name},
+                    help="Decisions made by a deterministic rule instead of the LLM"
+                )
+                logger.info(f"Decision rule '{rule.name}' fired; skipping LLM decision call")
+                return rule.build(request, validation, impact)
+        return None
+
+    def record_llm_fallback(self, latency_s: float):
+        """Record an LLM decision call (used to estimate latency saved by rules)"""
+        with self._lock:
+            self._llm_fallbacks += 1
+            self._llm_latency_s += latency_s
+
+    def get_stats(self) -> Dict[str, object]:
+        """Rule hit counts and estimated latency saved"""
+        with self._lock:
+            total_hits = sum(self._hits.values())
+            avg_llm_ms = self._llm_latency_s * 1000 / self._llm_fallbacks if self._llm_fallbacks else 0.0
+            return {
+                "enabled_rules": [rule.name for rule in self.rules],
+                "evaluations": self._evaluations,
+                "rule_hits": dict(self._hits),
+                "hit_ratio": round(total_hits / self._evaluations, 3) if self._evaluations else 0.0,
+                "llm_fallbacks": self._llm_fallbacks,
+                "llm_fallback_avg_ms": round(avg_llm_ms, 1),
+                "estimated_latency_saved_ms": round(total_hits * avg_llm_ms, 1),
+            }
@@ -1,9 +1,11 @@
-from typing import List
-from langchain_openai import ChatOpenAI
+from typing import List, Optional
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 
+from chains.llm_router import get_llm_router, json_confidence_acceptor
+from chains.retrieval import build_change_search_query
 from embeddings.vector_store import get_vector_store
+from loaders.dependency_graph import get_dependency_index
+from loaders.endpoint_catalogue import get_endpoint_index
 from models.schemas import (
     ChangeRequest,
     ImpactAssessment,
@@ -11,6 +13,7 @@ from models.schemas import (
 )
 from utils.logger import get_logger
 from utils.config import get_settings
+from utils.metrics import timed
 
 logger = get_logger()
 
@@ -20,12 +23,10 @@ class ImpactAnalysisChain:
     
     def __init__(self):
         self.settings = get_settings()
-        self.llm = ChatOpenAI(
-            model="gpt-4",
-            temperature=0,
-            openai_api_key=self.settings.openai_api_key
-        )
+        self.router = get_llm_router()
         self.vector_store = get_vector_store()
+        self.dependency_index = get_dependency_index()
+        self.endpoint_index = get_endpoint_index()
         self._setup_chain()
     
     def _setup_chain(self):
@@ -40,6 +41,9 @@ Change Request:
 Repository Context:
 {context}
 
+Static Dependency Analysis (from the import graph and route catalogue; these are certainly affected):
+{dependency_context}
+
 Your task:
 1. Identify all affected modules, endpoints, and business flows
 2. Determine impact severity (None, Low, Medium, High, Critical)
@@ -55,31 +59,33 @@ Respond in JSON format:
     "affected_flows": ["flow1", "flow2"],
     "breaking_changes": ["change1", "change2"],
     "client_impact": "description of client-facing impact",
-    "details": "detailed impact analysis"
+    "details": "detailed impact analysis",
+    "confidence": 0.0-1.0
 }}
 
 Response:"""
         
         self.prompt = ChatPromptTemplate.from_template(prompt_template)
-        
-        self.chain = self.prompt | self.llm | StrOutputParser()
+        self.accept = json_confidence_acceptor(self.settings.llm_cascade_min_confidence)
     
-    def analyze_impact(self, request: ChangeRequest) -> ImpactAssessment:
-        """Analyze impact of a change request"""
+    @timed("chain.impact")
+    def analyze_impact(
+        self,
+        request: ChangeRequest,
+        query_embedding: Optional[List[float]] = None
+    ) -> ImpactAssessment:
+        """Analyze impact of a change request (optionally reusing a precomputed query embedding)"""
         logger.info(f"Analyzing impact for: {request.description}")
         
         # Build comprehensive search query
-        search_terms = [
-            request.description,
-            request.feature_type
-        ]
-        if request.target_modules:
-            search_terms.extend(request.target_modules)
-        
-        search_query = " ".join(search_terms)
+        search_query = build_change_search_query(request)
         
         # Retrieve relevant documents
-        docs = self.vector_store.similarity_search(search_query, k=15)
+        docs, selection = self.vector_store.retrieve_with_selection(
+            search_query,
+            k=15,
+            query_embedding=query_embedding
+        )
         context = "\n\n".join([doc.page_content for doc in docs])
         
         # Prepare change request text
@@ -90,11 +96,24 @@ Target Modules: {request.target_modules or 'Not specified'}
 Business Rules: {request.business_rules or 'Not specified'}
 """
         
+        # Transitive dependents of the target modules from the import graph
+        static_impact = self.dependency_index.impacted_modules(request.target_modules or [])
+        static_endpoints = self.endpoint_index.endpoints_for_modules(
+            static_impact["targets"] + static_impact["dependents"]
+        )
+        dependency_context = self._format_static_impact(static_impact, static_endpoints)
+        
         # Run impact analysis chain
-        result = self.chain.invoke({
-            "change_request": change_text,
-            "context": context
-        })
+        result = self.router.invoke(
+            "impact",
+            self.prompt,
+            {
+                "change_request": change_text,
+                "context": context,
+                "dependency_context": dependency_context
+            },
+            accept=self.accept
+        )
         
         # Parse result
         impact_result = self._parse_impact_result(result)
@@ -117,13 +136,44 @@ Business Rules: {request.business_rules or 'Not specified'}
             impact=impact_result.get("has_impact", False),
             level=impact_level,
             details=impact_result.get("details", ""),
-            affected_modules=impact_result.get("affected_modules", []),
-            affected_endpoints=impact_result.get("affected_endpoints", []),
+            affected_modules=self._merge_unique(
+                impact_result.get("affected_modules", []),
+                static_impact["targets"] + static_impact["dependents"]
+            ),
+            affected_endpoints=self._merge_unique(
+                impact_result.get("affected_endpoints", []),
+                static_endpoints
+            ),
             affected_flows=impact_result.get("affected_flows", []),
             client_impact=impact_result.get("client_impact", ""),
-            breaking_changes=impact_result.get("breaking_changes", [])
+            breaking_changes=impact_result.get("breaking_changes", []),
+            retrieval=selection,
+            parse_fallback=impact_result.get("parse_fallback", False)
         )
     
+    def _format_static_impact(self, static_impact: dict, endpoints: List[str], limit: int = 50) -> str:
+        """Render resolved targets, dependents and their endpoints for the prompt"""
+        if not static_impact["targets"]:
+            return "No target modules resolved in the dependency graph."
+        
+        def shown(items: List[str]) -> str:
+            text = ", ".join(items[:limit]) or "none"
+            if len(items) > limit:
+                text += f" (+{len(items) - limit} more)"
+            return text
+        
+        dependents = static_impact["dependents"]
+        return (
+            f"Target modules: {', '.join(static_impact['targets'])}\n"
+            f"Transitive dependents ({len(dependents)}): {shown(dependents)}\n"
+            f"Endpoints served by these modules ({len(endpoints)}): {shown(endpoints)}"
+        )
+    
+    def _merge_unique(self, llm_items: List[str], static_items: List[str]) -> List[str]:
+        """LLM-reported items followed by statically derived ones, without duplicates"""
+        return list(dict.fromkeys(list(llm_items) + list(static_items)))
+    
+    @timed("parse.impact")
     def _parse_impact_result(self, result: str) -> dict:
         """Parse LLM impact analysis result"""
         import json
@@ -160,7 +210,8 @@ Business Rules: {request.business_rules or 'Not specified'}
             "affected_flows": affected_flows,
             "breaking_changes": breaking_changes,
             "client_impact": self._extract_field(result, "client_impact"),
-            "details": result
+            "details": result,
+            "parse_fallback": True
         }
     
     def _extract_list(self, text: str, key: str) -> List[str]:
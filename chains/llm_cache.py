@@ -0,0 +1,155 @@
+import contextvars
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from utils.logger import get_logger
+from utils.config import get_settings
+from utils.metrics import record_cache
+
+logger = get_logger()
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache(enabled: bool = True) -> Iterator[None]:
+    """Skip cache reads (responses are still written) for the duration of the block"""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def llm_cache_bypassed() -> bool:
+    """Whether cache reads are skipped in the current context"""
+    return _bypass.get()
+
+
+def make_cache_key(model: str, messages: Any, index_version: str) -> str:
+    """Hash of model, rendered prompt and index version"""
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    for message in messages:
+        role = getattr(message, "type", message.__class__.__name__)
+        content = getattr(message, "content", str(message))
+        digest.update(f"{role}:{content}".encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(index_version.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """Disk-backed (SQLite) cache of LLM responses with TTL and size-capped LRU eviction"""
+
+    def __init__(self, path: str, ttl_s: int = 86400, max_entries: int = 10000):
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access_idx ON llm_cache (last_access)")
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response, or None if missing, expired or bypassed for this request"""
+        if _bypass.get():
+            with self._lock:
+                self._bypassed += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_s > 0 and now - row[1] > self.ttl_s:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        record_cache("llm", hit=row is not None)
+        return row[0] if row is not None else None
+
+    def set(self, key: str, model: str, response: str):
+        """Store a response and evict least recently used entries beyond max_entries"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._evictions += overflow
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit-rate and size statistics"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            lookups = self._hits + self._misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self._hits,
+                "misses": self._misses,
+                "bypassed": self._bypassed,
+                "evictions": self._evictions,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Get LLM cache instance (singleton), or None when caching is disabled"""
+    global _llm_cache
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMCache(
+            settings.llm_cache_path,
+            ttl_s=settings.llm_cache_ttl_s,
+            max_entries=settings.llm_cache_max_entries
+        )
+    return _llm_cache
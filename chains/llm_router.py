@@ -0,0 +1,244 @@
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate
+
+from chains.llm_cache import LLMCache, get_llm_cache, make_cache_key
+from utils.logger import get_logger
+from utils.config import get_settings
+from utils.index_version import get_index_version
+from utils.metrics import get_metrics, observe_stage, record_tokens
+
+logger = get_logger()
+
+ROUTING_MODES = ("static", "cascade")
+
+
+def json_confidence_acceptor(min_confidence: float) -> Callable[[str], bool]:
+    """
+    Build an acceptance check for JSON-producing chains
+
+    A response is accepted when it contains a parseable JSON object and,
+    if that object reports a "confidence", the value is at least min_confidence.
+    """
+    def accept(text: str) -> bool:
+        json_match = re.search(r'\{.*\}', text, re.DOTALL)
+        if not json_match:
+            return False
+        try:
+            parsed = json.loads(json_match.group())
+        except ValueError:
+            return False
+        confidence = parsed.get("confidence") if isinstance(parsed, dict) else None
+        if confidence is None:
+            return True
+        try:
+            return float(confidence) >= min_confidence
+        except (TypeError, ValueError):
+            return False
+
+    return accept
+
+
+def non_empty_acceptor(text: str) -> bool:
+    """Accept any non-empty free-text response"""
+    return bool(text and text.strip())
+
+
+class LLMRouter:
+    """Selects the model for each chain and records per-chain latency and token usage"""
+
+    def __init__(
+        self,
+        llm_factory: Optional[Callable[[str], Any]] = None,
+        cache: Optional[LLMCache] = None
+    ):
+        self.settings = get_settings()
+        if self.settings.llm_routing_mode not in ROUTING_MODES:
+            raise ValueError(
+                f"Invalid llm_routing_mode '{self.settings.llm_routing_mode}'. "
+                f"Expected one of: {', '.join(ROUTING_MODES)}"
+            )
+        self._llm_factory = llm_factory or self._create_llm
+        self.cache = cache if cache is not None else get_llm_cache()
+        self._llms: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _create_llm(self, model: str):
+        """Create a chat model client"""
+        return ChatOpenAI(
+            model=model,
+            temperature=0,
+            api_key=self.settings.openai_api_key
+        )
+
+    def get_llm(self, model: str):
+        """Get (and cache) the chat model client for a model name"""
+        with self._lock:
+            if model not in self._llms:
+                self._llms[model] = self._llm_factory(model)
+            return self._llms[model]
+
+    def models_for(self, chain_name: str) -> List[str]:
+        """Ordered list of models to try for a chain"""
+        large = getattr(self.settings, f"{chain_name}_model", None) or self.settings.llm_model
+        fast = self.settings.llm_fast_model
+        if self.settings.llm_routing_mode == "cascade" and fast and fast != large:
+            return [fast, large]
+        return [large]
+
+    def invoke(
+        self,
+        chain_name: str,
+        prompt: ChatPromptTemplate,
+        inputs: Dict[str, Any],
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """
+        Render the prompt and run it through the routed model(s)
+
+        In cascade mode the fast model is tried first; the response is handed to
+        the large model only when `accept` rejects it (parse failure or low confidence).
+
+        Returns:
+            Raw text content of the accepted response
+        """
+        messages = prompt.format_messages(**inputs)
+        models = self.models_for(chain_name)
+
+        for attempt, model in enumerate(models):
+            text = self._cached_invoke(chain_name, model, messages)
+            is_last = attempt == len(models) - 1
+            if is_last or accept is None or accept(text):
+                return text
+
+            logger.info(f"{chain_name}: escalating from {model} to {models[attempt + 1]}")
+            self._record(chain_name, model, escalated=True)
+            get_metrics().inc(
+                "llm_escalations_total",
+                labels={"chain": chain_name, "model": model},
+                help="Cascade escalations from the fast model"
+            )
+
+        return ""
+
+    def _cached_invoke(self, chain_name: str, model: str, messages) -> str:
+        """Serve a response from the LLM cache when possible, otherwise invoke and store it"""
+        if self.cache is None:
+            return self._invoke_model(chain_name, model, messages)
+        
+        key = make_cache_key(model, messages, get_index_version())
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug(f"{chain_name} [{model}] served from LLM cache")
+            return cached
+        
+        text = self._invoke_model(chain_name, model, messages)
+        if text:
+            self.cache.set(key, model, text)
+        return text
+    
+    def _invoke_model(self, chain_name: str, model: str, messages) -> str:
+        """Invoke a single model and record its latency and token usage"""
+        llm = self.get_llm(model)
+        start = time.perf_counter()
+        try:
+            with observe_stage(f"llm.{chain_name}"):
+                message = llm.invoke(messages)
+        except Exception:
+            self._record(chain_name, model, latency=time.perf_counter() - start, error=True)
+            raise
+        latency = time.perf_counter() - start
+
+        prompt_tokens, completion_tokens = self._extract_usage(message)
+        record_tokens(chain_name, model, prompt_tokens, completion_tokens)
+        self._record(
+            chain_name,
+            model,
+            latency=latency,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens
+        )
+        logger.debug(
+            f"{chain_name} [{model}] {latency * 1000:.0f} ms, "
+            f"{prompt_tokens} prompt / {completion_tokens} completion tokens"
+        )
+        return message.content if hasattr(message, "content") else str(message)
+
+    def _extract_usage(self, message) -> tuple[int, int]:
+        """Read token usage from an AI message (new and legacy metadata layouts)"""
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+        response_metadata = getattr(message, "response_metadata", None) or {}
+        token_usage = response_metadata.get("token_usage") or {}
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+    def _record(
+        self,
+        chain_name: str,
+        model: str,
+        latency: float = 0.0,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        escalated: bool = False,
+        error: bool = False
+    ):
+        """Accumulate per-chain, per-model statistics"""
+        with self._lock:
+            chain_stats = self._stats.setdefault(chain_name, {})
+            stats = chain_stats.setdefault(model, {
+                "calls": 0,
+                "errors": 0,
+                "escalations": 0,
+                "total_latency_s": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            })
+            if escalated:
+                stats["escalations"] += 1
+                return
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["total_latency_s"] += latency
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-chain latency and token usage report"""
+        with self._lock:
+            report = {}
+            for chain_name, models in self._stats.items():
+                report[chain_name] = {}
+                for model, stats in models.items():
+                    calls = stats["calls"]
+                    report[chain_name][model] = {
+                        **stats,
+                        "avg_latency_ms": round(stats["total_latency_s"] * 1000 / calls, 1) if calls else 0.0,
+                        "total_tokens": stats["prompt_tokens"] + stats["completion_tokens"],
+                    }
+            return {
+                "routing_mode": self.settings.llm_routing_mode,
+                "models": {
+                    name: self.models_for(name)
+                    for name in ("qa", "validation", "impact", "decision")
+                },
+                "chains": report,
+            }
+
+
+_llm_router: Optional[LLMRouter] = None
+
+
+def get_llm_router() -> LLMRouter:
+    """Get LLM router instance (singleton)"""
+    global _llm_router
+    if _llm_router is None:
+        _llm_router = LLMRouter()
+    return _llm_router
@@ -1,14 +1,14 @@
 from typing import List
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
 
+from chains.llm_router import get_llm_router, non_empty_acceptor
 from embeddings.vector_store import get_vector_store
+from loaders.dependency_graph import get_dependency_index
 from models.schemas import QuestionRequest, QuestionResponse, RepositoryEvidence, AnalysisResult
 from utils.logger import get_logger
 from utils.config import get_settings
+from utils.metrics import timed
 
 logger = get_logger()
 
@@ -18,16 +18,13 @@ class RepositoryQAChain:
     
     def __init__(self):
         self.settings = get_settings()
-        self.llm = ChatOpenAI(
-            model="gpt-4",
-            temperature=0,
-            api_key=self.settings.openai_api_key
-        )
+        self.router = get_llm_router()
         self.vector_store = get_vector_store()
+        self.dependency_index = get_dependency_index()
         self._setup_chain()
     
     def _setup_chain(self):
-        """Setup the QA chain using LCEL"""
+        """Setup the QA prompt"""
         prompt_template = """You are an expert software architect analyzing a healthcare insurance system repository.
 
 Use the following pieces of context from the repository to answer the question. 
@@ -44,47 +41,48 @@ If the context is insufficient, state what additional information would be neede
 
 Answer:"""
         
-        prompt = ChatPromptTemplate.from_template(prompt_template)
-        
-        retriever = self.vector_store.store.as_retriever(
-            search_kwargs={"k": 5}
-        )
-        
-        def format_docs(docs):
-            return "\n\n".join(doc.page_content for doc in docs)
-        
-        # Create a chain that properly extracts question from input
-        from langchain_core.runnables import RunnableLambda
-        
-        def extract_question(input_data):
-            """Extract question string from input (handles both dict and string)"""
-            if isinstance(input_data, dict):
-                return input_data.get("question", "")
-            return str(input_data)
-        
-        # Chain: extract question -> retrieve -> format -> prompt -> LLM -> parse
-        self.qa_chain = (
-            {
-                "context": RunnableLambda(extract_question) | retriever | format_docs,
-                "question": RunnableLambda(extract_question)
-            }
-            | prompt
-            | self.llm
-            | StrOutputParser()
-        )
+        self.prompt = ChatPromptTemplate.from_template(prompt_template)
     
+    def _format_docs(self, docs: List[Document]) -> str:
+        """Join retrieved documents into a prompt context"""
+        return "\n\n".join(doc.page_content for doc in docs)
+    
+    @timed("chain.qa")
     def answer_question(self, request: QuestionRequest) -> QuestionResponse:
         """Answer a repository question"""
         logger.info(f"Processing question: {request.question}")
         
+        # Coarse-to-fine: pick the best files from the summary index, then search chunks within them
+        query_embedding = None
+        candidate_files: List[str] = []
+        overviews: List[Document] = []
+        if self.settings.hierarchical_retrieval:
+            query_embedding = self.vector_store.embed_query(request.question)
+            candidate_files, overviews = self.vector_store.select_files(
+                request.question,
+                top_files=self.settings.hierarchical_top_files,
+                query_embedding=query_embedding,
+                max_directories=self.settings.hierarchical_directory_overviews
+            )
+        
         # Retrieve relevant documents
-        docs = self.vector_store.similarity_search(
+        docs, selection = self.vector_store.retrieve_with_selection(
             request.question,
-            k=request.max_results
+            k=request.max_results,
+            query_embedding=query_embedding,
+            file_paths=candidate_files or None
         )
         
-        # Run QA chain (pass as dict for LCEL)
-        answer = self.qa_chain.invoke({"question": request.question})
+        # Answer from the retrieved evidence (single retrieval, routed model)
+        answer = self.router.invoke(
+            "qa",
+            self.prompt,
+            {
+                "context": self._format_docs(overviews + docs),
+                "question": request.question
+            },
+            accept=non_empty_acceptor
+        )
         
         # Extract evidence
         chunks = [doc.page_content for doc in docs]
@@ -98,13 +96,15 @@ Answer:"""
             file_paths=file_paths,
             metadata={
                 "num_results": len(docs),
-                "query": request.question
+                "query": request.question,
+                "candidate_files": candidate_files,
+                "retrieval": selection
             }
         )
         
         # Analyze dependencies and modules
         related_modules = self._extract_modules(file_paths)
-        dependencies = self._extract_dependencies(chunks)
+        dependencies = self._extract_dependencies(chunks, file_paths)
         
         analysis = AnalysisResult(
             reasoning=answer,
@@ -129,8 +129,12 @@ Answer:"""
                 modules.add(parts[0])
         return sorted(list(modules))
     
-    def _extract_dependencies(self, chunks: List[str]) -> List[str]:
-        """Extract dependency mentions from chunks"""
+    def _extract_dependencies(self, chunks: List[str], file_paths: List[str]) -> List[str]:
+        """Import-graph edges of the retrieved files, falling back to keyword lines in chunks"""
+        graph_dependencies = self.dependency_index.describe_dependencies(file_paths)
+        if graph_dependencies:
+            return graph_dependencies
+        
         dependencies = set()
         keywords = ["import", "from", "depends", "requires", "uses"]
         
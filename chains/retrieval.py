@@ -0,0 +1,12 @@
+from models.schemas import ChangeRequest
+
+
+def build_change_search_query(request: ChangeRequest) -> str:
+    """Build the retrieval query shared by the validation and impact chains"""
+    search_terms = [
+        request.description,
+        request.feature_type
+    ]
+    if request.target_modules:
+        search_terms.extend(request.target_modules)
+    return " ".join(search_terms)
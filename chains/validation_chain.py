@@ -1,9 +1,10 @@
-from typing import List
-from langchain_openai import ChatOpenAI
+from typing import List, Optional
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 
+from chains.llm_router import get_llm_router, json_confidence_acceptor
+from chains.retrieval import build_change_search_query
 from embeddings.vector_store import get_vector_store
+from loaders.dependency_graph import get_dependency_index
 from models.schemas import (
     ChangeRequest,
     ChangeValidationResponse,
@@ -12,6 +13,7 @@ from models.schemas import (
 )
 from utils.logger import get_logger
 from utils.config import get_settings
+from utils.metrics import timed
 
 logger = get_logger()
 
@@ -21,12 +23,9 @@ class ChangeValidationChain:
     
     def __init__(self):
         self.settings = get_settings()
-        self.llm = ChatOpenAI(
-            model="gpt-4",
-            temperature=0,
-            openai_api_key=self.settings.openai_api_key
-        )
+        self.router = get_llm_router()
         self.vector_store = get_vector_store()
+        self.dependency_index = get_dependency_index()
         self._setup_chain()
     
     def _setup_chain(self):
@@ -53,26 +52,33 @@ Respond in JSON format:
     "reasoning": "detailed explanation",
     "conflicts": ["list of conflicts"],
     "duplicates": ["list of duplicate features"],
-    "contradictions": ["list of contradictions"]
+    "contradictions": ["list of contradictions"],
+    "confidence": 0.0-1.0
 }}
 
 Response:"""
         
         self.prompt = ChatPromptTemplate.from_template(prompt_template)
-        
-        self.chain = self.prompt | self.llm | StrOutputParser()
+        self.accept = json_confidence_acceptor(self.settings.llm_cascade_min_confidence)
     
-    def validate_change(self, request: ChangeRequest) -> ChangeValidationResponse:
-        """Validate a change request"""
+    @timed("chain.validation")
+    def validate_change(
+        self,
+        request: ChangeRequest,
+        query_embedding: Optional[List[float]] = None
+    ) -> ChangeValidationResponse:
+        """Validate a change request (optionally reusing a precomputed query embedding)"""
         logger.info(f"Validating change request: {request.description}")
         
         # Build search query
-        search_query = f"{request.description} {request.feature_type}"
-        if request.target_modules:
-            search_query += " " + " ".join(request.target_modules)
+        search_query = build_change_search_query(request)
         
         # Retrieve relevant documents
-        docs = self.vector_store.similarity_search(search_query, k=10)
+        docs, selection = self.vector_store.retrieve_with_selection(
+            search_query,
+            k=10,
+            query_embedding=query_embedding
+        )
         context = "\n\n".join([doc.page_content for doc in docs])
         
         # Prepare change request text
@@ -84,10 +90,15 @@ Business Rules: {request.business_rules or 'Not specified'}
 """
         
         # Run validation chain
-        result = self.chain.invoke({
-            "change_request": change_text,
-            "context": context
-        })
+        result = self.router.invoke(
+            "validation",
+            self.prompt,
+            {
+                "change_request": change_text,
+                "context": context
+            },
+            accept=self.accept
+        )
         
         # Parse result (simplified - in production, use structured output)
         validation_result = self._parse_validation_result(result)
@@ -104,7 +115,8 @@ Business Rules: {request.business_rules or 'Not specified'}
             file_paths=file_paths,
             metadata={
                 "change_type": request.feature_type,
-                "num_results": len(docs)
+                "num_results": len(docs),
+                "retrieval": selection
             }
         )
         
@@ -118,7 +130,7 @@ Business Rules: {request.business_rules or 'Not specified'}
             reasoning=validation_result.get("reasoning", ""),
             confidence=0.8 if validation_result.get("is_valid") else 0.9,
             related_modules=related_modules,
-            dependencies=self._extract_dependencies(chunks)
+            dependencies=self._extract_dependencies(chunks, file_paths)
         )
         
         return ChangeValidationResponse(
@@ -131,6 +143,7 @@ Business Rules: {request.business_rules or 'Not specified'}
             contradictions=validation_result.get("contradictions", [])
         )
     
+    @timed("parse.validation")
     def _parse_validation_result(self, result: str) -> dict:
         """Parse LLM validation result"""
         import json
@@ -177,8 +190,12 @@ Business Rules: {request.business_rules or 'Not specified'}
                 modules.add(parts[0])
         return sorted(list(modules))
     
-    def _extract_dependencies(self, chunks: List[str]) -> List[str]:
-        """Extract dependency mentions"""
+    def _extract_dependencies(self, chunks: List[str], file_paths: List[str]) -> List[str]:
+        """Import-graph edges of the retrieved files, falling back to import lines in chunks"""
+        graph_dependencies = self.dependency_index.describe_dependencies(file_paths)
+        if graph_dependencies:
+            return graph_dependencies
+        
         dependencies = set()
         for chunk in chunks:
             if "import" in chunk or "from" in chunk:
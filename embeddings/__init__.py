@@ -1,4 +1,18 @@
-from .vector_store import VectorStore, get_vector_store
+from .vector_store import VectorStore, get_vector_store, create_embeddings, LexicalReranker, CrossEncoderReranker
 
-__all__ = ["VectorStore", "get_vector_store"]
+__all__ = [
+    "VectorStore",
+    "get_vector_store",
+    "create_embeddings",
+    "LocalEmbeddings",
+    "LexicalReranker",
+    "CrossEncoderReranker"
+]
 
+
+def __getattr__(name):
+    # Imported on first use, so deployments without local embeddings never load the module
+    if name == "LocalEmbeddings":
+        from .local_embeddings import LocalEmbeddings
+        return LocalEmbeddings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,42 @@
+"""Adaptive top-k: how many retrieved chunks to keep, from the shape of their score list"""
+from typing import Optional, Sequence, Tuple
+
+
+def select_k(
+    scores: Sequence[float],
+    min_k: int,
+    max_k: int,
+    min_score: Optional[float] = None,
+    knee_factor: Optional[float] = None
+) -> Tuple[int, str]:
+    """
+    Number of leading results to keep from scores sorted best-first
+
+    Stops before the first score below min_score, or at the first drop between
+    neighbours that is at least knee_factor times the average drop across the list
+    (a "knee"; scale-free, so it also works on re-ranker scores). The result is
+    clamped to [min_k, max_k] and to the number of scores.
+
+    Returns:
+        (k, reason) where reason is "threshold", "knee", "min_k", "max_k" or "exhausted"
+    """
+    n = min(len(scores), max_k)
+    floor = min(max(1, min_k), n)
+    k, reason = n, ("max_k" if len(scores) >= max_k else "exhausted")
+
+    if min_score is not None:
+        below = next((i for i in range(n) if scores[i] < min_score), n)
+        if below < k:
+            k, reason = below, "threshold"
+
+    if knee_factor and n > 2:
+        average_drop = (scores[0] - scores[n - 1]) / (n - 1)
+        if average_drop > 0:
+            for i in range(max(floor, 1), k):
+                if scores[i - 1] - scores[i] >= knee_factor * average_drop:
+                    k, reason = i, "knee"
+                    break
+
+    if k < floor:
+        k, reason = floor, "min_k"
+    return k, reason
@@ -0,0 +1,119 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+LOCAL_BACKENDS = ("torch", "onnx")
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    In-process sentence-transformers encoder (optional dependency)
+
+    Documents are encoded in batches spread over a small thread pool (the torch and
+    ONNX Runtime kernels release the GIL); queries are encoded directly on the caller's
+    thread. Embeddings are L2-normalised so cosine distance in pgvector matches.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        dimensions: Optional[int] = None,
+        device: str = "cpu",
+        backend: str = "torch",
+        batch_size: int = 64,
+        workers: int = 2
+    ):
+        """
+        Args:
+            model_name: sentence-transformers model name or local path
+            dimensions: Output size (must match the table schema); embeddings are truncated
+                to it, which only preserves quality for Matryoshka-trained models
+            device: torch device ("cpu", "cuda", ...)
+            backend: "torch" or "onnx" (ONNX Runtime; needs sentence-transformers>=3.2)
+            batch_size: Texts per encode call
+            workers: Threads encoding batches concurrently
+        """
+        if backend not in LOCAL_BACKENDS:
+            raise ValueError(f"Unknown local embedding backend '{backend}'. Expected one of: {', '.join(LOCAL_BACKENDS)}")
+        self.model_name = model_name
+        self.device = device
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self._requested_dimensions = dimensions
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def model(self):
+        """The encoder, loaded on first use"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "sentence-transformers is required for EMBEDDING_PROVIDER=local. "
+                "Install it with: pip install sentence-transformers"
+            ) from e
+        kwargs = {"device": self.device}
+        if self.backend != "torch":
+            kwargs["backend"] = self.backend
+        if self._requested_dimensions:
+            kwargs["truncate_dim"] = self._requested_dimensions
+        logger.info(f"Loading local embedding model {self.model_name} ({self.backend}, {self.device})")
+        model = SentenceTransformer(self.model_name, **kwargs)
+
+        native = model.get_sentence_embedding_dimension()
+        if self._requested_dimensions and native and self._requested_dimensions > native:
+            raise ValueError(
+                f"EMBEDDING_DIMENSIONS={self._requested_dimensions} exceeds the "
+                f"{native} dimensions produced by {self.model_name}"
+            )
+        return model
+
+    @property
+    def dimensions(self) -> int:
+        """Size of the produced embeddings"""
+        return self._requested_dimensions or self.model.get_sentence_embedding_dimension()
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return vectors.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in batches across the thread pool, preserving order"""
+        if not texts:
+            return []
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1 or self.workers == 1:
+            results = [self._encode(batch) for batch in batches]
+        else:
+            if self._pool is None:
+                with self._model_lock:
+                    if self._pool is None:
+                        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="embed")
+            results = list(self._pool.map(self._encode, batches))
+        return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query in-process"""
+        return self._encode([text])[0]
@@ -0,0 +1,314 @@
+import json
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore as LangChainVectorStore
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def check_dimensions(dimensions: int, expected: int):
+    """Reject embeddings whose size differs from the index (e.g. after switching models)"""
+    if dimensions != expected:
+        raise ValueError(
+            f"Embedding has {dimensions} dimensions but the index holds {expected}-dimensional "
+            f"vectors; re-index after changing EMBEDDING_PROVIDER / EMBEDDING_MODEL"
+        )
+
+
+def metadata_matches(metadata: Dict[str, Any], filter: Optional[dict]) -> bool:
+    """JSONB-style containment check (metadata @> filter) for flat filters; list values match any member"""
+    if not filter:
+        return True
+    return all(
+        metadata.get(key) in value if isinstance(value, list) else metadata.get(key) == value
+        for key, value in filter.items()
+    )
+
+
+def version_visible(metadata: Dict[str, Any], active: Dict[str, str]) -> bool:
+    """Blue/green visibility: the repository's active build, or unversioned rows of never-promoted repositories"""
+    version = metadata.get("index_version")
+    if version is None:
+        return metadata.get("repository") not in active
+    return active.get(metadata.get("repository")) == version
+
+
+def chunk_key(metadata: Dict[str, Any]) -> tuple:
+    """Identity of a chunk within one build: (repository, file_path, index_version, chunk_index)"""
+    return (
+        metadata.get("repository"),
+        metadata.get("file_path"),
+        metadata.get("index_version"),
+        metadata.get("chunk_index"),
+    )
+
+
+class LocalVectorStore(LangChainVectorStore):
+    """
+    In-process vector backend (NumPy, cosine similarity)
+
+    Mirrors the subset of the SupabaseVectorStore API used by VectorStore so it can
+    stand in for Supabase in offline runs, benchmarks and local development.
+    Optionally persists to a directory as embeddings.npy + documents.jsonl.
+    With active_versions set (repository -> active build), searches only see rows that
+    are visible under blue/green index versioning.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        persist_path: Optional[str] = None,
+        active_versions: Optional[Callable[[], Dict[str, str]]] = None
+    ):
+        self._embedding = embedding
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.active_versions = active_versions
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._vectors: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._visible: Optional[np.ndarray] = None
+        self._visible_key: Optional[tuple] = None
+        self._positions: Optional[Dict[tuple, int]] = None
+        self._lock = threading.Lock()
+
+        if self.persist_path and (self.persist_path / "documents.jsonl").exists():
+            self.load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        persist: bool = True,
+        **kwargs: Any
+    ) -> List[str]:
+        """Embed and add texts (persist=False defers save(), as for add_vectors)"""
+        texts = list(texts)
+        vectors = self._embedding.embed_documents(texts)
+        return self.add_vectors(texts, metadatas, vectors, ids=ids, persist=persist)
+
+    def add_vectors(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[dict]],
+        vectors: List[List[float]],
+        ids: Optional[List[str]] = None,
+        persist: bool = True
+    ) -> List[str]:
+        """Add texts with precomputed embeddings (persist=False defers save() for bulk loads)"""
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        vectors = [np.asarray(v, dtype=np.float32) for v in vectors]
+        with self._lock:
+            if vectors and self._vectors:
+                check_dimensions(len(vectors[0]), len(self._vectors[0]))
+            self._ids.extend(ids)
+            self._texts.extend(texts)
+            self._metadatas.extend(metadatas)
+            self._vectors.extend(vectors)
+            self._matrix = None
+            self._visible = None
+            self._positions = None
+        if persist and self.persist_path:
+            self.save()
+        return ids
+
+    def _normalized_matrix(self) -> np.ndarray:
+        """Row-normalized embedding matrix (built lazily after inserts; call with the lock held)"""
+        if self._matrix is None:
+            if not self._vectors:
+                self._matrix = np.zeros((0, 0), dtype=np.float32)
+            else:
+                matrix = np.vstack(self._vectors)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                self._matrix = matrix / norms
+        return self._matrix
+
+    def _visible_mask(self, active: Optional[Dict[str, str]]) -> Optional[np.ndarray]:
+        """Rows visible under the active versions (None: not versioned; call with the lock held)"""
+        if active is None:
+            return None
+        key = tuple(sorted(active.items()))
+        if self._visible is None or self._visible_key != key:
+            self._visible = np.array([version_visible(m, active) for m in self._metadatas], dtype=bool)
+            self._visible_key = key
+        return self._visible
+
+    def _snapshot(self) -> tuple:
+        """(matrix, visible mask, texts, metadatas) read under one lock, so they stay aligned"""
+        active = self.active_versions() if self.active_versions is not None else None
+        with self._lock:
+            return self._normalized_matrix(), self._visible_mask(active), self._texts, self._metadatas
+
+    def get_chunks(self, keys: Iterable[tuple]) -> List[Document]:
+        """Documents for the given chunk_key() tuples (missing keys are skipped)"""
+        with self._lock:
+            if self._positions is None:
+                self._positions = {chunk_key(m): i for i, m in enumerate(self._metadatas)}
+            rows = [self._positions[key] for key in keys if key in self._positions]
+            return [Document(page_content=self._texts[i], metadata=dict(self._metadatas[i])) for i in rows]
+
+    def get_rows(self, predicate: Callable[[Dict[str, Any]], bool]) -> List[tuple[Document, np.ndarray]]:
+        """(document, embedding) for every row whose metadata matches predicate"""
+        with self._lock:
+            return [
+                (Document(page_content=self._texts[i], metadata=dict(metadata)), self._vectors[i])
+                for i, metadata in enumerate(self._metadatas)
+                if predicate(metadata)
+            ]
+
+    def delete_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """Remove rows whose metadata matches predicate; returns the number removed"""
+        with self._lock:
+            keep = [i for i, metadata in enumerate(self._metadatas) if not predicate(metadata)]
+            removed = len(self._ids) - len(keep)
+            if removed:
+                self._ids = [self._ids[i] for i in keep]
+                self._texts = [self._texts[i] for i in keep]
+                self._metadatas = [self._metadatas[i] for i in keep]
+                self._vectors = [self._vectors[i] for i in keep]
+                self._matrix = None
+                self._visible = None
+                self._positions = None
+        if removed and self.persist_path:
+            self.save()
+        return removed
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self,
+        query: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any
+    ) -> List[tuple[Document, float]]:
+        """Cosine-similarity search over all rows matching the metadata filter"""
+        matrix, visible, texts, metadatas = self._snapshot()
+        if matrix.shape[0] == 0:
+            return []
+
+        q = np.asarray(query, dtype=np.float32)
+        check_dimensions(q.shape[0], matrix.shape[1])
+        q_norm = np.linalg.norm(q) or 1.0
+        scores = matrix @ (q / q_norm)
+
+        n = matrix.shape[0]  # Rows appended after the snapshot are ignored
+        if visible is not None:
+            scores = np.where(visible[:n], scores, -np.inf)
+        if filter:
+            mask = np.array([metadata_matches(m, filter) for m in metadatas[:n]])
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (Document(page_content=texts[i], metadata=dict(metadatas[i])), float(scores[i]))
+            for i in top
+            if np.isfinite(scores[i])
+        ]
+
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        """Search by precomputed embedding"""
+        return [doc for doc, _ in self.similarity_search_by_vector_with_relevance_scores(embedding, k, filter)]
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        """Embed a query and search"""
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k, filter)
+
+    def similarity_search_with_relevance_scores(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any
+    ) -> List[tuple[Document, float]]:
+        """Embed a query and search with scores"""
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self._embedding.embed_query(query), k, filter
+        )
+
+    def iter_rows(self, batch_size: int = 10000) -> Iterator[tuple]:
+        """(ids, texts, metadatas, vectors) batches over every row"""
+        with self._lock:
+            total = len(self._ids)
+        for start in range(0, total, batch_size):
+            end = min(start + batch_size, total)
+            with self._lock:
+                batch = (
+                    self._ids[start:end],
+                    self._texts[start:end],
+                    self._metadatas[start:end],
+                    np.vstack(self._vectors[start:end]),
+                )
+            yield batch
+
+    def save(self):
+        """Persist rows to persist_path"""
+        if not self.persist_path:
+            return
+        self.persist_path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            np.save(self.persist_path / "embeddings.npy", np.vstack(self._vectors) if self._vectors else np.zeros((0, 0)))
+            with open(self.persist_path / "documents.jsonl", "w", encoding="utf-8") as f:
+                for row_id, text, metadata in zip(self._ids, self._texts, self._metadatas):
+                    f.write(json.dumps({"id": row_id, "content": text, "metadata": metadata}) + "\n")
+
+    def load(self):
+        """Load rows from persist_path"""
+        matrix = np.load(self.persist_path / "embeddings.npy")
+        ids, texts, metadatas = [], [], []
+        with open(self.persist_path / "documents.jsonl", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                ids.append(row["id"])
+                texts.append(row["content"])
+                metadatas.append(row.get("metadata") or {})
+        with self._lock:
+            self._ids, self._texts, self._metadatas = ids, texts, metadatas
+            self._vectors = list(matrix.astype(np.float32)) if len(ids) else []
+            self._matrix = None
+            self._visible = None
+            self._positions = None
+        logger.info(f"Loaded {len(ids)} rows from local index: {self.persist_path}")
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any
+    ) -> "LocalVectorStore":
+        store = cls(embedding, persist_path=kwargs.get("persist_path"))
+        store.add_texts(texts, metadatas)
+        return store
@@ -0,0 +1,158 @@
+"""
+Bulk ingest into an embeddings table over a direct Postgres connection
+
+Rows are streamed with COPY into a session-local staging table and merged into the
+target table with one INSERT ... SELECT ... ON CONFLICT, instead of going through
+PostgREST as JSON. COPY uses the binary format when pgvector's psycopg adapters are
+installed (`pip install pgvector`) and the text format otherwise.
+"""
+import json
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+from utils.db import get_pg_pool, vector_literal
+from utils.logger import get_logger
+from utils.metrics import observe_stage
+
+logger = get_logger()
+
+STAGE_TABLE = "_embeddings_stage"
+ON_CONFLICT = ("update", "nothing")
+
+
+def embedding_column_type(conn, table: str) -> str:
+    """Declared type of the embedding column, e.g. vector(1536) or halfvec(512)"""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = %s::regclass AND attname = 'embedding'",
+            (table,)
+        )
+        row = cur.fetchone()
+    if row is None:
+        raise ValueError(f"Table {table} has no embedding column")
+    return row[0]
+
+
+def has_vector_adapters(conn) -> bool:
+    """Whether pgvector's adapters are registered on the connection (required for binary COPY)"""
+    return conn.adapters.types.get("vector") is not None
+
+
+def copy_rows(
+    conn,
+    table: str,
+    ids: Sequence[str],
+    contents: Sequence[str],
+    metadatas: Sequence[Dict[str, Any]],
+    vectors: Sequence[Sequence[float]],
+    column_type: Optional[str] = None,
+    on_conflict: str = "update"
+) -> int:
+    """
+    COPY rows into the staging table and merge them into table in one transaction
+
+    Args:
+        column_type: Embedding column type (looked up when None)
+        on_conflict: "update" overwrites rows with the same id, "nothing" keeps existing rows
+
+    Returns:
+        Number of rows inserted or updated
+    """
+    if on_conflict not in ON_CONFLICT:
+        raise ValueError(f"Unknown on_conflict '{on_conflict}'. Expected one of: {', '.join(ON_CONFLICT)}")
+    if not ids:
+        return 0
+    column_type = column_type or embedding_column_type(conn, table)
+    binary = has_vector_adapters(conn)
+    conflict = (
+        "DO UPDATE SET content = EXCLUDED.content, metadata = EXCLUDED.metadata, embedding = EXCLUDED.embedding"
+        if on_conflict == "update" else "DO NOTHING"
+    )
+
+    with conn.transaction(), conn.cursor() as cur:
+        # Session-local and emptied at commit, so pooled connections reuse it safely
+        cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} "
+            f"(id uuid, content text, metadata jsonb, embedding vector) ON COMMIT DELETE ROWS"
+        )
+        with observe_stage("pg_copy"):
+            if binary:
+                from psycopg.types.json import Jsonb
+                with cur.copy(
+                    f"COPY {STAGE_TABLE} (id, content, metadata, embedding) FROM STDIN (FORMAT BINARY)"
+                ) as copy:
+                    copy.set_types(["uuid", "text", "jsonb", "vector"])
+                    for row_id, content, metadata, vector in zip(ids, contents, metadatas, vectors):
+                        copy.write_row((
+                            uuid.UUID(str(row_id)),
+                            content,
+                            Jsonb(metadata or {}),
+                            np.asarray(vector, dtype=np.float32)
+                        ))
+            else:
+                with cur.copy(f"COPY {STAGE_TABLE} (id, content, metadata, embedding) FROM STDIN") as copy:
+                    for row_id, content, metadata, vector in zip(ids, contents, metadatas, vectors):
+                        copy.write_row((
+                            str(row_id),
+                            content,
+                            json.dumps(metadata or {}, default=str),
+                            vector_literal(vector)
+                        ))
+        with observe_stage("pg_merge"):
+            cur.execute(
+                f"INSERT INTO {table} (id, content, metadata, embedding) "
+                f"SELECT id, content, metadata, embedding::{column_type} FROM {STAGE_TABLE} "
+                f"ON CONFLICT (id) {conflict}"
+            )
+            return cur.rowcount
+
+
+class PostgresBulkLoader:
+    """Writes embedded documents to one table through a pooled connection with COPY"""
+
+    def __init__(self, table: str, dsn: Optional[str] = None, pool_size: int = 4):
+        self.table = table
+        self.pool = get_pg_pool(dsn, max_size=pool_size)
+        self._column_type: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _get_column_type(self, conn) -> str:
+        with self._lock:
+            if self._column_type is None:
+                self._column_type = embedding_column_type(conn, self.table)
+            return self._column_type
+
+    def add_rows(
+        self,
+        ids: Sequence[str],
+        contents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        vectors: Sequence[Sequence[float]],
+        on_conflict: str = "update"
+    ) -> int:
+        """COPY and merge one batch of rows"""
+        with self.pool.connection() as conn:
+            return copy_rows(
+                conn, self.table, ids, contents, metadatas, vectors,
+                column_type=self._get_column_type(conn), on_conflict=on_conflict
+            )
+
+    def add_documents(self, documents: List[Document], vectors: Sequence[Sequence[float]]) -> List[str]:
+        """Store documents with their precomputed embeddings; returns the new row ids"""
+        ids = [str(uuid.uuid4()) for _ in documents]
+        rows = self.add_rows(
+            ids,
+            [doc.page_content for doc in documents],
+            [doc.metadata for doc in documents],
+            vectors
+        )
+        logger.info(f"Copied {rows} rows into {self.table}")
+        return ids
+
+    def close(self):
+        self.pool.close()
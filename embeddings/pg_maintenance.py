@@ -0,0 +1,223 @@
+"""Inspection, rebuild and benchmark helpers for the Postgres embeddings table"""
+import time
+from typing import Dict, List, Optional
+
+from embeddings.schema_sql import hnsw_index_sql, index_name
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/mean in milliseconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))] * 1000, 3)
+
+    return {
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "samples": len(ordered),
+    }
+
+
+def current_layout(conn, table: str) -> Dict[str, object]:
+    """Column type, dimensionality and storage mode of the embedding column"""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = %s::regclass AND attname = 'embedding'",
+            (table,)
+        )
+        row = cur.fetchone()
+        if row is None:
+            raise ValueError(f"Table {table} has no embedding column")
+        column_type = row[0]
+        cur.execute(f"SELECT vector_dims(embedding::vector) FROM {table} WHERE embedding IS NOT NULL LIMIT 1")
+        dims_row = cur.fetchone()
+        cur.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s", (index_name(table),))
+        index_row = cur.fetchone()
+    dimensions = dims_row[0] if dims_row else None
+    if dimensions is None and "(" in column_type:
+        dimensions = int(column_type.split("(", 1)[1].rstrip(")"))
+    index_def = index_row[0] if index_row else None
+
+    if column_type.startswith("halfvec"):
+        storage = "halfvec"
+    elif index_def and "binary_quantize" in index_def:
+        storage = "binary"
+    else:
+        storage = "vector"
+    return {"column_type": column_type, "dimensions": dimensions, "storage": storage, "index_def": index_def}
+
+
+def storage_report(conn, table: str) -> Dict[str, object]:
+    """Table/index sizes and row count"""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT pg_total_relation_size(%s::regclass), pg_relation_size(%s::regclass), "
+            "COALESCE(pg_relation_size(to_regclass(%s)), 0)",
+            (table, table, index_name(table))
+        )
+        total_bytes, heap_bytes, index_bytes = cur.fetchone()
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        rows = cur.fetchone()[0]
+    return {
+        "rows": rows,
+        "table_total_mb": round(total_bytes / 1024 / 1024, 2),
+        "table_heap_mb": round(heap_bytes / 1024 / 1024, 2),
+        "hnsw_index_mb": round(index_bytes / 1024 / 1024, 2),
+        "bytes_per_row": round(heap_bytes / rows, 1) if rows else None,
+    }
+
+
+def health_report(conn, table: str) -> Dict[str, object]:
+    """Dead tuples and last vacuum/analyze times from pg_stat_user_tables"""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT n_live_tup, n_dead_tup, last_vacuum, last_autovacuum, last_analyze, last_autoanalyze "
+            "FROM pg_stat_user_tables WHERE relid = %s::regclass",
+            (table,)
+        )
+        row = cur.fetchone()
+    if row is None:
+        return {}
+    keys = ("live_tuples", "dead_tuples", "last_vacuum", "last_autovacuum", "last_analyze", "last_autoanalyze")
+    return {key: (value.isoformat() if hasattr(value, "isoformat") else value) for key, value in zip(keys, row)}
+
+
+def repository_counts(conn, table: str) -> List[Dict[str, object]]:
+    """Row count and approximate share of the HNSW index per repository"""
+    with conn.cursor() as cur:
+        cur.execute(
+            f"SELECT COALESCE(metadata->>'repository', '(unknown)') AS repository, COUNT(*) "
+            f"FROM {table} GROUP BY 1 ORDER BY 2 DESC"
+        )
+        rows = cur.fetchall()
+        cur.execute("SELECT COALESCE(pg_relation_size(to_regclass(%s)), 0)", (index_name(table),))
+        index_bytes = cur.fetchone()[0]
+    total = sum(count for _, count in rows)
+    return [
+        {
+            "repository": repository,
+            "rows": count,
+            "approx_index_mb": round(index_bytes * count / total / 1024 / 1024, 2) if total else 0.0,
+        }
+        for repository, count in rows
+    ]
+
+
+def rebuild_index(
+    conn,
+    table: str,
+    storage: str,
+    dimensions: int,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    concurrently: bool = False,
+    maintenance_work_mem: Optional[str] = None
+) -> float:
+    """
+    Rebuild the HNSW index with the given parameters; returns build seconds
+
+    concurrently builds a replacement index next to the old one and swaps it in, so
+    searches keep working during the rebuild (requires an autocommit connection).
+    """
+    name = index_name(table)
+    with conn.cursor() as cur:
+        if maintenance_work_mem:
+            cur.execute("SELECT set_config('maintenance_work_mem', %s, false)", (maintenance_work_mem,))
+        start = time.perf_counter()
+        if concurrently:
+            new_name = f"{name}_rebuild"
+            cur.execute(f"DROP INDEX IF EXISTS {new_name}")
+            cur.execute(hnsw_index_sql(table, storage, dimensions, m, ef_construction, name=new_name, concurrently=True))
+            build_s = time.perf_counter() - start
+            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            cur.execute(f"ALTER INDEX {new_name} RENAME TO {name}")
+        else:
+            with conn.transaction():
+                cur.execute(f"DROP INDEX IF EXISTS {name}")
+                cur.execute(hnsw_index_sql(table, storage, dimensions, m, ef_construction))
+            build_s = time.perf_counter() - start
+    logger.info(f"Rebuilt {name} in {build_s:.1f}s")
+    return build_s
+
+
+def vacuum_analyze(conn, table: str, full: bool = False):
+    """VACUUM (ANALYZE) the embeddings table (requires an autocommit connection)"""
+    options = "FULL, ANALYZE" if full else "ANALYZE"
+    with conn.cursor() as cur:
+        cur.execute(f"VACUUM ({options}) {table}")
+
+
+def sample_query_vectors(conn, table: str, count: int) -> List[str]:
+    """Random stored embeddings (pgvector text form) to use as benchmark queries"""
+    with conn.cursor() as cur:
+        cur.execute(
+            f"SELECT embedding::vector::text FROM {table} WHERE embedding IS NOT NULL "
+            f"ORDER BY random() LIMIT %s",
+            (count,)
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+def measure_queries(conn, vectors: List[str], k: int, ef_search: Optional[int] = None) -> Dict[str, object]:
+    """match_documents latency (and returned ids) for the given query vectors"""
+    samples: List[float] = []
+    results: List[List[str]] = []
+    with conn.cursor() as cur:
+        for vector in vectors:
+            start = time.perf_counter()
+            cur.execute(
+                "SELECT id FROM match_documents(%s::vector, %s, '{}'::jsonb, %s)",
+                (vector, k, ef_search)
+            )
+            ids = [str(row[0]) for row in cur.fetchall()]
+            samples.append(time.perf_counter() - start)
+            results.append(ids)
+    return {"latency": latency_summary(samples), "ids": results}
+
+
+def exact_neighbours(conn, table: str, vectors: List[str], k: int) -> List[List[str]]:
+    """Ground-truth top-k by full-precision cosine distance (sequential scan)"""
+    neighbours = []
+    with conn.cursor() as cur:
+        for vector in vectors:
+            cur.execute(
+                f"SELECT id FROM {table} WHERE embedding IS NOT NULL "
+                f"ORDER BY embedding::vector <=> %s::vector LIMIT %s",
+                (vector, k)
+            )
+            neighbours.append([str(row[0]) for row in cur.fetchall()])
+    return neighbours
+
+
+def sweep_ef_search(
+    conn,
+    table: str,
+    ef_values: List[int],
+    queries: int = 50,
+    k: int = 10
+) -> List[Dict[str, object]]:
+    """Recall@k against exact search and latency for each ef_search value"""
+    vectors = sample_query_vectors(conn, table, queries)
+    if not vectors:
+        return []
+    truth = exact_neighbours(conn, table, vectors, k)
+    results = []
+    for ef in ef_values:
+        measured = measure_queries(conn, vectors, k, ef_search=ef)
+        hits = sum(len(set(found) & set(expected)) for found, expected in zip(measured["ids"], truth))
+        expected_total = sum(len(expected) for expected in truth)
+        results.append({
+            "ef_search": ef,
+            "recall_at_k": round(hits / expected_total, 4) if expected_total else None,
+            **measured["latency"],
+        })
+        logger.info(f"ef_search={ef}: recall@{k}={results[-1]['recall_at_k']} p50={results[-1].get('p50_ms')}ms")
+    return results
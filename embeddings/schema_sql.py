@@ -0,0 +1,265 @@
+"""SQL generators for the embeddings table, its HNSW index and match_documents"""
+from typing import Optional
+
+STORAGE_MODES = ("vector", "halfvec", "binary")
+
+# Active build per repository (blue/green index versions, Step 8 of schema.sql)
+INDEX_VERSIONS_TABLE_SQL = """CREATE TABLE IF NOT EXISTS repository_index_versions (
+    repository TEXT PRIMARY KEY,
+    active_version TEXT NOT NULL,
+    previous_version TEXT,
+    promoted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+)"""
+
+# Called by the match functions before their HNSW scan. The version filter runs after the
+# scan, and the retained previous build duplicates every unchanged chunk, so ef_search is
+# raised to twice the candidates needed (capped at pgvector's 1000). With pgvector >= 0.8,
+# iterative scans keep searching when too few candidates survive the filter.
+HNSW_SEARCH_SETUP_SQL = """CREATE OR REPLACE FUNCTION prepare_hnsw_search(candidates int, ef_search int DEFAULT NULL)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  pgvector_version int[] := (SELECT string_to_array(extversion, '.')::int[] FROM pg_extension WHERE extname = 'vector');
+BEGIN
+  PERFORM set_config('hnsw.ef_search', LEAST(1000, GREATEST(
+    COALESCE(ef_search, NULLIF(current_setting('hnsw.ef_search', true), '')::int, 40),
+    2 * candidates
+  ))::text, true);
+  IF pgvector_version >= ARRAY[0, 8] THEN
+    PERFORM set_config('hnsw.iterative_scan', 'strict_order', true);
+  END IF;
+END;
+$$"""
+
+# Loaded once per call as {repository: active_version}; the table holds one row per repository
+_VERSION_DECLARE = """DECLARE
+  active_versions jsonb := (SELECT COALESCE(jsonb_object_agg(v.repository, v.active_version), '{}'::jsonb)
+                            FROM repository_index_versions v);
+"""
+
+
+def _check_storage(storage: str):
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Unknown vector storage '{storage}'. Expected one of: {', '.join(STORAGE_MODES)}")
+
+
+def embedding_column_type(storage: str, dimensions: int) -> str:
+    """Column type for the embedding (binary mode keeps full precision for re-scoring)"""
+    _check_storage(storage)
+    return f"halfvec({dimensions})" if storage == "halfvec" else f"vector({dimensions})"
+
+
+def visible_version_sql(alias: str) -> str:
+    """
+    Row filter for blue/green builds: rows whose version is the active version of their own
+    repository, plus unversioned (pre-versioning) rows of repositories that have never
+    promoted a build
+    """
+    return (
+        f"(active_versions->>({alias}.metadata->>'repository') = {alias}.metadata->>'index_version'\n"
+        f"       OR ({alias}.metadata->>'index_version' IS NULL\n"
+        f"           AND NOT active_versions ? COALESCE({alias}.metadata->>'repository', '')))"
+    )
+
+
+def summary_storage(storage: str) -> str:
+    """
+    Storage mode of the file-summaries table for a chunk storage mode
+    
+    The summary index is small, so binary quantization saves little; binary mode keeps
+    full-precision summary vectors and a plain vector index.
+    """
+    _check_storage(storage)
+    return "halfvec" if storage == "halfvec" else "vector"
+
+
+def index_name(table: str) -> str:
+    return f"{table}_embedding_idx"
+
+
+def hnsw_index_sql(
+    table: str,
+    storage: str,
+    dimensions: int,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    name: Optional[str] = None,
+    concurrently: bool = False
+) -> str:
+    """CREATE INDEX statement for the HNSW index matching the storage mode"""
+    _check_storage(storage)
+    if storage == "halfvec":
+        target = "embedding halfvec_cosine_ops"
+    elif storage == "binary":
+        target = f"(binary_quantize(embedding)::bit({dimensions})) bit_hamming_ops"
+    else:
+        target = "embedding vector_cosine_ops"
+    
+    params = []
+    if m is not None:
+        params.append(f"m = {int(m)}")
+    if ef_construction is not None:
+        params.append(f"ef_construction = {int(ef_construction)}")
+    with_clause = f" WITH ({', '.join(params)})" if params else ""
+    create = "CREATE INDEX CONCURRENTLY" if concurrently else "CREATE INDEX"
+    return f"{create} {name or index_name(table)} ON {table} USING hnsw ({target}){with_clause}"
+
+
+def match_documents_sql(table: str, storage: str, dimensions: int, rescore_factor: int = 4) -> str:
+    """
+    match_documents for the given storage mode
+    
+    binary: candidates come from the bit-quantized HNSW index (match_count * rescore_factor)
+    and are re-scored with the full-precision vectors.
+    ef_search (optional) sets hnsw.ef_search for the call; prepare_hnsw_search raises it to
+    twice the candidates requested, since HNSW returns at most ef_search rows before the
+    version filter drops the previous build's copies.
+    """
+    candidates = f"match_count * {int(rescore_factor)}" if storage == "binary" else "match_count"
+    visible = visible_version_sql("re")
+    _check_storage(storage)
+    if storage == "halfvec":
+        body = f"""
+  SELECT
+    re.id,
+    re.content,
+    re.metadata,
+    re.embedding::vector({dimensions}),
+    1 - (re.embedding <=> query_embedding::halfvec({dimensions})) AS similarity
+  FROM {table} re
+  WHERE (filter = '{{}}'::jsonb OR re.metadata @> filter)
+    AND {visible}
+  ORDER BY re.embedding <=> query_embedding::halfvec({dimensions})
+  LIMIT match_count;"""
+    elif storage == "binary":
+        body = f"""
+  SELECT
+    c.id,
+    c.content,
+    c.metadata,
+    c.embedding,
+    1 - (c.embedding <=> query_embedding) AS similarity
+  FROM (
+    SELECT re.id, re.content, re.metadata, re.embedding
+    FROM {table} re
+    WHERE (filter = '{{}}'::jsonb OR re.metadata @> filter)
+      AND {visible}
+    ORDER BY binary_quantize(re.embedding)::bit({dimensions}) <~> binary_quantize(query_embedding)
+    LIMIT match_count * {int(rescore_factor)}
+  ) c
+  ORDER BY c.embedding <=> query_embedding
+  LIMIT match_count;"""
+    else:
+        body = f"""
+  SELECT
+    re.id,
+    re.content,
+    re.metadata,
+    re.embedding,
+    1 - (re.embedding <=> query_embedding) AS similarity
+  FROM {table} re
+  WHERE (filter = '{{}}'::jsonb OR re.metadata @> filter)
+    AND {visible}
+  ORDER BY re.embedding <=> query_embedding
+  LIMIT match_count;"""
+    
+    return f"""CREATE OR REPLACE FUNCTION match_documents(
+  query_embedding vector({dimensions}),
+  match_count int DEFAULT 5,
+  filter jsonb DEFAULT '{{}}'::jsonb,
+  ef_search int DEFAULT NULL
+)
+RETURNS TABLE (
+  id uuid,
+  content text,
+  metadata jsonb,
+  embedding vector({dimensions}),
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+{_VERSION_DECLARE}BEGIN
+  PERFORM prepare_hnsw_search({candidates}, ef_search);
+  RETURN QUERY{body}
+END;
+$$;"""
+
+
+def match_documents_in_files_sql(table: str, storage: str, dimensions: int) -> str:
+    """match_documents_in_files (fine stage of hierarchical retrieval) for the given storage mode"""
+    _check_storage(storage)
+    query = f"query_embedding::halfvec({dimensions})" if storage == "halfvec" else "query_embedding"
+    visible = visible_version_sql("re")
+    return f"""CREATE OR REPLACE FUNCTION match_documents_in_files(
+  query_embedding vector({dimensions}),
+  file_paths text[],
+  match_count int DEFAULT 5,
+  filter jsonb DEFAULT '{{}}'::jsonb
+)
+RETURNS TABLE (
+  id uuid,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+{_VERSION_DECLARE}BEGIN
+  PERFORM prepare_hnsw_search(match_count);
+  RETURN QUERY
+  SELECT
+    re.id,
+    re.content,
+    re.metadata,
+    1 - (re.embedding <=> {query}) AS similarity
+  FROM {table} re
+  WHERE re.metadata->>'file_path' = ANY(file_paths)
+    AND (filter = '{{}}'::jsonb OR re.metadata @> filter)
+    AND {visible}
+  ORDER BY re.embedding <=> {query}
+  LIMIT match_count;
+END;
+$$;"""
+
+
+def match_file_summaries_sql(table: str, storage: str, dimensions: int) -> str:
+    """match_file_summaries (coarse stage of hierarchical retrieval) for the given chunk storage mode"""
+    query = f"query_embedding::halfvec({dimensions})" if summary_storage(storage) == "halfvec" else "query_embedding"
+    visible = visible_version_sql("fs")
+    return f"""CREATE OR REPLACE FUNCTION match_file_summaries(
+  query_embedding vector({dimensions}),
+  match_count int DEFAULT 10,
+  filter jsonb DEFAULT '{{}}'::jsonb
+)
+RETURNS TABLE (
+  id uuid,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+{_VERSION_DECLARE}BEGIN
+  PERFORM prepare_hnsw_search(match_count);
+  RETURN QUERY
+  SELECT
+    fs.id,
+    fs.content,
+    fs.metadata,
+    1 - (fs.embedding <=> {query}) AS similarity
+  FROM {table} fs
+  WHERE (filter = '{{}}'::jsonb OR fs.metadata @> filter)
+    AND {visible}
+  ORDER BY fs.embedding <=> {query}
+  LIMIT match_count;
+END;
+$$;"""
+
+
+DROP_MATCH_DOCUMENTS_SQL = (
+    "DROP FUNCTION IF EXISTS match_documents(vector, int, jsonb); "
+    "DROP FUNCTION IF EXISTS match_documents(vector, int, jsonb, int); "
+    "DROP FUNCTION IF EXISTS match_documents_in_files(vector, text[], int, jsonb); "
+    "DROP FUNCTION IF EXISTS match_file_summaries(vector, int, jsonb)"
+)
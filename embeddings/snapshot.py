@@ -0,0 +1,215 @@
+"""
+Portable index snapshots: sharded embeddings (.npy) plus content/metadata (JSONL)
+
+Layout:
+    manifest.json          format version, dimensions, dtype, embedding model, shard list
+    shard-00000.npy        (rows, dimensions) embedding matrix
+    shard-00000.jsonl      one {"id", "content", "metadata"} object per row, same order
+    artifacts/             copy of INDEX_ARTIFACTS_DIR (dependency graphs, catalogues, ...)
+
+Export and import work one shard at a time, so memory stays bounded by the shard size.
+"""
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DTYPES = ("float32", "float16")
+
+# (ids, contents, metadatas, vectors)
+RowBatch = Tuple[List[str], List[str], List[Dict[str, Any]], np.ndarray]
+
+
+def parse_vector(value: Any) -> np.ndarray:
+    """pgvector value (text "[...]" as returned by PostgREST/psycopg, or a list) as float32"""
+    if isinstance(value, str):
+        return np.array(json.loads(value), dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def vector_text(vector: np.ndarray) -> str:
+    """pgvector text representation"""
+    return "[" + ",".join(f"{x:.8g}" for x in vector.tolist()) + "]"
+
+
+class SnapshotWriter:
+    """Buffers rows and writes them out shard by shard"""
+
+    def __init__(self, path: str, shard_size: int = 10000, dtype: str = "float32", info: Optional[dict] = None):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}'. Expected one of: {', '.join(DTYPES)}")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        if (self.path / MANIFEST_NAME).exists():
+            raise FileExistsError(f"Snapshot already exists at {self.path}")
+        self.shard_size = shard_size
+        self.dtype = dtype
+        self.info = info or {}
+        self.dimensions: Optional[int] = None
+        self.shards: List[Dict[str, Any]] = []
+        self.rows = 0
+        self._pending: List[RowBatch] = []
+        self._pending_rows = 0
+
+    def write(self, ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]], vectors: np.ndarray):
+        """Add a batch of rows"""
+        if not ids:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dimensions is None:
+            self.dimensions = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Embedding dimension changed from {self.dimensions} to {vectors.shape[1]}")
+        self._pending.append((ids, contents, metadatas, vectors))
+        self._pending_rows += len(ids)
+        while self._pending_rows >= self.shard_size:
+            self._flush(self.shard_size)
+
+    def _flush(self, limit: int):
+        """Write up to limit pending rows as one shard"""
+        ids, contents, metadatas, vectors = [], [], [], []
+        taken = 0
+        while self._pending and taken < limit:
+            b_ids, b_contents, b_metadatas, b_vectors = self._pending.pop(0)
+            room = limit - taken
+            if len(b_ids) > room:
+                self._pending.insert(0, (b_ids[room:], b_contents[room:], b_metadatas[room:], b_vectors[room:]))
+                b_ids, b_contents, b_metadatas, b_vectors = b_ids[:room], b_contents[:room], b_metadatas[:room], b_vectors[:room]
+            ids.extend(b_ids)
+            contents.extend(b_contents)
+            metadatas.extend(b_metadatas)
+            vectors.append(b_vectors)
+            taken += len(b_ids)
+        self._pending_rows -= taken
+
+        name = f"shard-{len(self.shards):05d}"
+        np.save(self.path / f"{name}.npy", np.vstack(vectors).astype(self.dtype))
+        with open(self.path / f"{name}.jsonl", "w", encoding="utf-8") as f:
+            for row_id, content, metadata in zip(ids, contents, metadatas):
+                f.write(json.dumps({"id": str(row_id), "content": content, "metadata": metadata}) + "\n")
+        self.shards.append({"name": name, "rows": taken})
+        self.rows += taken
+        logger.info(f"Wrote {name} ({taken} rows, {self.rows} total)")
+
+    def close(self) -> Dict[str, Any]:
+        """Flush remaining rows and write the manifest"""
+        if self._pending_rows:
+            self._flush(self._pending_rows)
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "created_at": time.time(),
+            "rows": self.rows,
+            "dimensions": self.dimensions,
+            "dtype": self.dtype,
+            "shards": self.shards,
+            **self.info,
+        }
+        with open(self.path / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+class SnapshotReader:
+    """Iterates a snapshot shard by shard"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        manifest_path = self.path / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No snapshot manifest at {manifest_path}")
+        with open(manifest_path, encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version: {self.manifest.get('format_version')}")
+
+    @property
+    def dimensions(self) -> Optional[int]:
+        return self.manifest.get("dimensions")
+
+    def iter_batches(self, batch_size: Optional[int] = None) -> Iterator[RowBatch]:
+        """(ids, contents, metadatas, float32 vectors) per shard, optionally split into smaller batches"""
+        for shard in self.manifest["shards"]:
+            vectors = np.load(self.path / f"{shard['name']}.npy", mmap_mode="r")
+            with open(self.path / f"{shard['name']}.jsonl", encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+            if len(rows) != vectors.shape[0]:
+                raise ValueError(f"{shard['name']}: {len(rows)} rows but {vectors.shape[0]} embeddings")
+            step = batch_size or len(rows) or 1
+            for start in range(0, len(rows), step):
+                chunk = rows[start:start + step]
+                yield (
+                    [row["id"] for row in chunk],
+                    [row["content"] for row in chunk],
+                    [row.get("metadata") or {} for row in chunk],
+                    np.asarray(vectors[start:start + step], dtype=np.float32),
+                )
+
+
+# Sources
+
+def iter_postgres_rows(conn, table: str, batch_size: int = 5000) -> Iterator[RowBatch]:
+    """Stream rows with a server-side cursor"""
+    with conn.cursor(name="snapshot_export") as cur:
+        cur.itersize = batch_size
+        cur.execute(f"SELECT id, content, metadata, embedding::vector::text FROM {table} ORDER BY id")
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield (
+                [str(row[0]) for row in rows],
+                [row[1] for row in rows],
+                [row[2] or {} for row in rows],
+                np.vstack([parse_vector(row[3]) for row in rows]),
+            )
+
+
+def iter_supabase_rows(client, table: str, batch_size: int = 1000) -> Iterator[RowBatch]:
+    """Stream rows through the Supabase REST API with keyset pagination on id"""
+    last_id = None
+    while True:
+        query = client.table(table).select("id,content,metadata,embedding").order("id").limit(batch_size)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.execute().data or []
+        if not rows:
+            break
+        yield (
+            [str(row["id"]) for row in rows],
+            [row["content"] for row in rows],
+            [row.get("metadata") or {} for row in rows],
+            np.vstack([parse_vector(row["embedding"]) for row in rows]),
+        )
+        last_id = rows[-1]["id"]
+
+
+# Targets
+
+def write_postgres_batch(conn, table: str, batch: RowBatch):
+    """COPY one batch in, skipping ids that already exist"""
+    from embeddings.pg_bulk_loader import copy_rows
+    ids, contents, metadatas, vectors = batch
+    copy_rows(conn, table, ids, contents, metadatas, vectors, on_conflict="nothing")
+
+
+def write_supabase_batch(client, table: str, batch: RowBatch):
+    """Upsert one batch through the Supabase REST API"""
+    ids, contents, metadatas, vectors = batch
+    client.table(table).upsert([
+        {"id": row_id, "content": content, "metadata": metadata, "embedding": vector_text(vector)}
+        for row_id, content, metadata, vector in zip(ids, contents, metadatas, vectors)
+    ]).execute()
+
+
+def write_local_batch(store, batch: RowBatch):
+    """Append one batch to a LocalVectorStore (call store.save() once at the end)"""
+    ids, contents, metadatas, vectors = batch
+    store.add_vectors(contents, metadatas, list(vectors), ids=ids, persist=False)
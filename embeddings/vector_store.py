@@ -1,36 +1,250 @@
-from typing import List, Optional
+import contextvars
+import json
+import math
+import re
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 from langchain_core.documents import Document
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores.supabase import SupabaseVectorStore
-from supabase import create_client, Client
 
 from utils.logger import get_logger
 from utils.config import get_settings
+from utils.index_version import (
+    build_started_before,
+    forget_promoted_builds,
+    get_active_builds,
+    get_index_builds,
+    record_active_build,
+    rollback_active_build
+)
+from utils.metrics import get_metrics, observe_stage, record_cache, timed
+from embeddings.adaptive_k import select_k
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 logger = get_logger()
 
+_ef_search_override: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "hnsw_ef_search", default=None
+)
+
+
+@contextmanager
+def hnsw_ef_search(value: Optional[int]) -> Iterator[None]:
+    """Override hnsw.ef_search for searches in this block (None keeps HNSW_EF_SEARCH)"""
+    token = _ef_search_override.set(value)
+    try:
+        yield
+    finally:
+        _ef_search_override.reset(token)
+
+
+_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_CAMEL_CASE_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize_identifiers(text: str) -> List[str]:
+    """Split text into lowercase terms, breaking snake_case and camelCase identifiers apart"""
+    terms = []
+    for word in _IDENTIFIER_PATTERN.findall(text):
+        lowered = word.lower()
+        terms.append(lowered)
+        parts = [p.lower() for piece in word.split("_") for p in _CAMEL_CASE_PATTERN.findall(piece)]
+        if len(parts) > 1:
+            terms.extend(parts)
+    return [t for t in terms if len(t) > 1]
+
+
+class LexicalReranker:
+    """CPU-only re-ranker blending BM25-style term/identifier overlap with vector similarity"""
+    
+    def __init__(self, lexical_weight: float = 0.5, k1: float = 1.2, b: float = 0.75):
+        self.lexical_weight = lexical_weight
+        self.k1 = k1
+        self.b = b
+    
+    def rerank(
+        self,
+        query: str,
+        candidates: List[tuple[Document, float]],
+        top_n: int
+    ) -> List[tuple[Document, float]]:
+        """Re-score (document, similarity) candidates and return the best top_n"""
+        if not candidates:
+            return []
+        
+        query_terms = set(tokenize_identifiers(query))
+        doc_terms = [
+            Counter(tokenize_identifiers(doc.page_content + " " + doc.metadata.get("file_path", "")))
+            for doc, _ in candidates
+        ]
+        
+        # IDF over the candidate pool keeps this cheap and corpus-independent
+        n_docs = len(candidates)
+        avg_len = sum(sum(terms.values()) for terms in doc_terms) / n_docs or 1.0
+        idf = {}
+        for term in query_terms:
+            df = sum(1 for terms in doc_terms if term in terms)
+            idf[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        
+        lexical_scores = []
+        for terms in doc_terms:
+            length = sum(terms.values())
+            score = 0.0
+            for term in query_terms:
+                tf = terms.get(term, 0)
+                if tf:
+                    score += idf[term] * tf * (self.k1 + 1) / (
+                        tf + self.k1 * (1 - self.b + self.b * length / avg_len)
+                    )
+            lexical_scores.append(score)
+        
+        max_lexical = max(lexical_scores) or 1.0
+        scored = [
+            (doc, self.lexical_weight * (lexical / max_lexical) + (1 - self.lexical_weight) * similarity)
+            for (doc, similarity), lexical in zip(candidates, lexical_scores)
+        ]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:top_n]
+
+
+class CrossEncoderReranker:
+    """Re-ranker backed by a small sentence-transformers cross-encoder (optional dependency)"""
+    
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError(
+                "sentence-transformers is required for cross-encoder re-ranking. "
+                "Install it with: pip install sentence-transformers"
+            ) from e
+        self.model = CrossEncoder(model_name, device="cpu")
+    
+    def rerank(
+        self,
+        query: str,
+        candidates: List[tuple[Document, float]],
+        top_n: int
+    ) -> List[tuple[Document, float]]:
+        """Re-score (document, similarity) candidates and return the best top_n"""
+        if not candidates:
+            return []
+        scores = self.model.predict([(query, doc.page_content) for doc, _ in candidates])
+        scored = [(doc, float(score)) for (doc, _), score in zip(candidates, scores)]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:top_n]
+
+
+EMBEDDING_PROVIDERS = ("openai", "local")
+
+
+def create_embeddings(settings):
+    """Create the embeddings implementation for EMBEDDING_PROVIDER"""
+    provider = settings.embedding_provider
+    if provider == "local":
+        from embeddings.local_embeddings import LocalEmbeddings
+        if settings.embedding_model.startswith("text-embedding-"):
+            raise ValueError(
+                f"EMBEDDING_PROVIDER=local needs a sentence-transformers EMBEDDING_MODEL "
+                f"(got the OpenAI model {settings.embedding_model})"
+            )
+        return LocalEmbeddings(
+            settings.embedding_model,
+            dimensions=settings.embedding_dimensions,
+            device=settings.local_embedding_device,
+            backend=settings.local_embedding_backend,
+            batch_size=settings.local_embedding_batch_size,
+            workers=settings.local_embedding_workers
+        )
+    if provider != "openai":
+        raise ValueError(f"Unknown embedding_provider '{provider}'. Expected one of: {', '.join(EMBEDDING_PROVIDERS)}")
+    
+    kwargs = {}
+    if settings.embedding_dimensions:
+        if not settings.embedding_model.startswith("text-embedding-3"):
+            raise ValueError(
+                f"EMBEDDING_DIMENSIONS requires a text-embedding-3-* model "
+                f"(got {settings.embedding_model})"
+            )
+        kwargs["dimensions"] = settings.embedding_dimensions
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(
+        model=settings.embedding_model,
+        openai_api_key=settings.openai_api_key,
+        **kwargs
+    )
+
+
+def create_reranker(model: str, lexical_weight: float = 0.5):
+    """Create a re-ranker from its configured name"""
+    if model == "lexical":
+        return LexicalReranker(lexical_weight=lexical_weight)
+    return CrossEncoderReranker(model)
+
 
 class VectorStore:
     """Manages vector storage for repository embeddings using Supabase"""
     
-    def __init__(self):
+    def __init__(self, embeddings=None, store=None, summary_store=None):
+        """
+        Args:
+            embeddings: Optional embeddings implementation (defaults to EMBEDDING_PROVIDER)
+            store: Optional pre-built backend store (defaults to the configured backend)
+            summary_store: Optional pre-built store for file/directory summaries
+        """
         self.settings = get_settings()
-        self.embeddings = OpenAIEmbeddings(openai_api_key=self.settings.openai_api_key)
-        self.store = None
-        self._initialize_store()
+        self.embeddings = embeddings or self._create_embeddings()
+        self.store = store
+        self.summary_store = summary_store
+        self._client: Optional["Client"] = None
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self._query_cache_hits = 0
+        self._query_cache_misses = 0
+        self._reranker = None
+        self._bulk_loaders: Dict[str, Any] = {}
+        self._bulk_loaders_lock = threading.Lock()
+        if self.store is None:
+            self._initialize_store()
+    
+    def _create_embeddings(self):
+        """Embeddings from the configured provider"""
+        return create_embeddings(self.settings)
     
     def _initialize_store(self):
-        """Initialize Supabase Vector Store"""
+        """Initialize the configured vector backend"""
+        if self.settings.vector_backend == "local":
+            from embeddings.local_store import LocalVectorStore
+            logger.info("Initializing local vector store")
+            self.store = LocalVectorStore(
+                self.embeddings,
+                persist_path=self.settings.local_index_path,
+                active_versions=get_active_builds
+            )
+            return
+        if self.settings.vector_backend != "supabase":
+            raise ValueError(f"Unknown vector_backend: {self.settings.vector_backend}")
+        
         if not self.settings.supabase_url or not self.settings.supabase_key:
             raise ValueError(
                 "Supabase configuration is required. Please set SUPABASE_URL and SUPABASE_KEY in your .env file."
             )
         
+        from langchain_community.vectorstores.supabase import SupabaseVectorStore
+        from supabase import create_client
+        
         logger.info("Initializing Supabase Vector Store")
-        supabase: Client = create_client(
+        supabase = create_client(
             self.settings.supabase_url,
             self.settings.supabase_key
         )
+        self._client = supabase
         self.store = SupabaseVectorStore(
             client=supabase,
             embedding=self.embeddings,
@@ -38,30 +252,307 @@ class VectorStore:
         )
         logger.info(f"Supabase Vector Store initialized with table: {self.settings.supabase_vector_table}")
     
-    def add_documents(self, documents: List[Document]):
-        """Add documents to vector store"""
+    def get_summary_store(self):
+        """Get (and lazily create) the file/directory summary index"""
+        if self.summary_store is None:
+            if self._client is not None:
+                from langchain_community.vectorstores.supabase import SupabaseVectorStore
+                self.summary_store = SupabaseVectorStore(
+                    client=self._client,
+                    embedding=self.embeddings,
+                    table_name=self.settings.supabase_summary_table,
+                    query_name="match_file_summaries",
+                )
+            else:
+                from embeddings.local_store import LocalVectorStore
+                persist_path = None
+                if self.settings.vector_backend == "local" and self.settings.local_index_path:
+                    persist_path = str(Path(self.settings.local_index_path) / "summaries")
+                self.summary_store = LocalVectorStore(
+                    self.embeddings,
+                    persist_path=persist_path,
+                    active_versions=get_active_builds if self.settings.vector_backend == "local" else None
+                )
+        return self.summary_store
+    
+    def add_summary_documents(self, documents: List[Document], persist: bool = True):
+        """Add file/directory summaries to the coarse retrieval index (persist: as add_documents)"""
+        if not documents:
+            return
+        logger.info(f"Adding {len(documents)} file/directory summaries")
+        with observe_stage("add_summaries"):
+            loader = self._get_bulk_loader(self.settings.supabase_summary_table)
+            if loader is not None:
+                self._bulk_add(loader, documents)
+            else:
+                self._add_to_store(self.get_summary_store(), documents, persist)
+    
+    def _get_bulk_loader(self, table: str):
+        """COPY-based loader for table, or None to use the Supabase client (no DATABASE_URL)"""
+        if self._client is None or not self.settings.database_url or not self.settings.pg_bulk_load_enabled:
+            return None
+        with self._bulk_loaders_lock:
+            if table not in self._bulk_loaders:
+                from embeddings.pg_bulk_loader import PostgresBulkLoader
+                logger.info(f"Using direct Postgres COPY ingest for {table}")
+                self._bulk_loaders[table] = PostgresBulkLoader(
+                    table, self.settings.database_url, pool_size=self.settings.pg_pool_size
+                )
+            return self._bulk_loaders[table]
+    
+    def _bulk_add(self, loader, documents: List[Document]):
+        """Embed and COPY documents batch by batch"""
+        batch_size = max(1, self.settings.pg_copy_batch_size)
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            with observe_stage("embed_documents"):
+                vectors = self.embeddings.embed_documents([doc.page_content for doc in batch])
+            loader.add_documents(batch, vectors)
+    
+    def add_documents(self, documents: List[Document], persist: bool = True):
+        """
+        Add documents to vector store
+        
+        persist=False leaves a local index unsaved until save(), so batched adds do not
+        rewrite the whole index each time (no effect on Supabase)
+        """
         if not documents:
             logger.warning("No documents to add")
             return
         
         logger.info(f"Adding {len(documents)} documents to vector store")
-        self.store.add_documents(documents)
+        with observe_stage("add_documents"):
+            loader = self._get_bulk_loader(self.settings.supabase_vector_table)
+            if loader is not None:
+                self._bulk_add(loader, documents)
+            else:
+                self._add_to_store(self.store, documents, persist)
         logger.info("Documents added successfully")
     
+    def add_embedded_documents(self, documents: List[Document], vectors: List[List[float]], persist: bool = True):
+        """Add documents with precomputed embeddings (no embedding calls; persist: as add_documents)"""
+        if not documents:
+            return
+        logger.info(f"Adding {len(documents)} pre-embedded documents to vector store")
+        with observe_stage("add_documents"):
+            loader = self._get_bulk_loader(self.settings.supabase_vector_table)
+            if loader is not None:
+                loader.add_documents(documents, vectors)
+            elif self._client is not None:
+                self.store.add_vectors(vectors, documents, [str(uuid.uuid4()) for _ in documents])
+            else:
+                self.store.add_vectors(
+                    [doc.page_content for doc in documents],
+                    [doc.metadata for doc in documents],
+                    vectors,
+                    persist=persist
+                )
+    
+    def _add_to_store(self, store, documents: List[Document], persist: bool):
+        from embeddings.local_store import LocalVectorStore
+        
+        if isinstance(store, LocalVectorStore):
+            store.add_documents(documents, persist=persist)
+        else:
+            store.add_documents(documents)
+    
+    def save(self):
+        """Write local indexes to disk after persist=False adds (no-op for Supabase)"""
+        from embeddings.local_store import LocalVectorStore
+        
+        for store in (self.store, self.summary_store):
+            if isinstance(store, LocalVectorStore):
+                store.save()
+    
+    def get_page_chunks(
+        self,
+        repository: str,
+        file_path: str,
+        version: str,
+        page_hashes: List[str]
+    ) -> Dict[str, List[tuple[Document, List[float]]]]:
+        """
+        Stored chunks and embeddings of one build's pages, by page_hash
+        
+        When several pages share a hash, the chunks of the first such page are returned.
+        """
+        if not page_hashes:
+            return {}
+        wanted = set(page_hashes)
+        if self._client is not None:
+            rows = (
+                self._client.table(self.settings.supabase_vector_table)
+                .select("content, metadata, embedding")
+                .eq("metadata->>repository", repository)
+                .eq("metadata->>file_path", file_path)
+                .eq("metadata->>index_version", version)
+                .in_("metadata->>page_hash", sorted(wanted))
+                .execute().data or []
+            )
+            pairs = [
+                (
+                    Document(page_content=row.get("content", ""), metadata=row.get("metadata") or {}),
+                    json.loads(row["embedding"]) if isinstance(row["embedding"], str) else row["embedding"]
+                )
+                for row in rows
+            ]
+        else:
+            pairs = self.store.get_rows(lambda metadata: (
+                metadata.get("repository") == repository
+                and metadata.get("file_path") == file_path
+                and metadata.get("index_version") == version
+                and metadata.get("page_hash") in wanted
+            ))
+        
+        pages: Dict[str, Dict[Any, List[tuple[Document, List[float]]]]] = {}
+        for doc, vector in pairs:
+            pages.setdefault(doc.metadata["page_hash"], {}).setdefault(doc.metadata.get("page"), []).append((doc, vector))
+        chunks = {}
+        for digest, by_page in pages.items():
+            first = by_page[min(by_page, key=lambda page: -1 if page is None else page)]
+            chunks[digest] = sorted(first, key=lambda pair: pair[0].metadata.get("chunk_index") or 0)
+        return chunks
+    
+    def promote_index_version(self, repository: str, version: str):
+        """Atomically make a finished build the one searches see"""
+        if self._client is not None:
+            self._client.rpc("promote_index_version", {"p_repository": repository, "p_version": version}).execute()
+        previous = record_active_build(repository, version)
+        logger.info(f"Promoted index version {version} for {repository} (previous: {previous})")
+    
+    def rollback_index_version(self, repository: str) -> Optional[str]:
+        """Re-activate the previous build; returns the now-active version, or None if there is none"""
+        if self._client is not None:
+            version = self._client.rpc("rollback_index_version", {"p_repository": repository}).execute().data
+            if not version:
+                return None
+            record_active_build(repository, version)
+            return version
+        return rollback_active_build(repository)
+    
+    def gc_index_versions(
+        self,
+        repository: str,
+        keep_previous: bool = True,
+        abandoned_after_s: Optional[int] = None
+    ) -> int:
+        """
+        Delete rows of superseded builds (promoted once, no longer active); returns rows removed
+        
+        Builds that were never promoted are only deleted once they are older than
+        abandoned_after_s (default INDEX_GC_ABANDONED_AFTER_S; 0 keeps them), so builds still
+        being written are left alone even if they started before the active one.
+        """
+        if abandoned_after_s is None:
+            abandoned_after_s = self.settings.index_gc_abandoned_after_s
+        if self._client is not None:
+            removed = self._client.rpc("gc_index_versions", {
+                "p_repository": repository,
+                "keep_previous": keep_previous,
+                "abandoned_after_s": abandoned_after_s,
+            }).execute().data
+            removed = int(removed or 0)
+        else:
+            builds = get_index_builds().get(repository)
+            if not builds:
+                return 0
+            keep = {builds["active_build"]}
+            if keep_previous and builds["previous_build"]:
+                keep.add(builds["previous_build"])
+            promoted = set(builds["promoted_builds"])
+            superseded = promoted - keep
+            abandoned_before = time.time() - abandoned_after_s if abandoned_after_s > 0 else None
+            
+            def is_garbage(metadata: Dict[str, Any]) -> bool:
+                version = metadata.get("index_version")
+                if metadata.get("repository") != repository:
+                    return False
+                if version is None or version in superseded:
+                    return True
+                return (
+                    abandoned_before is not None
+                    and version not in keep
+                    and version not in promoted
+                    and build_started_before(version, abandoned_before)
+                )
+            
+            removed = self.store.delete_where(is_garbage)
+            if self.summary_store is not None or self.settings.hierarchical_retrieval:
+                removed += self.get_summary_store().delete_where(is_garbage)
+            forget_promoted_builds(repository, list(superseded))
+        logger.info(f"Garbage-collected {removed} rows of old index versions for {repository}")
+        return removed
+    
+    def get_index_versions(self) -> Dict[str, Dict[str, Any]]:
+        """Active and previous index version per repository"""
+        if self._client is not None:
+            rows = self._client.table("repository_index_versions").select("*").execute().data or []
+            return {
+                row["repository"]: {
+                    "active_version": row["active_version"],
+                    "previous_version": row.get("previous_version"),
+                    "promoted_at": row.get("promoted_at"),
+                }
+                for row in rows
+            }
+        return {
+            repository: {"active_version": builds["active_build"], "previous_version": builds["previous_build"]}
+            for repository, builds in get_index_builds().items()
+        }
+    
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query string, reusing cached embeddings for repeated text"""
+        cache_size = self.settings.query_embedding_cache_size
+        if cache_size <= 0:
+            with observe_stage("embed_query"):
+                return self.embeddings.embed_query(query)
+        
+        with self._query_cache_lock:
+            cached = self._query_cache.get(query)
+            if cached is not None:
+                self._query_cache.move_to_end(query)
+                self._query_cache_hits += 1
+                record_cache("query_embedding", hit=True)
+                return cached
+            self._query_cache_misses += 1
+        record_cache("query_embedding", hit=False)
+        
+        with observe_stage("embed_query"):
+            embedding = self.embeddings.embed_query(query)
+        
+        with self._query_cache_lock:
+            self._query_cache[query] = embedding
+            self._query_cache.move_to_end(query)
+            while len(self._query_cache) > cache_size:
+                self._query_cache.popitem(last=False)
+        return embedding
+    
+    def get_query_cache_stats(self) -> Dict[str, Any]:
+        """Query embedding cache statistics"""
+        with self._query_cache_lock:
+            lookups = self._query_cache_hits + self._query_cache_misses
+            return {
+                "size": len(self._query_cache),
+                "capacity": self.settings.query_embedding_cache_size,
+                "hits": self._query_cache_hits,
+                "misses": self._query_cache_misses,
+                "hit_ratio": round(self._query_cache_hits / lookups, 3) if lookups else 0.0,
+            }
+    
     def similarity_search(
         self,
         query: str,
         k: int = 5,
-        filter: Optional[dict] = None
+        filter: Optional[dict] = None,
+        query_embedding: Optional[List[float]] = None,
+        file_paths: Optional[List[str]] = None
     ) -> List[Document]:
-        """Search for similar documents"""
+        """Search for similar documents (optionally only within file_paths)"""
         logger.debug(f"Searching for: {query} (k={k})")
         
-        results = self.store.similarity_search(
-            query,
-            k=k,
-            filter=filter
-        )
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+        results = self.similarity_search_by_vector(query_embedding, k=k, filter=filter, file_paths=file_paths)
         
         logger.debug(f"Found {len(results)} results")
         return results
@@ -70,19 +561,380 @@ class VectorStore:
         self,
         query: str,
         k: int = 5,
-        filter: Optional[dict] = None
+        filter: Optional[dict] = None,
+        query_embedding: Optional[List[float]] = None,
+        file_paths: Optional[List[str]] = None
     ) -> List[tuple[Document, float]]:
-        """Search with similarity scores"""
+        """Search with similarity scores (optionally only within file_paths)"""
         logger.debug(f"Searching with scores for: {query} (k={k})")
         
-        results = self.store.similarity_search_with_score(
-            query,
-            k=k,
-            filter=filter
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+        results = self.similarity_search_with_score_by_vector(
+            query_embedding, k=k, filter=filter, file_paths=file_paths
         )
         
         logger.debug(f"Found {len(results)} results")
         return results
+    
+    def retrieve(
+        self,
+        query: str,
+        k: int = 5,
+        filter: Optional[dict] = None,
+        query_embedding: Optional[List[float]] = None,
+        file_paths: Optional[List[str]] = None
+    ) -> List[Document]:
+        """Retrieve context documents for a chain (see retrieve_with_selection)"""
+        docs, _ = self.retrieve_with_selection(
+            query, k=k, filter=filter, query_embedding=query_embedding, file_paths=file_paths
+        )
+        return docs
+    
+    def retrieve_with_selection(
+        self,
+        query: str,
+        k: int = 5,
+        filter: Optional[dict] = None,
+        query_embedding: Optional[List[float]] = None,
+        file_paths: Optional[List[str]] = None,
+        adaptive: Optional[bool] = None
+    ) -> tuple[List[Document], Dict[str, Any]]:
+        """
+        Retrieve context documents for a chain, with a description of how many were kept
+        
+        With re-ranking enabled, over-fetches rerank_fetch_k candidates, re-scores them
+        locally and keeps the best k (capped by rerank_top_n); otherwise plain top-k search.
+        file_paths restricts the search to those files (fine stage of hierarchical retrieval).
+        With adaptive top-k (adaptive_k_enabled, or adaptive=True), k is only the upper bound
+        (adaptive_k_max overrides it): results stop at adaptive_k_min_score or at a knee in
+        the score list, keeping at least adaptive_k_min. Hits are then widened with their
+        neighbouring chunks when a neighbour window is configured.
+        """
+        adaptive = self.settings.adaptive_k_enabled if adaptive is None else adaptive
+        max_k = (self.settings.adaptive_k_max or k) if adaptive else k
+        if self.settings.rerank_enabled and self.settings.rerank_top_n:
+            max_k = min(max_k, self.settings.rerank_top_n)
+        min_score = self.settings.adaptive_k_min_score if adaptive else None
+        
+        if not adaptive and not self.settings.rerank_enabled:
+            docs = self.similarity_search(
+                query, k=max_k, filter=filter, query_embedding=query_embedding, file_paths=file_paths
+            )
+            return self._with_neighbours(docs, {"mode": "fixed", "k": len(docs), "max_k": max_k})
+        
+        if self.settings.rerank_enabled:
+            # The threshold is a vector similarity, so it applies before re-scoring
+            results = self.rerank_search(
+                query,
+                top_n=max_k,
+                fetch_k=self.settings.rerank_fetch_k,
+                filter=filter,
+                query_embedding=query_embedding,
+                file_paths=file_paths,
+                min_similarity=min_score,
+                min_keep=self.settings.adaptive_k_min
+            )
+            min_score = None
+        else:
+            results = self.similarity_search_with_score(
+                query, k=max_k, filter=filter, query_embedding=query_embedding, file_paths=file_paths
+            )
+        
+        if not adaptive:
+            return self._with_neighbours([doc for doc, _ in results], {
+                "mode": "fixed", "k": len(results), "max_k": max_k
+            })
+        
+        scores = [score for _, score in results]
+        chosen, reason = select_k(
+            scores,
+            min_k=self.settings.adaptive_k_min,
+            max_k=max_k,
+            min_score=min_score,
+            knee_factor=self.settings.adaptive_k_knee_factor
+        )
+        get_metrics().inc(
+            "adaptive_k_cutoffs_total",
+            labels={"reason": reason},
+            help="Adaptive top-k selections by stopping rule"
+        )
+        logger.debug(f"Adaptive top-k kept {chosen}/{len(results)} results ({reason})")
+        return self._with_neighbours([doc for doc, _ in results[:chosen]], {
+            "mode": "adaptive",
+            "k": chosen,
+            "max_k": max_k,
+            "candidates": len(results),
+            "reason": reason,
+            "scores": [round(float(score), 4) for score in scores[:chosen]],
+        })
+    
+    def get_neighbour_window(self) -> int:
+        """Chunks added either side of each hit (defaults to 1 for small chunks, else 0)"""
+        window = self.settings.neighbour_window
+        if window is None:
+            return 1 if self.settings.chunk_mode == "small" else 0
+        return window
+    
+    def _with_neighbours(
+        self,
+        docs: List[Document],
+        selection: Dict[str, Any]
+    ) -> tuple[List[Document], Dict[str, Any]]:
+        window = self.get_neighbour_window()
+        if window > 0:
+            docs = self.expand_neighbours(docs, window)
+            selection["neighbour_window"] = window
+        return docs, selection
+    
+    def expand_neighbours(self, docs: List[Document], window: int) -> List[Document]:
+        """
+        Widen each hit to the chunks within window positions of it in the same file and build
+        
+        Hits whose windows touch in one file are merged into a single passage at the
+        better-ranked position. Chunks without chunk_index (rows indexed before it was
+        recorded for every chunk) are returned unchanged.
+        """
+        from embeddings.local_store import chunk_key
+        
+        if window <= 0 or not docs:
+            return docs
+        passages = []  # [file key, first index, last index, hit]
+        for doc in docs:
+            index = doc.metadata.get("chunk_index")
+            if index is None:
+                passages.append([None, None, None, doc])
+                continue
+            group = chunk_key(doc.metadata)[:3]
+            start, end = max(0, index - window), index + window
+            if doc.metadata.get("total_chunks"):
+                end = min(end, doc.metadata["total_chunks"] - 1)
+            for passage in passages:
+                if passage[0] == group and start <= passage[2] + 1 and end >= passage[1] - 1:
+                    passage[1], passage[2] = min(passage[1], start), max(passage[2], end)
+                    break
+            else:
+                passages.append([group, start, end, doc])
+        
+        keys = [group + (i,) for group, start, end, _ in passages if group for i in range(start, end + 1)]
+        with observe_stage("neighbour_fetch"):
+            found = self._fetch_chunks(keys)
+        
+        expanded = []
+        for group, start, end, hit in passages:
+            if group is None:
+                expanded.append(hit)
+                continue
+            found.setdefault(chunk_key(hit.metadata), hit)
+            chunks = [found[group + (i,)] for i in range(start, end + 1) if group + (i,) in found]
+            expanded.append(Document(
+                page_content="\n".join(chunk.page_content for chunk in chunks),
+                metadata={
+                    **hit.metadata,
+                    "chunk_range": [chunks[0].metadata["chunk_index"], chunks[-1].metadata["chunk_index"]],
+                }
+            ))
+        logger.debug(f"Expanded {len(docs)} hits into {len(expanded)} passages from {len(found)} chunks")
+        return expanded
+    
+    def _fetch_chunks(self, keys: List[tuple]) -> Dict[tuple, Document]:
+        """Chunks by (repository, file_path, index_version, chunk_index), in one round trip"""
+        from embeddings.local_store import chunk_key
+        
+        if not keys:
+            return {}
+        if self._client is None:
+            if not hasattr(self.store, "get_chunks"):
+                return {}
+            return {chunk_key(doc.metadata): doc for doc in self.store.get_chunks(keys)}
+        
+        payload = [
+            {"repository": repository, "file_path": file_path, "index_version": version, "chunk_index": index}
+            for repository, file_path, version, index in keys
+        ]
+        try:
+            rows = self._client.rpc("match_chunks", {"keys": payload}).execute().data or []
+        except Exception as e:
+            # Databases without Step 9 of schema.sql: one query per file
+            logger.warning(f"match_chunks failed ({e}); fetching neighbour chunks per file")
+            rows = self._fetch_chunks_per_file(keys)
+        found = {}
+        for row in rows:
+            doc = Document(page_content=row.get("content", ""), metadata=row.get("metadata") or {})
+            found[chunk_key(doc.metadata)] = doc
+        return found
+    
+    def _fetch_chunks_per_file(self, keys: List[tuple]) -> List[dict]:
+        """Rows for chunk keys, one PostgREST query per file"""
+        by_file: Dict[tuple, List[int]] = {}
+        for key in keys:
+            by_file.setdefault(key[:3], []).append(key[3])
+        rows = []
+        for (repository, file_path, version), indexes in by_file.items():
+            query = (
+                self._client.table(self.settings.supabase_vector_table)
+                .select("content, metadata")
+                .eq("metadata->>file_path", file_path)
+                .in_("metadata->>chunk_index", [str(i) for i in indexes])
+            )
+            if repository is not None:
+                query = query.eq("metadata->>repository", repository)
+            if version is not None:
+                query = query.eq("metadata->>index_version", version)
+            else:
+                query = query.is_("metadata->>index_version", "null")
+            rows.extend(query.execute().data or [])
+        return rows
+    
+    def select_files(
+        self,
+        query: str,
+        top_files: int,
+        filter: Optional[dict] = None,
+        query_embedding: Optional[List[float]] = None,
+        max_directories: int = 0
+    ) -> tuple[List[str], List[Document]]:
+        """
+        Coarse stage of hierarchical retrieval: best-matching files from the summary index,
+        plus up to max_directories matching directory summaries
+        """
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+        summary_filter = dict(filter or {})
+        with observe_stage("summary_search"):
+            if self._client is not None:
+                params = {
+                    "query_embedding": query_embedding,
+                    "match_count": top_files + max_directories,
+                    "filter": summary_filter,
+                }
+                rows = self._client.rpc("match_file_summaries", params).execute().data or []
+                summaries = [
+                    Document(page_content=row.get("content", ""), metadata=row.get("metadata") or {})
+                    for row in rows
+                ]
+            else:
+                summaries = self.get_summary_store().similarity_search_by_vector(
+                    query_embedding, k=top_files + max_directories, filter=summary_filter
+                )
+        
+        file_paths = [d.metadata["file_path"] for d in summaries if d.metadata.get("level") == "file"]
+        directories = [d for d in summaries if d.metadata.get("level") == "directory"]
+        return file_paths[:top_files], directories[:max_directories]
+    
+    def rerank_search(
+        self,
+        query: str,
+        top_n: int,
+        fetch_k: int = 50,
+        filter: Optional[dict] = None,
+        query_embedding: Optional[List[float]] = None,
+        file_paths: Optional[List[str]] = None,
+        min_similarity: Optional[float] = None,
+        min_keep: int = 1
+    ) -> List[tuple[Document, float]]:
+        """
+        Over-fetch fetch_k candidates and return the top_n after local re-scoring
+        
+        Candidates below min_similarity are dropped before re-scoring (keeping at least min_keep).
+        """
+        candidates = self.similarity_search_with_score(
+            query,
+            k=max(fetch_k, top_n),
+            filter=filter,
+            query_embedding=query_embedding,
+            file_paths=file_paths
+        )
+        if min_similarity is not None:
+            kept = [pair for pair in candidates if pair[1] >= min_similarity]
+            candidates = kept if len(kept) >= min_keep else candidates[:min_keep]
+        with observe_stage("rerank"):
+            reranked = self.get_reranker().rerank(query, candidates, top_n)
+        logger.debug(f"Re-ranked {len(candidates)} candidates down to {len(reranked)}")
+        return reranked
+    
+    def get_reranker(self):
+        """Get (and lazily create) the configured re-ranker"""
+        if self._reranker is None:
+            self._reranker = create_reranker(
+                self.settings.rerank_model,
+                lexical_weight=self.settings.rerank_lexical_weight
+            )
+        return self._reranker
+    
+    def get_ef_search(self) -> Optional[int]:
+        """hnsw.ef_search for the current search (request override, then settings)"""
+        return _ef_search_override.get() or self.settings.hnsw_ef_search
+    
+    @timed("vector_search")
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 5,
+        filter: Optional[dict] = None,
+        file_paths: Optional[List[str]] = None
+    ) -> List[Document]:
+        """Search for similar documents using a precomputed query embedding"""
+        if self._client is not None:
+            return [doc for doc, _ in self._match_documents(embedding, k, filter, file_paths)]
+        return self.store.similarity_search_by_vector(
+            embedding,
+            k=k,
+            filter=self._local_filter(filter, file_paths)
+        )
+    
+    @timed("vector_search")
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 5,
+        filter: Optional[dict] = None,
+        file_paths: Optional[List[str]] = None
+    ) -> List[tuple[Document, float]]:
+        """Search with similarity scores using a precomputed query embedding"""
+        if self._client is not None:
+            return self._match_documents(embedding, k, filter, file_paths)
+        return self.store.similarity_search_by_vector_with_relevance_scores(
+            embedding,
+            k=k,
+            filter=self._local_filter(filter, file_paths)
+        )
+    
+    def _local_filter(self, filter: Optional[dict], file_paths: Optional[List[str]]) -> Optional[dict]:
+        """Metadata filter for the local backend (list values match any member)"""
+        if not file_paths:
+            return filter
+        return {**(filter or {}), "file_path": list(file_paths)}
+    
+    def _match_documents(
+        self,
+        embedding: List[float],
+        k: int,
+        filter: Optional[dict] = None,
+        file_paths: Optional[List[str]] = None
+    ) -> List[tuple[Document, float]]:
+        """
+        Call match_documents directly so match_count and ef_search reach the database
+        (match_documents_in_files when the search is restricted to file_paths)
+        """
+        params = {"query_embedding": embedding, "match_count": k, "filter": filter or {}}
+        if file_paths:
+            params["file_paths"] = list(file_paths)
+            function = "match_documents_in_files"
+        else:
+            function = "match_documents"
+            ef_search = self.get_ef_search()
+            if ef_search:
+                params["ef_search"] = ef_search
+        response = self._client.rpc(function, params).execute()
+        return [
+            (
+                Document(page_content=row.get("content", ""), metadata=row.get("metadata") or {}),
+                row.get("similarity", 0.0)
+            )
+            for row in response.data or []
+            if row.get("content")
+        ]
 
 
 _vector_store: Optional[VectorStore] = None
@@ -1,4 +1,4 @@
-from .repository_loader import RepositoryLoader
-
-__all__ = ["RepositoryLoader"]
+from .repository_loader import RepositoryLoader, MarkdownLoader
+from .dependency_graph import DependencyGraph, get_dependency_index
 
+__all__ = ["RepositoryLoader", "MarkdownLoader", "DependencyGraph", "get_dependency_index"]
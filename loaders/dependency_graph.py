@@ -0,0 +1,203 @@
+import ast
+from collections import deque
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, List, Optional, Set
+
+from utils.artifacts import ArtifactCache, ArtifactStore
+from utils.logger import get_logger
+
+logger = get_logger()
+
+ARTIFACT_NAME = "dependency_graph"
+
+
+def module_name_for_path(file_path: str) -> str:
+    """Dotted module name for a repository-relative .py path (package __init__ maps to the package)"""
+    parts = list(PurePosixPath(file_path.replace("\\", "/")).with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+class DependencyGraph:
+    """Module-level import graph for the Python files of one repository"""
+
+    def __init__(self):
+        self.modules: Dict[str, str] = {}  # module -> file_path
+        self.imports: Dict[str, Set[str]] = {}  # module -> internal modules it imports
+        self.external: Dict[str, Set[str]] = {}  # module -> third-party / stdlib top-level packages
+        self._raw_imports: Dict[str, Set[str]] = {}
+        self._reverse: Optional[Dict[str, Set[str]]] = None
+
+    def add_file(self, file_path: str, source: str):
+        """Parse one Python file and record its imports (resolved in finalize)"""
+        module = module_name_for_path(file_path)
+        if not module:
+            return
+        is_package = PurePosixPath(file_path.replace("\\", "/")).stem == "__init__"
+        self.modules[module] = file_path
+
+        try:
+            tree = ast.parse(source, filename=file_path)
+        except (SyntaxError, ValueError) as e:
+            logger.debug(f"Skipping imports for {file_path}: {e}")
+            self._raw_imports[module] = set()
+            return
+
+        raw = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                raw.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = self._resolve_relative(module, is_package, node.module, node.level)
+                if base is None:
+                    continue
+                raw.add(base)
+                raw.update(f"{base}.{alias.name}" if base else alias.name for alias in node.names if alias.name != "*")
+        self._raw_imports[module] = raw
+
+    def _resolve_relative(self, module: str, is_package: bool, target: Optional[str], level: int) -> Optional[str]:
+        """Absolute module name for a (possibly relative) from-import"""
+        if level == 0:
+            return target
+        package = module.split(".") if is_package else module.split(".")[:-1]
+        if level - 1 > len(package):
+            return None
+        base = package[:len(package) - (level - 1)]
+        if target:
+            base = base + target.split(".")
+        return ".".join(base)
+
+    def finalize(self):
+        """Resolve raw import names to repository modules"""
+        for module, raw in self._raw_imports.items():
+            internal, external = set(), set()
+            for name in raw:
+                resolved = self._resolve_internal(name)
+                if resolved and resolved != module:
+                    internal.add(resolved)
+                elif not resolved:
+                    external.add(name.split(".")[0])
+            self.imports[module] = internal
+            self.external[module] = external
+        self._raw_imports = {}
+        self._reverse = None
+
+    def _resolve_internal(self, name: str) -> Optional[str]:
+        """Longest repository module that is a prefix of an imported name"""
+        parts = name.split(".")
+        for i in range(len(parts), 0, -1):
+            candidate = ".".join(parts[:i])
+            if candidate in self.modules:
+                return candidate
+        return None
+
+    def _reverse_edges(self) -> Dict[str, Set[str]]:
+        if self._reverse is None:
+            reverse: Dict[str, Set[str]] = {m: set() for m in self.modules}
+            for module, deps in self.imports.items():
+                for dep in deps:
+                    reverse.setdefault(dep, set()).add(module)
+            self._reverse = reverse
+        return self._reverse
+
+    def resolve_targets(self, names: Iterable[str]) -> List[str]:
+        """
+        Match free-form target names (e.g. "payment", "services.billing", "api/routes.py")
+        to modules by dotted prefix, path component or file path
+        """
+        matched = set()
+        for name in names:
+            needle = name.strip().replace("/", ".").replace("\\", ".")
+            if needle.endswith(".py"):
+                needle = needle[:-3]
+            needle = needle.strip(".").lower()
+            if not needle:
+                continue
+            for module in self.modules:
+                lowered = module.lower()
+                if (lowered == needle
+                        or lowered.startswith(needle + ".")
+                        or needle in lowered.split(".")):
+                    matched.add(module)
+        return sorted(matched)
+
+    def dependents(self, modules: Iterable[str], transitive: bool = True) -> List[str]:
+        """Modules that import any of the given modules (transitively by default)"""
+        reverse = self._reverse_edges()
+        seeds = set(modules)
+        seen: Set[str] = set()
+        queue = deque(seeds)
+        while queue:
+            current = queue.popleft()
+            for dependent in reverse.get(current, ()):
+                if dependent not in seen and dependent not in seeds:
+                    seen.add(dependent)
+                    if transitive:
+                        queue.append(dependent)
+        return sorted(seen)
+
+    def dependencies_of(self, modules: Iterable[str]) -> Dict[str, List[str]]:
+        """Direct internal imports of the given modules"""
+        return {m: sorted(self.imports.get(m, ())) for m in modules if m in self.modules}
+
+    def module_for_file(self, file_path: str) -> Optional[str]:
+        module = module_name_for_path(file_path)
+        return module if module in self.modules else None
+
+    def to_dict(self) -> dict:
+        return {
+            "modules": self.modules,
+            "imports": {m: sorted(deps) for m, deps in self.imports.items()},
+            "external": {m: sorted(deps) for m, deps in self.external.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DependencyGraph":
+        graph = cls()
+        graph.modules = dict(data.get("modules", {}))
+        graph.imports = {m: set(deps) for m, deps in data.get("imports", {}).items()}
+        graph.external = {m: set(deps) for m, deps in data.get("external", {}).items()}
+        return graph
+
+
+class DependencyIndex:
+    """In-process view of every persisted repository dependency graph (reloaded when artifacts change)"""
+
+    def __init__(self, artifact_store: Optional[ArtifactStore] = None):
+        self._cache = ArtifactCache(ARTIFACT_NAME, DependencyGraph.from_dict, artifact_store)
+
+    def graphs(self) -> Dict[str, DependencyGraph]:
+        """Current graphs keyed by repository"""
+        return self._cache.get()
+
+    def impacted_modules(self, target_names: Iterable[str]) -> Dict[str, List[str]]:
+        """Resolved targets and their transitive dependents across all repositories"""
+        target_names = list(target_names)
+        targets, dependents = set(), set()
+        for graph in self.graphs().values():
+            resolved = graph.resolve_targets(target_names)
+            targets.update(resolved)
+            dependents.update(graph.dependents(resolved))
+        return {"targets": sorted(targets), "dependents": sorted(dependents - targets)}
+
+    def describe_dependencies(self, file_paths: Iterable[str], limit: int = 10) -> List[str]:
+        """'module -> dependency' edges for the modules behind the given files"""
+        edges = []
+        for graph in self.graphs().values():
+            for file_path in file_paths:
+                module = graph.module_for_file(file_path)
+                if module:
+                    edges.extend(f"{module} -> {dep}" for dep in sorted(graph.imports.get(module, ())))
+        return sorted(set(edges))[:limit]
+
+
+_dependency_index: Optional[DependencyIndex] = None
+
+
+def get_dependency_index() -> DependencyIndex:
+    """Get dependency index instance (singleton)"""
+    global _dependency_index
+    if _dependency_index is None:
+        _dependency_index = DependencyIndex()
+    return _dependency_index
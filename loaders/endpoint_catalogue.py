@@ -0,0 +1,220 @@
+import ast
+import json
+from typing import Dict, Iterable, List, Optional
+
+from loaders.dependency_graph import module_name_for_path
+from utils.artifacts import ArtifactCache, ArtifactStore
+from utils.logger import get_logger
+
+logger = get_logger()
+
+ARTIFACT_NAME = "endpoint_catalogue"
+
+HTTP_METHODS = ("get", "post", "put", "delete", "patch", "head", "options")
+# Decorator attribute -> implied method (None means "read the methods= keyword")
+_ROUTE_DECORATORS = {**{m: m.upper() for m in HTTP_METHODS}, "route": None, "api_route": None, "websocket": "WEBSOCKET"}
+# Constructors whose prefix keyword applies to every route registered on the instance
+_ROUTER_PREFIX_KEYWORDS = {"Blueprint": "url_prefix", "APIRouter": "prefix"}
+
+MAX_SPEC_BYTES = 20 * 1024 * 1024
+
+
+def _const_str(node: Optional[ast.AST]) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _join_paths(prefix: str, path: str) -> str:
+    if not prefix:
+        return path or "/"
+    return "/" + "/".join(part.strip("/") for part in (prefix, path) if part.strip("/"))
+
+
+def extract_python_routes(file_path: str, source: str) -> List[Dict[str, str]]:
+    """Statically extract Flask (@bp.route, @app.get) and FastAPI (@router.post, ...) routes"""
+    try:
+        tree = ast.parse(source, filename=file_path)
+    except (SyntaxError, ValueError):
+        return []
+
+    module = module_name_for_path(file_path)
+
+    # Router variables and their prefixes, e.g. bp = Blueprint("api", __name__, url_prefix="/api/v1")
+    prefixes: Dict[str, str] = {}
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)):
+            continue
+        func = node.value.func
+        ctor = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+        keyword = _ROUTER_PREFIX_KEYWORDS.get(ctor)
+        prefix = ""
+        if keyword:
+            for kw in node.value.keywords:
+                if kw.arg == keyword:
+                    prefix = _const_str(kw.value) or ""
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                prefixes[target.id] = prefix
+
+    routes = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if not (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)):
+                continue
+            attr = decorator.func.attr
+            if attr not in _ROUTE_DECORATORS:
+                continue
+            owner = decorator.func.value
+            owner_name = owner.id if isinstance(owner, ast.Name) else None
+
+            path = _const_str(decorator.args[0]) if decorator.args else None
+            methods: List[str] = []
+            for kw in decorator.keywords:
+                if kw.arg in ("rule", "path") and path is None:
+                    path = _const_str(kw.value)
+                elif kw.arg == "methods" and isinstance(kw.value, (ast.List, ast.Tuple, ast.Set)):
+                    methods = [m.upper() for m in (_const_str(e) for e in kw.value.elts) if m]
+            if path is None:
+                continue
+
+            implied = _ROUTE_DECORATORS[attr]
+            methods = [implied] if implied else (methods or ["GET"])
+            full_path = _join_paths(prefixes.get(owner_name, ""), path)
+            for method in methods:
+                routes.append({
+                    "method": method,
+                    "path": full_path,
+                    "handler": node.name,
+                    "module": module,
+                    "file_path": file_path,
+                    "source": "python",
+                })
+    return routes
+
+
+def extract_openapi_routes(file_path: str, text: str) -> List[Dict[str, str]]:
+    """Extract operations from an OpenAPI / Swagger spec (JSON, or YAML if PyYAML is installed)"""
+    if "openapi" not in text and "swagger" not in text:
+        return []
+    try:
+        if file_path.lower().endswith(".json"):
+            spec = json.loads(text)
+        else:
+            import yaml
+            spec = yaml.safe_load(text)
+    except ImportError:
+        logger.debug(f"PyYAML not installed; skipping OpenAPI spec {file_path}")
+        return []
+    except Exception:
+        return []
+
+    if not isinstance(spec, dict) or not ("openapi" in spec or "swagger" in spec):
+        return []
+
+    base_path = spec.get("basePath", "") if isinstance(spec.get("basePath"), str) else ""
+    routes = []
+    for path, operations in (spec.get("paths") or {}).items():
+        if not isinstance(operations, dict):
+            continue
+        for method, operation in operations.items():
+            if method.lower() not in HTTP_METHODS:
+                continue
+            operation = operation if isinstance(operation, dict) else {}
+            routes.append({
+                "method": method.upper(),
+                "path": _join_paths(base_path, path),
+                "handler": operation.get("operationId", ""),
+                "module": file_path,
+                "file_path": file_path,
+                "source": "openapi",
+            })
+    return routes
+
+
+class EndpointCatalogue:
+    """Route -> handler -> module catalogue for one repository"""
+
+    def __init__(self, endpoints: Optional[List[Dict[str, str]]] = None):
+        self.endpoints: List[Dict[str, str]] = endpoints or []
+
+    def add_python_file(self, file_path: str, source: str):
+        self.endpoints.extend(extract_python_routes(file_path, source))
+
+    def add_spec_file(self, file_path: str, text: str):
+        self.endpoints.extend(extract_openapi_routes(file_path, text))
+
+    def search(
+        self,
+        path: Optional[str] = None,
+        method: Optional[str] = None,
+        modules: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, str]]:
+        """Filter endpoints by path substring, HTTP method and/or exact module names"""
+        module_set = set(modules) if modules is not None else None
+        results = []
+        for endpoint in self.endpoints:
+            if path and path not in endpoint["path"]:
+                continue
+            if method and endpoint["method"] != method.upper():
+                continue
+            if module_set is not None and endpoint["module"] not in module_set:
+                continue
+            results.append(endpoint)
+        return results
+
+    def to_dict(self) -> dict:
+        return {"endpoints": self.endpoints}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EndpointCatalogue":
+        return cls(list(data.get("endpoints", [])))
+
+
+def format_endpoint(endpoint: Dict[str, str]) -> str:
+    return f"{endpoint['method']} {endpoint['path']}"
+
+
+class EndpointIndex:
+    """In-process view of every persisted endpoint catalogue"""
+
+    def __init__(self, artifact_store: Optional[ArtifactStore] = None):
+        self._cache = ArtifactCache(ARTIFACT_NAME, EndpointCatalogue.from_dict, artifact_store)
+
+    def catalogues(self) -> Dict[str, EndpointCatalogue]:
+        """Current catalogues keyed by repository"""
+        return self._cache.get()
+
+    def search(
+        self,
+        path: Optional[str] = None,
+        method: Optional[str] = None,
+        modules: Optional[Iterable[str]] = None,
+        repository: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Search all (or one) repository catalogues"""
+        modules = list(modules) if modules is not None else None
+        results = []
+        for repo, catalogue in self.catalogues().items():
+            if repository and repo != repository:
+                continue
+            for endpoint in catalogue.search(path=path, method=method, modules=modules):
+                results.append({**endpoint, "repository": repo})
+        return results
+
+    def endpoints_for_modules(self, modules: Iterable[str]) -> List[str]:
+        """Formatted endpoints ("METHOD /path") handled in any of the given modules"""
+        return sorted({format_endpoint(e) for e in self.search(modules=list(modules))})
+
+
+_endpoint_index: Optional[EndpointIndex] = None
+
+
+def get_endpoint_index() -> EndpointIndex:
+    """Get endpoint index instance (singleton)"""
+    global _endpoint_index
+    if _endpoint_index is None:
+        _endpoint_index = EndpointIndex()
+    return _endpoint_index
@@ -0,0 +1,128 @@
+import ast
+import re
+from collections import defaultdict
+from pathlib import PurePosixPath
+from typing import Dict, List
+
+from langchain_core.documents import Document
+
+MAX_SUMMARY_CHARS = 1500
+MAX_DIRECTORY_FILES = 50
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+
+def _first_line(text: str) -> str:
+    for line in (text or "").strip().splitlines():
+        if line.strip():
+            return line.strip()
+    return ""
+
+
+def _signature(node: ast.AST) -> str:
+    """def name(args) -> returns / class Name(bases)"""
+    if isinstance(node, ast.ClassDef):
+        bases = ", ".join(ast.unparse(base) for base in node.bases)
+        return f"class {node.name}({bases})" if bases else f"class {node.name}"
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns is not None else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+
+def summarize_python(source: str) -> List[str]:
+    """Module docstring plus top-level and method signatures with their first docstring line"""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return summarize_text(source)
+
+    lines = []
+    docstring = _first_line(ast.get_docstring(tree) or "")
+    if docstring:
+        lines.append(docstring)
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        doc = _first_line(ast.get_docstring(node) or "")
+        lines.append(f"{_signature(node)}: {doc}" if doc else _signature(node))
+        if isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) and not child.name.startswith("__"):
+                    child_doc = _first_line(ast.get_docstring(child) or "")
+                    signature = f"    {_signature(child)}"
+                    lines.append(f"{signature}: {child_doc}" if child_doc else signature)
+    return lines
+
+
+def summarize_markdown(text: str) -> List[str]:
+    """Headings (indented by level), ignoring fenced code blocks"""
+    lines = []
+    in_fence = False
+    for line in text.splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            in_fence = not in_fence
+            continue
+        match = None if in_fence else _HEADING_PATTERN.match(line)
+        if match:
+            lines.append("  " * (len(match.group(1)) - 1) + match.group(2))
+    return lines or summarize_text(text)
+
+
+def summarize_text(text: str, max_lines: int = 10) -> List[str]:
+    """First non-empty lines"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    return lines[:max_lines]
+
+
+def summarize_file(file_path: str, text: str) -> str:
+    """Compact representation of a file for the file-level summary index"""
+    suffix = PurePosixPath(file_path).suffix.lower()
+    if suffix == ".py":
+        lines = summarize_python(text)
+    elif suffix in (".md", ".markdown", ".rst"):
+        lines = summarize_markdown(text)
+    else:
+        lines = summarize_text(text)
+    return "\n".join([f"File: {file_path}"] + lines)[:MAX_SUMMARY_CHARS]
+
+
+class FileSummaryBuilder:
+    """Collects per-file summaries during loading and derives directory summaries"""
+
+    def __init__(self):
+        self.summaries: Dict[str, str] = {}  # file_path -> summary
+        self.file_types: Dict[str, str] = {}
+
+    def add_file(self, file_path: str, text: str):
+        self.summaries[file_path] = summarize_file(file_path, text)
+        self.file_types[file_path] = PurePosixPath(file_path).suffix
+
+    def documents(self, repository: str) -> List[Document]:
+        """File-level and directory-level summary documents"""
+        docs = []
+        by_directory: Dict[str, List[str]] = defaultdict(list)
+        for file_path, summary in sorted(self.summaries.items()):
+            docs.append(Document(page_content=summary, metadata={
+                "level": "file",
+                "file_path": file_path,
+                "file_type": self.file_types.get(file_path, ""),
+                "repository": repository,
+            }))
+            parent = PurePosixPath(file_path).parent.as_posix()
+            by_directory["" if parent == "." else parent].append(file_path)
+
+        for directory, files in sorted(by_directory.items()):
+            files = files[:MAX_DIRECTORY_FILES]
+            lines = [f"Directory: {directory or '/'}"]
+            for file_path in files:
+                # Second line of a file summary is its docstring / first heading / first line
+                summary_lines = self.summaries[file_path].splitlines()
+                description = summary_lines[1] if len(summary_lines) > 1 else ""
+                name = PurePosixPath(file_path).name
+                lines.append(f"{name}: {description}" if description else name)
+            docs.append(Document(page_content="\n".join(lines)[:MAX_SUMMARY_CHARS], metadata={
+                "level": "directory",
+                "file_path": directory or "/",
+                "files": files,
+                "repository": repository,
+            }))
+        return docs
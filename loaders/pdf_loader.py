@@ -0,0 +1,109 @@
+"""
+Page-parallel, streaming PDF extraction
+
+Pages are extracted with pypdf in worker processes, a range of pages per task, and
+yielded in page order as soon as each range is done. Only a bounded number of ranges is
+in flight, so a long manual never sits in memory all at once and the caller can embed
+early pages while later ones are still being extracted.
+"""
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+T = TypeVar("T")
+
+
+def page_hash(text: str) -> str:
+    """Content hash of a page's text (whitespace-insensitive, so re-flowed exports still match)"""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def iter_batches(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Consecutive lists of up to size items"""
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def extract_pages(file_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """(page index, text) for pages [start, end); runs in a worker process"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    return [(i, reader.pages[i].extract_text() or "") for i in range(start, end)]
+
+
+class StreamingPDFLoader(BaseLoader):
+    """PDF pages as documents (with page_hash), extracted in parallel and yielded in order"""
+
+    def __init__(self, file_path: str, workers: Optional[int] = None, pages_per_task: int = 16):
+        """
+        Args:
+            workers: Extraction processes (None: one per CPU; 1 extracts in-process)
+            pages_per_task: Pages extracted per task
+        """
+        self.file_path = file_path
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task)
+
+    def page_count(self) -> int:
+        from pypdf import PdfReader
+
+        return len(PdfReader(self.file_path).pages)
+
+    def _document(self, index: int, text: str, total: int) -> Document:
+        return Document(
+            page_content=text,
+            metadata={
+                "source": self.file_path,
+                "page": index,  # 0-based, as PyPDFLoader
+                "total_pages": total,
+                "page_hash": page_hash(text),
+            }
+        )
+
+    def _ranges(self, total: int) -> List[Tuple[int, int]]:
+        return [(start, min(start + self.pages_per_task, total)) for start in range(0, total, self.pages_per_task)]
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Pages with text, in page order"""
+        total = self.page_count()
+        ranges = self._ranges(total)
+        if self.workers <= 1 or len(ranges) <= 1:
+            for start, end in ranges:
+                for index, text in extract_pages(self.file_path, start, end):
+                    if text.strip():
+                        yield self._document(index, text, total)
+            return
+
+        # Spawned, not forked: the loader runs on request and upload-index threads, and a
+        # fork can inherit locks held by other threads (logging, HTTP clients)
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.workers, len(ranges)),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            # Keep two ranges per worker in flight: enough to hide latency, bounded memory
+            window = 2 * self.workers
+            pending = [executor.submit(extract_pages, self.file_path, *r) for r in ranges[:window]]
+            next_range = len(pending)
+            while pending:
+                pages = pending.pop(0).result()
+                if next_range < len(ranges):
+                    pending.append(executor.submit(extract_pages, self.file_path, *ranges[next_range]))
+                    next_range += 1
+                for index, text in pages:
+                    if text.strip():
+                        yield self._document(index, text, total)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,13 +1,8 @@
 import os
+import re
 from pathlib import Path
-from typing import List, Dict, Any
-from langchain_community.document_loaders import (
-    TextLoader,
-    PythonLoader,
-    JSONLoader,
-    UnstructuredMarkdownLoader,
-    PyPDFLoader,
-)
+from typing import List, Dict, Any, Iterator, Optional
+from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document
 try:
     from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -15,132 +10,414 @@ except ImportError:
     # Fallback for older versions
     from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from loaders.dependency_graph import DependencyGraph
+from loaders.endpoint_catalogue import EndpointCatalogue, MAX_SPEC_BYTES
+from loaders.file_summaries import FileSummaryBuilder
 from utils.logger import get_logger
 from utils.config import get_settings
+from utils.metrics import observe_stage
 
 logger = get_logger()
 
+DEFAULT_IGNORE_PATTERNS = [
+    '__pycache__',
+    '.git',
+    '.venv',
+    'venv',
+    'node_modules',
+    '.pytest_cache',
+    '.mypy_cache',
+    'chroma_db',
+    '.env',
+    '.DS_Store',
+    '*.pyc',
+    '*.pyo',
+    '*.pyd',
+]
+
+CHUNK_MODES = ("standard", "small")
+STREAMED_SUFFIXES = ('.json',)  # Parsed incrementally and split as they are read
+SUMMARY_PREFIX_CHARS = 64 * 1024  # Text of a streamed file kept for its summary
+SPEC_HEADER_BYTES = 16 * 1024  # Read to decide whether a JSON/YAML file is an OpenAPI spec
+_SPEC_MARKER = re.compile(r'(?:^|[{,])\s*["\']?(openapi|swagger)["\']?\s*:', re.MULTILINE)
+
+
+def number_chunks(chunks: List[Document]) -> List[Document]:
+    """Give every chunk its file-local position (chunk_index) and the file's chunk count"""
+    counts: Dict[str, int] = {}
+    for chunk in chunks:
+        file_path = chunk.metadata.get('file_path', '')
+        chunk.metadata['chunk_index'] = counts.get(file_path, 0)
+        counts[file_path] = chunk.metadata['chunk_index'] + 1
+    for chunk in chunks:
+        chunk.metadata['total_chunks'] = counts[chunk.metadata.get('file_path', '')]
+    return chunks
+
+
+def declares_spec(file_path: Path) -> bool:
+    """Whether a JSON/YAML file declares openapi/swagger near its top (read before parsing it whole)"""
+    with open(file_path, 'rb') as f:
+        header = f.read(SPEC_HEADER_BYTES).decode('utf-8', errors='ignore')
+    return bool(_SPEC_MARKER.search(header))
+
+
+_ATX_HEADING = re.compile(r'^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+_SETEXT_UNDERLINE = re.compile(r'^ {0,3}(=+|-+)[ \t]*$')
+_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+
+
+class MarkdownSection:
+    """A heading with its own lines and nested subsections"""
+    
+    def __init__(self, level: int, title: str):
+        self.level = level
+        self.title = title
+        self.lines: List[str] = []
+        self.children: List['MarkdownSection'] = []
+    
+    def text(self) -> str:
+        """This section's text including all subsections"""
+        return '\n'.join([*self.lines, *(child.text() for child in self.children)]).strip()
+
+
+def parse_markdown_sections(text: str) -> MarkdownSection:
+    """
+    Section tree of a Markdown document (ATX and setext headings; fenced code is never split)
+    
+    The returned root (level 0) holds any text before the first heading.
+    """
+    root = MarkdownSection(0, '')
+    stack = [root]
+    fence = None
+    
+    def open_section(level: int, title: str, line: str):
+        while stack[-1].level >= level:
+            stack.pop()
+        section = MarkdownSection(level, title.strip())
+        section.lines.append(line)
+        stack[-1].children.append(section)
+        stack.append(section)
+    
+    lines = text.splitlines()
+    if lines and lines[0].strip() == '---' and '---' in (l.strip() for l in lines[1:]):
+        # YAML front matter stays with the preamble
+        end = next(i for i in range(1, len(lines)) if lines[i].strip() == '---')
+        root.lines.extend(lines[:end + 1])
+        lines = lines[end + 1:]
+    
+    for line in lines:
+        fence_match = _FENCE.match(line)
+        if fence:
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence):
+                fence = None
+            stack[-1].lines.append(line)
+            continue
+        if fence_match:
+            fence = fence_match.group(1)
+            stack[-1].lines.append(line)
+            continue
+        
+        heading = _ATX_HEADING.match(line)
+        if heading:
+            open_section(len(heading.group(1)), heading.group(2) or '', line)
+            continue
+        
+        # Setext heading: a paragraph line underlined with === (h1) or --- (h2)
+        current = stack[-1]
+        underline = _SETEXT_UNDERLINE.match(line)
+        previous = current.lines[-1] if current.lines else ''
+        if (underline and previous.strip() and not _ATX_HEADING.match(previous)
+                and not (current.level and len(current.lines) == 1)):
+            current.lines.pop()
+            open_section(1 if underline.group(1)[0] == '=' else 2, previous, previous + '\n' + line)
+            continue
+        current.lines.append(line)
+    return root
+
+
+def split_markdown(text: str, chunk_size: int) -> List[Dict[str, Any]]:
+    """
+    Heading-aligned sections of at most chunk_size characters where possible
+    
+    The document is always split at its top-level headings. A section is kept whole with
+    its subsections when it fits; otherwise its own text and each subsection are emitted
+    separately. Oversized leaf sections are left for the character splitter.
+    
+    Returns:
+        [{"text", "heading_path", "heading_level"}] in document order
+    """
+    sections: List[Dict[str, Any]] = []
+    
+    def emit(section: MarkdownSection, path: List[str]):
+        whole = section.text()
+        if not whole:
+            return
+        if not section.children or (section.level and len(whole) <= chunk_size):
+            sections.append({'text': whole, 'heading_path': path, 'heading_level': section.level})
+            return
+        own = '\n'.join(section.lines).strip()
+        if own:
+            sections.append({'text': own, 'heading_path': path, 'heading_level': section.level})
+        for child in section.children:
+            emit(child, path + [child.title])
+    
+    emit(parse_markdown_sections(text), [])
+    return sections
+
+
+class MarkdownLoader(BaseLoader):
+    """Pure-Python heading-aware Markdown loader: one document per section, with its heading path"""
+    
+    def __init__(self, file_path: str, chunk_size: int = 1000, encoding: str = 'utf-8'):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+    
+    def lazy_load(self) -> Iterator[Document]:
+        text = Path(self.file_path).read_text(encoding=self.encoding, errors='ignore')
+        for section in split_markdown(text, self.chunk_size):
+            yield Document(
+                page_content=section['text'],
+                metadata={
+                    'source': self.file_path,
+                    'heading_path': ' > '.join(section['heading_path']),
+                    'heading_level': section['heading_level'],
+                }
+            )
+
 
 class RepositoryLoader:
     """Loads and chunks repository files for embedding"""
     
-    def __init__(self, repository_path: str):
+    def __init__(
+        self,
+        repository_path: str,
+        repository_name: Optional[str] = None,
+        ignore_patterns: Optional[List[str]] = None
+    ):
         self.repository_path = Path(repository_path)
+        self.repository_name = repository_name or self.repository_path.name
+        self.ignore_patterns = DEFAULT_IGNORE_PATTERNS + list(ignore_patterns or [])
         self.settings = get_settings()
+        self.dependency_graph = DependencyGraph()
+        self.endpoint_catalogue = EndpointCatalogue()
+        self.file_summaries = FileSummaryBuilder()
+        chunk_size, chunk_overlap = self._chunk_sizes()
         
         # Better text splitter for PDFs with page-aware chunking
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.settings.max_chunk_size,
-            chunk_overlap=self.settings.chunk_overlap,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
             length_function=len,
             separators=["\n\n\n", "\n\n", "\n", ". ", " ", ""]  # Better separators for PDFs
         )
         
         # Special splitter for PDFs that preserves page context
         self.pdf_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.settings.max_chunk_size,
-            chunk_overlap=self.settings.chunk_overlap,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
             length_function=len,
             separators=["\n\n", "\n", ". ", " ", ""]
         )
+    
+    def _chunk_sizes(self) -> tuple:
+        """
+        (chunk_size, chunk_overlap) for the configured chunk mode
+        
+        "small" embeds short non-overlapping chunks; retrieval restores the surrounding
+        context by fetching neighbouring chunks (see VectorStore.expand_neighbours).
+        """
+        mode = self.settings.chunk_mode
+        if mode not in CHUNK_MODES:
+            raise ValueError(f"Unknown chunk mode '{mode}'. Expected one of: {', '.join(CHUNK_MODES)}")
+        if mode == "small":
+            return self.settings.small_chunk_size, 0
+        return self.settings.max_chunk_size, self.settings.chunk_overlap
         
     def _get_file_loader(self, file_path: Path):
-        """Get appropriate loader for file type"""
+        """
+        Get appropriate loader for file type
+        
+        Loaders are imported per file type: langchain_community.document_loaders pulls in
+        unstructured, pypdf and friends, which dominate import time when imported eagerly.
+        """
         suffix = file_path.suffix.lower()
         
         if suffix == '.py':
+            from langchain_community.document_loaders import PythonLoader
             return PythonLoader(str(file_path))
         elif suffix == '.json':
-            return JSONLoader(str(file_path), jq_schema='.')
+            from loaders.structured_loader import StreamingJSONLoader
+            return StreamingJSONLoader(
+                str(file_path),
+                chunk_size=self._chunk_sizes()[0],
+                stream_depth=self.settings.json_stream_depth
+            )
+        elif suffix == '.ipynb':
+            from loaders.structured_loader import NotebookLoader
+            return NotebookLoader(str(file_path))
         elif suffix in ['.md', '.markdown']:
-            return UnstructuredMarkdownLoader(str(file_path))
+            return MarkdownLoader(str(file_path), chunk_size=self._chunk_sizes()[0])
         elif suffix == '.pdf':
+            from langchain_community.document_loaders import PyPDFLoader
             return PyPDFLoader(str(file_path))
-        elif suffix in ['.txt', '.yml', '.yaml', '.toml', '.ini', '.cfg']:
-            return TextLoader(str(file_path))
         else:
+            from langchain_community.document_loaders import TextLoader
             return TextLoader(str(file_path))
     
     def _should_ignore(self, file_path: Path) -> bool:
         """Check if file should be ignored"""
-        ignore_patterns = [
-            '__pycache__',
-            '.git',
-            '.venv',
-            'venv',
-            'node_modules',
-            '.pytest_cache',
-            '.mypy_cache',
-            'chroma_db',
-            '.env',
-            '.DS_Store',
-            '*.pyc',
-            '*.pyo',
-            '*.pyd',
-        ]
-        
         path_str = str(file_path)
-        return any(pattern in path_str for pattern in ignore_patterns)
+        return any(pattern in path_str for pattern in self.ignore_patterns)
     
     def load_repository(self) -> List[Document]:
-        """Load all repository files and split into chunks"""
-        documents = []
+        """Load all repository files and split into chunks (iter_chunk_batches streams them instead)"""
+        chunks = [chunk for batch in self.iter_chunk_batches() for chunk in batch]
+        logger.info(f"Split into {len(chunks)} chunks")
+        return chunks
+    
+    def iter_chunk_batches(self, batch_size: int = 512) -> Iterator[List[Document]]:
+        """
+        Chunks file by file, in lists of up to batch_size chunks of one file
         
+        Streamed files (STREAMED_SUFFIXES) are split while they are parsed, so only the
+        current batch of a large file is held. The dependency graph, endpoint catalogue and
+        summaries are complete once the iterator is exhausted.
+        """
         if not self.repository_path.exists():
             logger.warning(f"Repository path does not exist: {self.repository_path}")
-            return documents
+            return
         
         # Check if it's a single file (e.g., PDF)
         if self.repository_path.is_file():
             logger.info(f"Loading single file: {self.repository_path}")
-            return self._load_single_file(self.repository_path)
+            if self.repository_path.suffix.lower() in STREAMED_SUFFIXES:
+                metadata = self._file_metadata(self.repository_path, self.repository_path.name)
+                metadata['source'] = str(self.repository_path)
+                yield from self._iter_streamed_file(self.repository_path, metadata, batch_size)
+            else:
+                chunks = self._load_single_file(self.repository_path)
+                for start in range(0, len(chunks), batch_size):
+                    yield chunks[start:start + batch_size]
+            return
         
         logger.info(f"Loading repository from: {self.repository_path}")
         
+        files = 0
         # Walk through repository
-        for root, dirs, files in os.walk(self.repository_path):
+        for root, dirs, names in os.walk(self.repository_path):
             # Filter out ignored directories
             dirs[:] = [d for d in dirs if not self._should_ignore(Path(root) / d)]
             
-            for file in files:
-                file_path = Path(root) / file
+            for name in names:
+                file_path = Path(root) / name
                 
                 if self._should_ignore(file_path):
                     continue
                 
                 try:
-                    loader = self._get_file_loader(file_path)
-                    loaded_docs = loader.load()
-                    
-                    # Add metadata
-                    for doc in loaded_docs:
-                        doc.metadata.update({
-                            'file_path': str(file_path.relative_to(self.repository_path)),
-                            'file_name': file_path.name,
-                            'file_type': file_path.suffix,
-                        })
-                    
-                    documents.extend(loaded_docs)
+                    yield from self._iter_file_batches(file_path, batch_size)
+                    files += 1
                     logger.debug(f"Loaded: {file_path.relative_to(self.repository_path)}")
-                    
                 except Exception as e:
                     logger.warning(f"Failed to load {file_path}: {e}")
                     continue
         
-        logger.info(f"Loaded {len(documents)} documents")
+        logger.info(f"Loaded {files} files")
+        self.dependency_graph.finalize()
+        logger.info(f"Built dependency graph with {len(self.dependency_graph.modules)} Python modules")
+        logger.info(f"Catalogued {len(self.endpoint_catalogue.endpoints)} HTTP endpoints")
+    
+    def _file_metadata(self, file_path: Path, relative_path: str) -> Dict[str, Any]:
+        return {
+            'file_path': relative_path,
+            'file_name': file_path.name,
+            'file_type': file_path.suffix,
+            'repository': self.repository_name,
+        }
+    
+    def _iter_file_batches(self, file_path: Path, batch_size: int) -> Iterator[List[Document]]:
+        """Chunks of one repository file, after recording its static analysis"""
+        relative_path = file_path.relative_to(self.repository_path).as_posix()
+        metadata = self._file_metadata(file_path, relative_path)
+        if file_path.suffix.lower() in STREAMED_SUFFIXES:
+            # Summaries only use the first lines, so a bounded prefix gives the same result
+            prefix = yield from self._iter_streamed_file(file_path, metadata, batch_size)
+            self._run_static_passes(file_path, relative_path, prefix)
+            return
+        
+        loader = self._get_file_loader(file_path)
+        with observe_stage("loader.load"):
+            loaded_docs = loader.load()
+        for doc in loaded_docs:
+            doc.metadata.update(metadata)
+        self._run_static_passes(file_path, relative_path, "\n".join(doc.page_content for doc in loaded_docs))
         
-        # Split into chunks
-        chunks = self.text_splitter.split_documents(documents)
-        logger.info(f"Split into {len(chunks)} chunks")
+        with observe_stage("loader.split"):
+            chunks = number_chunks(self.text_splitter.split_documents(loaded_docs))
+        for start in range(0, len(chunks), batch_size):
+            yield chunks[start:start + batch_size]
+    
+    def _iter_streamed_file(self, file_path: Path, metadata: Dict[str, Any], batch_size: int):
+        """
+        Split a streamed file document by document, yielding batches of chunks
         
-        return chunks
+        Chunks get chunk_index but no total_chunks (unknown until the end). Returns the
+        first SUMMARY_PREFIX_CHARS of the file's text.
+        """
+        loader = self._get_file_loader(file_path)
+        batch: List[Document] = []
+        prefix: List[str] = []
+        prefix_chars = chunk_index = 0
+        for doc in loader.lazy_load():
+            doc.metadata.update(metadata)
+            if prefix_chars < SUMMARY_PREFIX_CHARS:
+                prefix.append(doc.page_content)
+                prefix_chars += len(doc.page_content) + 1
+            with observe_stage("loader.split"):
+                chunks = self.text_splitter.split_documents([doc])
+            for chunk in chunks:
+                chunk.metadata['chunk_index'] = chunk_index
+                chunk_index += 1
+            batch.extend(chunks)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return "\n".join(prefix)[:SUMMARY_PREFIX_CHARS]
+    
+    @property
+    def summary_documents(self) -> List[Document]:
+        """File- and directory-level summaries for the coarse retrieval index"""
+        return self.file_summaries.documents(self.repository_name)
+    
+    def _run_static_passes(self, file_path: Path, relative_path: str, source: str):
+        """Record file summaries, and imports and HTTP routes of Python files and OpenAPI specs"""
+        suffix = file_path.suffix.lower()
+        with observe_stage("loader.file_summaries"):
+            self.file_summaries.add_file(relative_path, source)
+        if suffix == '.py':
+            with observe_stage("loader.dependency_graph"):
+                self.dependency_graph.add_file(relative_path, source)
+            with observe_stage("loader.endpoint_catalogue"):
+                self.endpoint_catalogue.add_python_file(relative_path, source)
+        elif (
+            suffix in ('.json', '.yml', '.yaml')
+            and file_path.stat().st_size <= MAX_SPEC_BYTES
+            and declares_spec(file_path)
+        ):
+            with observe_stage("loader.endpoint_catalogue"):
+                text = file_path.read_text(encoding='utf-8', errors='ignore')
+                self.endpoint_catalogue.add_spec_file(relative_path, text)
     
     def _load_single_file(self, file_path: Path) -> List[Document]:
         """Load and chunk a single file (e.g., PDF)"""
         try:
             logger.info(f"Loading single file: {file_path.name}")
             loader = self._get_file_loader(file_path)
-            loaded_docs = loader.load()
+            with observe_stage("loader.load"):
+                loaded_docs = loader.load()
             
             logger.info(f"Loaded {len(loaded_docs)} pages/sections from {file_path.name}")
             
@@ -153,24 +430,21 @@ class RepositoryLoader:
                     'file_name': file_path.name,
                     'file_type': file_path.suffix,
                     'page': page_num,
-                    'source': str(file_path)
+                    'source': str(file_path),
+                    'repository': self.repository_name,
                 })
             
             # Use PDF-specific splitter for better chunking
-            if file_path.suffix.lower() == '.pdf':
-                logger.info("Using PDF-optimized chunking")
-                chunks = self.pdf_splitter.split_documents(loaded_docs)
-            else:
-                chunks = self.text_splitter.split_documents(loaded_docs)
+            with observe_stage("loader.split"):
+                if file_path.suffix.lower() == '.pdf':
+                    logger.info("Using PDF-optimized chunking")
+                    chunks = self.pdf_splitter.split_documents(loaded_docs)
+                else:
+                    chunks = self.text_splitter.split_documents(loaded_docs)
             
             logger.info(f"Split {file_path.name} into {len(chunks)} chunks")
             
-            # Add chunk index to metadata for better tracking
-            for i, chunk in enumerate(chunks):
-                chunk.metadata['chunk_index'] = i
-                chunk.metadata['total_chunks'] = len(chunks)
-            
-            return chunks
+            return number_chunks(chunks)
             
         except Exception as e:
             logger.error(f"Failed to load single file {file_path}: {e}", exc_info=True)
@@ -0,0 +1,201 @@
+"""
+Streaming loaders for large structured files (JSON, Jupyter notebooks)
+
+JSON is read incrementally: containers are walked down to stream_depth and only one
+value at a time is decoded with JSONDecoder.raw_decode, so memory is bounded by the
+largest value at that depth instead of by the file. Values are emitted as
+path-annotated lines (`$.paths["/users"].get: {...}`), with neighbouring small values
+grouped into documents of up to chunk_size characters.
+"""
+import json
+import re
+from typing import Any, Iterator, List, Tuple
+
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+READ_SIZE = 1 << 20  # Characters per read
+_WHITESPACE = " \t\n\r"
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+
+
+class JsonStream:
+    """Incremental reader over a JSON text file"""
+
+    def __init__(self, f, read_size: int = READ_SIZE):
+        self._f = f
+        self._read_size = read_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._offset = 0  # Characters consumed before the buffer
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read more text (at least as much as is unread, so retries stay linear); False at EOF"""
+        if self._eof:
+            return False
+        unread = self._buffer[self._pos:]
+        data = self._f.read(max(self._read_size, len(unread)))
+        if not data:
+            self._eof = True
+            return False
+        self._offset += self._pos
+        self._buffer = unread + data
+        self._pos = 0
+        return True
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"{message} at character {self._offset + self._pos}")
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        """Consume char (after whitespace)"""
+        if self.peek() != char:
+            raise self.error(f"Expected '{char}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the complete value at the current position"""
+        if not self.peek():
+            raise self.error("Unexpected end of file")
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise self.error(f"Invalid JSON ({e.msg})") from e
+            # A number cut by the end of the buffer (`12`, or `12.`/`1e-` where raw_decode
+            # stops at the integer part) may continue in the next read
+            if _NUMBER_TAIL.match(self._buffer, end) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def end(self):
+        """Check that nothing but whitespace follows the top-level value"""
+        if self.peek():
+            raise self.error("Extra data after JSON value")
+
+
+def child_path(path: str, key: Any) -> str:
+    """JSONPath-style path of an object member or array element"""
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    if _IDENTIFIER.match(key):
+        return f"{path}.{key}"
+    return f"{path}[{json.dumps(key, ensure_ascii=False)}]"
+
+
+def iter_json_values(stream: JsonStream, stream_depth: int, path: str = "$", depth: int = 0) -> Iterator[Tuple[str, Any]]:
+    """(path, value) for every value at stream_depth (or shallower scalars), in document order"""
+    char = stream.peek()
+    if depth >= stream_depth or char not in ("[", "{"):
+        yield path, stream.value()
+        return
+
+    close = "]" if char == "[" else "}"
+    stream.expect(char)
+    if stream.peek() == close:
+        stream.expect(close)
+        yield path, [] if char == "[" else {}
+        return
+
+    index = 0
+    while True:
+        if char == "{":
+            key = stream.value()
+            if not isinstance(key, str):
+                raise stream.error("Expected an object key")
+            stream.expect(":")
+            yield from iter_json_values(stream, stream_depth, child_path(path, key), depth + 1)
+        else:
+            yield from iter_json_values(stream, stream_depth, child_path(path, index), depth + 1)
+        index += 1
+        if stream.peek() != ",":
+            break
+        stream.expect(",")
+    stream.expect(close)
+
+
+class StreamingJSONLoader(BaseLoader):
+    """JSON files as path-annotated documents, parsed incrementally"""
+
+    def __init__(self, file_path: str, chunk_size: int = 1000, stream_depth: int = 2, encoding: str = "utf-8"):
+        """
+        Args:
+            chunk_size: Target characters per document (larger single values are emitted alone)
+            stream_depth: Container depth walked incrementally; values below it are decoded whole
+        """
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.stream_depth = stream_depth
+        self.encoding = encoding
+
+    def _document(self, lines: List[str], first_path: str) -> Document:
+        return Document(
+            page_content="\n".join(lines),
+            metadata={"source": self.file_path, "json_path": first_path, "json_values": len(lines)}
+        )
+
+    def lazy_load(self) -> Iterator[Document]:
+        with open(self.file_path, encoding=self.encoding) as f:
+            stream = JsonStream(f)
+            lines: List[str] = []
+            first_path = "$"
+            size = 0
+            for path, value in iter_json_values(stream, self.stream_depth):
+                line = f"{path}: {json.dumps(value, ensure_ascii=False, default=str)}"
+                if lines and size + len(line) > self.chunk_size:
+                    yield self._document(lines, first_path)
+                    lines, size = [], 0
+                if not lines:
+                    first_path = path
+                lines.append(line)
+                size += len(line) + 1
+            if lines:
+                yield self._document(lines, first_path)
+            stream.end()
+
+
+class NotebookLoader(BaseLoader):
+    """Jupyter notebooks, one document per non-empty cell (cell outputs are skipped)"""
+
+    def __init__(self, file_path: str, encoding: str = "utf-8"):
+        self.file_path = file_path
+        self.encoding = encoding
+
+    def lazy_load(self) -> Iterator[Document]:
+        with open(self.file_path, encoding=self.encoding) as f:
+            stream = JsonStream(f)
+            cell_index = 0
+            # Cells are decoded one at a time, so large embedded outputs never pile up
+            for path, cell in iter_json_values(stream, stream_depth=2):
+                if not path.startswith("$.cells[") or not isinstance(cell, dict):
+                    continue
+                source = cell.get("source", "")
+                if isinstance(source, list):
+                    source = "".join(source)
+                if source.strip():
+                    yield Document(
+                        page_content=source,
+                        metadata={
+                            "source": self.file_path,
+                            "json_path": path,
+                            "cell_index": cell_index,
+                            "cell_type": cell.get("cell_type", "code"),
+                        }
+                    )
+                cell_index += 1
+            stream.end()
@@ -1,9 +1,10 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 
 from api.routes import bp
 from utils.logger import get_logger
 from utils.config import get_settings
+from utils.metrics import get_metrics
 
 logger = get_logger()
 settings = get_settings()
@@ -13,6 +14,9 @@ def create_app():
     """Create and configure Flask application"""
     app = Flask(__name__)
     
+    # Oversized uploads are refused before the body is read
+    app.config["MAX_CONTENT_LENGTH"] = settings.upload_max_request_mb * 1024 * 1024
+    
     # CORS configuration
     CORS(app, resources={
         r"/api/*": {
@@ -34,6 +38,14 @@ def create_app():
             "status": "running"
         })
     
+    @app.route("/metrics")
+    def metrics():
+        """Prometheus metrics endpoint"""
+        return Response(
+            get_metrics().render_prometheus(),
+            mimetype="text/plain; version=0.0.4"
+        )
+    
     return app
 
 
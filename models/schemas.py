@@ -41,6 +41,8 @@ class ImpactAssessment(BaseModel):
     affected_flows: List[str] = Field(default_factory=list, description="Affected business flows")
     client_impact: str = Field(description="Client-facing impact description")
     breaking_changes: List[str] = Field(default_factory=list, description="List of breaking changes")
+    retrieval: Dict[str, Any] = Field(default_factory=dict, description="Number of context chunks retrieved and why")
+    parse_fallback: bool = Field(default=False, description="Level and lists were inferred from non-JSON LLM output")
 
 
 class QuestionRequest(BaseModel):
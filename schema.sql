@@ -16,6 +16,8 @@ CREATE TABLE IF NOT EXISTS repository_embeddings (
 );
 
 -- Step 3: Create index for vector similarity search (HNSW index for fast searches)
+-- For halfvec / binary-quantized storage or fewer dimensions, run
+-- scripts/migrate_vector_storage.py after this schema
 CREATE INDEX IF NOT EXISTS repository_embeddings_embedding_idx 
 ON repository_embeddings 
 USING hnsw (embedding vector_cosine_ops);
@@ -31,11 +33,45 @@ ON repository_embeddings
 USING GIN (to_tsvector('english', content));
 
 -- Step 6: Create match_documents function (required by LangChain SupabaseVectorStore)
--- This function performs similarity search using cosine distance
+-- This function performs similarity search using cosine distance.
+-- ef_search (optional) sets hnsw.ef_search for this call (HNSW_EF_SEARCH in settings)
+-- Only rows of each repository's active index version are returned (see Step 8);
+-- repository_index_versions holds the active version per repository
+CREATE TABLE IF NOT EXISTS repository_index_versions (
+    repository TEXT PRIMARY KEY,
+    active_version TEXT NOT NULL,
+    previous_version TEXT,
+    promoted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Every match function calls prepare_hnsw_search first. The version filter runs after the
+-- HNSW scan and the retained previous build (gc keeps it for rollback) duplicates every
+-- unchanged chunk, so ef_search is raised to twice the candidates needed (capped at
+-- pgvector's 1000). With pgvector >= 0.8, iterative scans keep searching when too few
+-- candidates survive the filter.
+CREATE OR REPLACE FUNCTION prepare_hnsw_search(candidates int, ef_search int DEFAULT NULL)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  pgvector_version int[] := (SELECT string_to_array(extversion, '.')::int[] FROM pg_extension WHERE extname = 'vector');
+BEGIN
+  PERFORM set_config('hnsw.ef_search', LEAST(1000, GREATEST(
+    COALESCE(ef_search, NULLIF(current_setting('hnsw.ef_search', true), '')::int, 40),
+    2 * candidates
+  ))::text, true);
+  IF pgvector_version >= ARRAY[0, 8] THEN
+    PERFORM set_config('hnsw.iterative_scan', 'strict_order', true);
+  END IF;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS match_documents(vector, int, jsonb);
 CREATE OR REPLACE FUNCTION match_documents(
   query_embedding vector(1536),
   match_count int DEFAULT 5,
-  filter jsonb DEFAULT '{}'::jsonb
+  filter jsonb DEFAULT '{}'::jsonb,
+  ef_search int DEFAULT NULL
 )
 RETURNS TABLE (
   id uuid,
@@ -46,7 +82,11 @@ RETURNS TABLE (
 )
 LANGUAGE plpgsql
 AS $$
+DECLARE
+  active_versions jsonb := (SELECT COALESCE(jsonb_object_agg(v.repository, v.active_version), '{}'::jsonb)
+                            FROM repository_index_versions v);
 BEGIN
+  PERFORM prepare_hnsw_search(match_count, ef_search);
   RETURN QUERY
   SELECT
     re.id,
@@ -57,12 +97,264 @@ BEGIN
   FROM repository_embeddings re
   WHERE 1=1
     AND (filter = '{}'::jsonb OR re.metadata @> filter)
+    AND (active_versions->>(re.metadata->>'repository') = re.metadata->>'index_version'
+         OR (re.metadata->>'index_version' IS NULL
+             AND NOT active_versions ? COALESCE(re.metadata->>'repository', '')))
+  ORDER BY re.embedding <=> query_embedding
+  LIMIT match_count;
+END;
+$$;
+
+-- Step 7: Hierarchical retrieval (HIERARCHICAL_RETRIEVAL=true)
+-- File- and directory-level summaries (docstrings, signatures, headings) in a separate,
+-- much smaller index; QA first picks the top files here, then searches chunks only within them
+CREATE TABLE IF NOT EXISTS repository_file_summaries (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    content TEXT NOT NULL,
+    metadata JSONB,
+    embedding vector(1536),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS repository_file_summaries_embedding_idx
+ON repository_file_summaries
+USING hnsw (embedding vector_cosine_ops);
+
+CREATE INDEX IF NOT EXISTS repository_file_summaries_metadata_idx
+ON repository_file_summaries
+USING GIN (metadata);
+
+CREATE OR REPLACE FUNCTION match_file_summaries(
+  query_embedding vector(1536),
+  match_count int DEFAULT 10,
+  filter jsonb DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (
+  id uuid,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  active_versions jsonb := (SELECT COALESCE(jsonb_object_agg(v.repository, v.active_version), '{}'::jsonb)
+                            FROM repository_index_versions v);
+BEGIN
+  PERFORM prepare_hnsw_search(match_count);
+  RETURN QUERY
+  SELECT
+    fs.id,
+    fs.content,
+    fs.metadata,
+    1 - (fs.embedding <=> query_embedding) AS similarity
+  FROM repository_file_summaries fs
+  WHERE (filter = '{}'::jsonb OR fs.metadata @> filter)
+    AND (active_versions->>(fs.metadata->>'repository') = fs.metadata->>'index_version'
+         OR (fs.metadata->>'index_version' IS NULL
+             AND NOT active_versions ? COALESCE(fs.metadata->>'repository', '')))
+  ORDER BY fs.embedding <=> query_embedding
+  LIMIT match_count;
+END;
+$$;
+
+-- Fine stage: chunk search restricted to the selected files (served by the
+-- file_path index rather than the HNSW graph, so results are exact)
+CREATE INDEX IF NOT EXISTS repository_embeddings_file_path_idx
+ON repository_embeddings ((metadata->>'file_path'));
+
+CREATE OR REPLACE FUNCTION match_documents_in_files(
+  query_embedding vector(1536),
+  file_paths text[],
+  match_count int DEFAULT 5,
+  filter jsonb DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (
+  id uuid,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  active_versions jsonb := (SELECT COALESCE(jsonb_object_agg(v.repository, v.active_version), '{}'::jsonb)
+                            FROM repository_index_versions v);
+BEGIN
+  PERFORM prepare_hnsw_search(match_count);
+  RETURN QUERY
+  SELECT
+    re.id,
+    re.content,
+    re.metadata,
+    1 - (re.embedding <=> query_embedding) AS similarity
+  FROM repository_embeddings re
+  WHERE re.metadata->>'file_path' = ANY(file_paths)
+    AND (filter = '{}'::jsonb OR re.metadata @> filter)
+    AND (active_versions->>(re.metadata->>'repository') = re.metadata->>'index_version'
+         OR (re.metadata->>'index_version' IS NULL
+             AND NOT active_versions ? COALESCE(re.metadata->>'repository', '')))
   ORDER BY re.embedding <=> query_embedding
   LIMIT match_count;
 END;
 $$;
 
--- Step 7: Add helpful comments
+-- Step 8: Blue/green index versions
+-- Every build tags its rows with metadata.index_version (time-ordered, so later builds sort
+-- after earlier ones) and becomes visible only when promote_index_version moves the
+-- repository's pointer to it: a single-row upsert, so readers switch atomically and never see
+-- a half-written build. Unversioned rows from before this step stay visible until the
+-- repository's first versioned build is promoted.
+CREATE INDEX IF NOT EXISTS repository_embeddings_version_idx
+ON repository_embeddings ((metadata->>'repository'), (metadata->>'index_version'));
+
+CREATE INDEX IF NOT EXISTS repository_file_summaries_version_idx
+ON repository_file_summaries ((metadata->>'repository'), (metadata->>'index_version'));
+
+-- Every version ever promoted per repository: gc only deletes builds listed here (plus
+-- abandoned ones, below), so a build that is still being written is never touched
+CREATE TABLE IF NOT EXISTS repository_index_version_history (
+    repository TEXT NOT NULL,
+    version TEXT NOT NULL,
+    promoted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (repository, version)
+);
+
+INSERT INTO repository_index_version_history (repository, version)
+SELECT repository, active_version FROM repository_index_versions
+UNION
+SELECT repository, previous_version FROM repository_index_versions WHERE previous_version IS NOT NULL
+ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION promote_index_version(p_repository text, p_version text)
+RETURNS void
+LANGUAGE sql
+AS $$
+  INSERT INTO repository_index_version_history (repository, version)
+  VALUES (p_repository, p_version)
+  ON CONFLICT DO NOTHING;
+
+  INSERT INTO repository_index_versions AS v (repository, active_version, previous_version, promoted_at)
+  VALUES (p_repository, p_version, NULL, NOW())
+  ON CONFLICT (repository) DO UPDATE
+  SET previous_version = v.active_version,
+      active_version = EXCLUDED.active_version,
+      promoted_at = NOW()
+  WHERE v.active_version IS DISTINCT FROM EXCLUDED.active_version;
+$$;
+
+-- Swap the active and previous versions; returns the now-active version (NULL if none to roll back to)
+CREATE OR REPLACE FUNCTION rollback_index_version(p_repository text)
+RETURNS text
+LANGUAGE sql
+AS $$
+  UPDATE repository_index_versions
+  SET active_version = previous_version,
+      previous_version = active_version,
+      promoted_at = NOW()
+  WHERE repository = p_repository AND previous_version IS NOT NULL
+  RETURNING active_version;
+$$;
+
+-- Delete rows of superseded versions (promoted once, no longer active) and unversioned
+-- rows, optionally keeping the previous version for rollback. Builds that were never
+-- promoted are only deleted once their time-ordered version is older than
+-- abandoned_after_s (a failed or killed run; NULL or 0 keeps them), so builds still being
+-- written, including ones started before the active build, are never touched.
+DROP FUNCTION IF EXISTS gc_index_versions(text, boolean);
+
+CREATE OR REPLACE FUNCTION gc_index_versions(
+  p_repository text,
+  keep_previous boolean DEFAULT true,
+  abandoned_after_s int DEFAULT 86400
+)
+RETURNS bigint
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_active text;
+  v_keep text;
+  v_superseded text[];
+  v_abandoned_before text;
+  removed bigint := 0;
+  deleted bigint;
+BEGIN
+  SELECT active_version, CASE WHEN keep_previous THEN previous_version END
+  INTO v_active, v_keep
+  FROM repository_index_versions WHERE repository = p_repository;
+  IF v_active IS NULL THEN
+    RETURN 0;
+  END IF;
+
+  v_superseded := ARRAY(
+    SELECT h.version FROM repository_index_version_history h
+    WHERE h.repository = p_repository
+      AND h.version <> v_active
+      AND h.version IS DISTINCT FROM v_keep
+  );
+  IF COALESCE(abandoned_after_s, 0) > 0 THEN
+    -- Same format as new_build_version(): UTC %Y%m%dT%H%M%S-<random>
+    v_abandoned_before := to_char(
+      (NOW() - make_interval(secs => abandoned_after_s)) AT TIME ZONE 'UTC', 'YYYYMMDD"T"HH24MISS'
+    );
+  END IF;
+
+  DELETE FROM repository_embeddings
+  WHERE metadata->>'repository' = p_repository
+    AND (metadata->>'index_version' IS NULL
+         OR metadata->>'index_version' = ANY(v_superseded)
+         OR (metadata->>'index_version' < v_abandoned_before
+             AND metadata->>'index_version' ~ '^[0-9]{8}T[0-9]{6}-'
+             AND metadata->>'index_version' <> v_active
+             AND metadata->>'index_version' IS DISTINCT FROM v_keep
+             AND NOT EXISTS (SELECT 1 FROM repository_index_version_history h
+                             WHERE h.repository = p_repository
+                               AND h.version = metadata->>'index_version')));
+  GET DIAGNOSTICS deleted = ROW_COUNT;
+  removed := removed + deleted;
+
+  DELETE FROM repository_file_summaries
+  WHERE metadata->>'repository' = p_repository
+    AND (metadata->>'index_version' IS NULL
+         OR metadata->>'index_version' = ANY(v_superseded)
+         OR (metadata->>'index_version' < v_abandoned_before
+             AND metadata->>'index_version' ~ '^[0-9]{8}T[0-9]{6}-'
+             AND metadata->>'index_version' <> v_active
+             AND metadata->>'index_version' IS DISTINCT FROM v_keep
+             AND NOT EXISTS (SELECT 1 FROM repository_index_version_history h
+                             WHERE h.repository = p_repository
+                               AND h.version = metadata->>'index_version')));
+  GET DIAGNOSTICS deleted = ROW_COUNT;
+  removed := removed + deleted;
+
+  DELETE FROM repository_index_version_history
+  WHERE repository = p_repository AND version = ANY(v_superseded);
+
+  RETURN removed;
+END;
+$$;
+
+-- Step 9: Neighbour expansion (NEIGHBOUR_WINDOW / CHUNK_MODE=small)
+-- Fetches chunks by (repository, file_path, index_version, chunk_index) in one call;
+-- served by the file_path index. keys: [{"repository", "file_path", "index_version", "chunk_index"}]
+CREATE OR REPLACE FUNCTION match_chunks(keys jsonb)
+RETURNS TABLE (
+  id uuid,
+  content text,
+  metadata jsonb
+)
+LANGUAGE sql STABLE
+AS $$
+  SELECT re.id, re.content, re.metadata
+  FROM jsonb_to_recordset(keys) AS k(repository text, file_path text, index_version text, chunk_index int)
+  JOIN repository_embeddings re
+    ON re.metadata->>'file_path' = k.file_path
+   AND re.metadata->>'chunk_index' = k.chunk_index::text
+   AND (k.repository IS NULL OR re.metadata->>'repository' = k.repository)
+   AND re.metadata->>'index_version' IS NOT DISTINCT FROM k.index_version;
+$$;
+
+-- Step 10: Add helpful comments
 COMMENT ON TABLE repository_embeddings IS 'Stores embedded code/documentation chunks for semantic search';
 COMMENT ON COLUMN repository_embeddings.content IS 'The actual text content of the code/documentation chunk';
 COMMENT ON COLUMN repository_embeddings.metadata IS 'JSON metadata including file_path, file_name, file_type, etc.';
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Index many repositories from a manifest
+Usage: python scripts/bulk_index.py <manifest.yaml|manifest.json> [--parallel 4] [--output summary.json]
+
+Manifest (YAML or JSON):
+    defaults:
+      depth: 1
+    repositories:
+      - https://github.com/org/billing-service
+      - path: https://github.com/org/claims-service.git
+        name: claims
+        branch: develop
+        exclude: [fixtures, migrations]
+      - /srv/checkouts/member-portal
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.bulk_indexer import BulkIndexer, load_manifest
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index many repositories from a manifest")
+    parser.add_argument("manifest", help="YAML or JSON manifest of paths / Git URLs")
+    parser.add_argument("--parallel", type=int, default=4, help="Repositories indexed concurrently")
+    parser.add_argument("--max-clones", type=int, default=2, help="Concurrent git clones")
+    parser.add_argument("--max-loader-processes", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Processes parsing and chunking files (0 = load in the indexing threads)")
+    parser.add_argument("--max-embedding-requests", type=int, default=4,
+                        help="Concurrent embedding batches across all repositories")
+    parser.add_argument("--embedding-batch-size", type=int, default=256, help="Chunks per embedding batch")
+    parser.add_argument("--output", help="Also write the JSON summary to this file")
+    args = parser.parse_args()
+
+    specs = load_manifest(args.manifest)
+    logger.info(f"Bulk indexing {len(specs)} repositories")
+
+    indexer = BulkIndexer(
+        max_parallel=args.parallel,
+        max_clones=args.max_clones,
+        max_loader_processes=args.max_loader_processes,
+        max_embedding_requests=args.max_embedding_requests,
+        embedding_batch_size=args.embedding_batch_size
+    )
+    summary = indexer.run(specs)
+
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    print(output)
+
+    totals = summary["totals"]
+    print(f"{'✓' if not totals['failed'] else '✗'} {totals['ok']}/{totals['repositories']} repositories indexed, "
+          f"{totals['chunks']} chunks in {totals['elapsed_s']}s ({totals['chunks_per_s']} chunks/s)")
+    if totals["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
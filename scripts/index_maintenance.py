@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+HNSW index maintenance for the embeddings table
+Usage:
+    python scripts/index_maintenance.py stats
+    python scripts/index_maintenance.py rebuild --m 16 --ef-construction 128 [--concurrently]
+    python scripts/index_maintenance.py vacuum [--full]
+    python scripts/index_maintenance.py bench --ef-search 20,40,80,160 [--queries 50 --k 10]
+
+Connects directly to Postgres (DATABASE_URL, requires psycopg). Run `vacuum` and
+`rebuild` after large bulk inserts; `bench` compares recall@k against exact search
+and match_documents latency for each ef_search value. The chosen value is applied at
+query time through HNSW_EF_SEARCH or the ?ef_search= request parameter.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from embeddings.pg_maintenance import (
+    current_layout,
+    health_report,
+    rebuild_index,
+    repository_counts,
+    storage_report,
+    sweep_ef_search,
+    vacuum_analyze
+)
+from utils.config import get_settings
+from utils.db import get_pg_connection
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def cmd_stats(conn, args) -> dict:
+    return {
+        "layout": current_layout(conn, args.table),
+        "storage": storage_report(conn, args.table),
+        "health": health_report(conn, args.table),
+        "repositories": repository_counts(conn, args.table),
+    }
+
+
+def cmd_rebuild(conn, args) -> dict:
+    layout = current_layout(conn, args.table)
+    before = storage_report(conn, args.table)
+    build_s = rebuild_index(
+        conn,
+        args.table,
+        layout["storage"],
+        layout["dimensions"],
+        m=args.m,
+        ef_construction=args.ef_construction,
+        concurrently=args.concurrently,
+        maintenance_work_mem=args.maintenance_work_mem
+    )
+    return {
+        "storage": layout["storage"],
+        "m": args.m,
+        "ef_construction": args.ef_construction,
+        "build_s": round(build_s, 3),
+        "index_mb_before": before["hnsw_index_mb"],
+        "index_mb_after": storage_report(conn, args.table)["hnsw_index_mb"],
+    }
+
+
+def cmd_vacuum(conn, args) -> dict:
+    vacuum_analyze(conn, args.table, full=args.full)
+    return {"storage": storage_report(conn, args.table), "health": health_report(conn, args.table)}
+
+
+def cmd_bench(conn, args) -> dict:
+    ef_values = [int(value) for value in args.ef_search.split(",") if value.strip()]
+    return {
+        "k": args.k,
+        "queries": args.queries,
+        "results": sweep_ef_search(conn, args.table, ef_values, queries=args.queries, k=args.k),
+    }
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="HNSW index maintenance for the embeddings table")
+    parser.add_argument("--table", default=settings.supabase_vector_table)
+    parser.add_argument("--dsn", help="Postgres connection string (default: DATABASE_URL)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Index size, table health and row counts per repository")
+
+    rebuild = subparsers.add_parser("rebuild", help="Rebuild the HNSW index with chosen parameters")
+    rebuild.add_argument("--m", type=int, help="Max connections per node (pgvector default 16)")
+    rebuild.add_argument("--ef-construction", type=int, help="Build candidate list size (pgvector default 64)")
+    rebuild.add_argument("--concurrently", action="store_true",
+                         help="Build next to the old index and swap, keeping search available")
+    rebuild.add_argument("--maintenance-work-mem", help="e.g. 1GB; faster builds when the graph fits in memory")
+
+    vacuum = subparsers.add_parser("vacuum", help="VACUUM (ANALYZE) the embeddings table")
+    vacuum.add_argument("--full", action="store_true", help="VACUUM FULL (rewrites the table, takes a lock)")
+
+    bench = subparsers.add_parser("bench", help="Sweep ef_search against recall@k and latency")
+    bench.add_argument("--ef-search", default="10,20,40,80,160,320", help="Comma-separated values")
+    bench.add_argument("--queries", type=int, default=50, help="Sampled stored embeddings used as queries")
+    bench.add_argument("--k", type=int, default=10)
+
+    args = parser.parse_args()
+    commands = {"stats": cmd_stats, "rebuild": cmd_rebuild, "vacuum": cmd_vacuum, "bench": cmd_bench}
+
+    conn = get_pg_connection(args.dsn, autocommit=True)
+    try:
+        print(json.dumps(commands[args.command](conn, args), indent=2, default=str))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
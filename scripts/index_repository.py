@@ -3,29 +3,30 @@
 Script to index a repository for analysis
 Usage: python scripts/index_repository.py <repository_path>
 """
+import argparse
 import sys
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from services.repository_service import RepositoryService
-from utils.logger import get_logger
-
-logger = get_logger()
-
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/index_repository.py <repository_path>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Index a repository for analysis")
+    parser.add_argument("repository_path", help="Local repository path, GitHub URL, or single file")
+    parser.add_argument("--keep-clone", action="store_true",
+                        help="Keep the temporary clone of a GitHub repository")
+    args = parser.parse_args()
     
-    repository_path = sys.argv[1]
+    # Imported after argument parsing so --help and usage errors return immediately
+    from services.repository_service import RepositoryService
+    from utils.logger import get_logger
     
-    logger.info(f"Starting repository indexing: {repository_path}")
+    logger = get_logger()
+    logger.info(f"Starting repository indexing: {args.repository_path}")
     
     service = RepositoryService()
-    success = service.index_repository(repository_path)
+    success = service.index_repository(args.repository_path, cleanup=not args.keep_clone)
     
     if success:
         logger.info("Repository indexing completed successfully!")
@@ -38,4 +39,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Export / import the embedding index without re-embedding
+Usage:
+    python scripts/index_snapshot.py export <snapshot_dir> [--source supabase|local] [--dtype float16]
+    python scripts/index_snapshot.py import <snapshot_dir> [--target supabase|local]
+
+Supabase is read/written over a direct Postgres connection when DATABASE_URL (or --dsn)
+is set (requires psycopg), otherwise through the Supabase REST API. The local backend
+uses LOCAL_INDEX_PATH (or --local-path). Index artifacts (dependency graphs, endpoint
+catalogues) travel with the snapshot, and imported repositories get a new index version
+so cached LLM responses are not reused across environments.
+"""
+import argparse
+import json
+import shutil
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from embeddings.snapshot import (
+    DTYPES,
+    SnapshotReader,
+    SnapshotWriter,
+    iter_postgres_rows,
+    iter_supabase_rows,
+    write_local_batch,
+    write_postgres_batch,
+    write_supabase_batch
+)
+from utils.artifacts import ArtifactStore
+from utils.config import get_settings
+from utils.index_version import bump_index_version, get_active_builds, record_active_build
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def open_local_store(path: str):
+    from embeddings.local_store import LocalVectorStore
+    # Rows carry their embeddings, so no embedding model is needed here
+    return LocalVectorStore(None, persist_path=path)
+
+
+def open_supabase(dsn: str):
+    """(psycopg connection, None) when a DSN is available, else (None, supabase client)"""
+    settings = get_settings()
+    if dsn:
+        from utils.db import get_pg_connection, register_vector_types
+        conn = get_pg_connection(dsn, autocommit=True)
+        register_vector_types(conn)  # Binary COPY on import when pgvector is installed
+        return conn, None
+    from supabase import create_client
+    if not settings.supabase_url or not settings.supabase_key:
+        raise ValueError("Set DATABASE_URL, or SUPABASE_URL and SUPABASE_KEY")
+    return None, create_client(settings.supabase_url, settings.supabase_key)
+
+
+def read_active_versions(conn, client) -> dict:
+    """Active index version per repository on the Supabase side (empty before blue/green versioning)"""
+    try:
+        if conn is not None:
+            with conn.cursor() as cur:
+                cur.execute("SELECT repository, active_version FROM repository_index_versions")
+                return dict(cur.fetchall())
+        rows = client.table("repository_index_versions").select("repository,active_version").execute().data or []
+        return {row["repository"]: row["active_version"] for row in rows}
+    except Exception as e:
+        logger.warning(f"Could not read repository_index_versions ({e}); exporting without version pointers")
+        return {}
+
+
+def promote_versions(versions: dict, conn, client):
+    """Point each repository at its snapshot version on the target"""
+    for repository, version in versions.items():
+        if conn is not None:
+            with conn.cursor() as cur:
+                cur.execute("SELECT promote_index_version(%s, %s)", (repository, version))
+        elif client is not None:
+            client.rpc("promote_index_version", {"p_repository": repository, "p_version": version}).execute()
+        record_active_build(repository, version)
+
+
+def export_snapshot(args) -> dict:
+    settings = get_settings()
+    info = {
+        "source": args.source,
+        "table": args.table,
+        "embedding_model": settings.embedding_model,
+        "embedding_dimensions": settings.embedding_dimensions,
+    }
+
+    conn = None
+    if args.source == "local":
+        info["index_versions"] = get_active_builds()
+        batches = open_local_store(args.local_path).iter_rows(args.batch_size)
+    else:
+        conn, client = open_supabase(args.dsn)
+        info["index_versions"] = read_active_versions(conn, client)
+        batches = (iter_postgres_rows(conn, args.table, args.batch_size) if conn
+                   else iter_supabase_rows(client, args.table, args.batch_size))
+    writer = SnapshotWriter(args.snapshot, shard_size=args.shard_size, dtype=args.dtype, info=info)
+    try:
+        for batch in batches:
+            writer.write(*batch)
+    finally:
+        if conn is not None:
+            conn.close()
+    manifest = writer.close()
+
+    artifacts = ArtifactStore()
+    if artifacts.root.exists():
+        shutil.copytree(artifacts.root, Path(args.snapshot) / "artifacts", dirs_exist_ok=True)
+    return manifest
+
+
+def import_snapshot(args) -> dict:
+    settings = get_settings()
+    reader = SnapshotReader(args.snapshot)
+    manifest = reader.manifest
+    if manifest.get("embedding_model") and manifest["embedding_model"] != settings.embedding_model:
+        logger.warning(
+            f"Snapshot was embedded with {manifest['embedding_model']} but EMBEDDING_MODEL is "
+            f"{settings.embedding_model}; query embeddings will not match"
+        )
+
+    repositories = set()
+    rows = 0
+    conn = store = client = None
+    if args.target == "local":
+        store = open_local_store(args.local_path)
+        write = partial(write_local_batch, store)
+    else:
+        conn, client = open_supabase(args.dsn)
+        if conn is not None:
+            write = partial(write_postgres_batch, conn, args.table)
+        else:
+            write = partial(write_supabase_batch, client, args.table)
+    try:
+        for batch in reader.iter_batches(args.batch_size):
+            write(batch)
+            rows += len(batch[0])
+            repositories.update(m.get("repository") for m in batch[2] if m.get("repository"))
+            logger.info(f"Imported {rows}/{manifest['rows']} rows")
+        if store is not None:
+            store.save()
+
+        artifacts_dir = Path(args.snapshot) / "artifacts"
+        artifact_store = ArtifactStore()
+        if artifacts_dir.exists():
+            shutil.copytree(artifacts_dir, artifact_store.root, dirs_exist_ok=True)
+        # Imported rows keep their index_version tags; make the exported versions active here too
+        promote_versions(manifest.get("index_versions") or {}, conn, client)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    for repository in sorted(repositories):
+        bump_index_version(repository, artifact_store)
+
+    return {"rows": rows, "repositories": sorted(repositories), "target": args.target}
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Export / import the embedding index without re-embedding")
+    parser.add_argument("--table", default=settings.supabase_vector_table)
+    parser.add_argument("--dsn", default=settings.database_url, help="Postgres connection string (default: DATABASE_URL)")
+    parser.add_argument("--local-path", default=settings.local_index_path, help="Local backend directory")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Rows per database round trip")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export = subparsers.add_parser("export", help="Dump content, metadata and embeddings")
+    export.add_argument("snapshot", help="Output directory")
+    export.add_argument("--source", choices=("supabase", "local"), default=settings.vector_backend)
+    export.add_argument("--dtype", choices=DTYPES, default="float32",
+                        help="float16 halves the snapshot size (cosine ranking is essentially unchanged)")
+    export.add_argument("--shard-size", type=int, default=20000, help="Rows per shard file")
+
+    restore = subparsers.add_parser("import", help="Bulk-load a snapshot")
+    restore.add_argument("snapshot", help="Snapshot directory")
+    restore.add_argument("--target", choices=("supabase", "local"), default=settings.vector_backend)
+
+    args = parser.parse_args()
+    backend = args.source if args.command == "export" else args.target
+    if backend == "local" and not args.local_path:
+        parser.error("--local-path (or LOCAL_INDEX_PATH) is required for the local backend")
+
+    start = time.perf_counter()
+    result = export_snapshot(args) if args.command == "export" else import_snapshot(args)
+    result["elapsed_s"] = round(time.perf_counter() - start, 1)
+    print(json.dumps({k: v for k, v in result.items() if k != "shards"}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
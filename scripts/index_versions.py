@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Blue/green index versions
+Usage:
+    python scripts/index_versions.py status
+    python scripts/index_versions.py promote <repository> <version>
+    python scripts/index_versions.py rollback <repository>
+    python scripts/index_versions.py gc <repository> [--drop-previous] [--abandoned-after-s N]
+
+Each indexing run writes its rows under a new index version and promotes it once all
+rows are stored; searches only see the active version. `rollback` re-activates the
+previous build, `gc` deletes rows of builds that were promoted and since replaced, and of
+never-promoted builds older than --abandoned-after-s (failed runs). Works against the
+configured backend (Supabase or local).
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect, promote, roll back and clean up index versions")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="Active and previous version per repository")
+
+    promote = subparsers.add_parser("promote", help="Make a fully written build the active one")
+    promote.add_argument("repository")
+    promote.add_argument("version")
+
+    rollback = subparsers.add_parser("rollback", help="Re-activate the previous build")
+    rollback.add_argument("repository")
+
+    gc = subparsers.add_parser("gc", help="Delete rows of superseded and abandoned builds")
+    gc.add_argument("repository")
+    gc.add_argument("--drop-previous", action="store_true",
+                    help="Also delete the previous build (rollback is no longer possible)")
+    gc.add_argument("--abandoned-after-s", type=int,
+                    help="Age after which never-promoted builds are deleted (default: INDEX_GC_ABANDONED_AFTER_S, 0 keeps them)")
+
+    args = parser.parse_args()
+
+    from embeddings.vector_store import get_vector_store
+
+    store = get_vector_store()
+    if args.command == "status":
+        result = store.get_index_versions()
+    elif args.command == "promote":
+        store.promote_index_version(args.repository, args.version)
+        result = {"repository": args.repository, "active_version": args.version}
+    elif args.command == "rollback":
+        version = store.rollback_index_version(args.repository)
+        if version is None:
+            print(f"No previous version recorded for {args.repository}", file=sys.stderr)
+            sys.exit(1)
+        result = {"repository": args.repository, "active_version": version}
+    else:
+        removed = store.gc_index_versions(
+            args.repository,
+            keep_previous=not args.drop_previous,
+            abandoned_after_s=args.abandoned_after_s
+        )
+        result = {"repository": args.repository, "rows_removed": removed}
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Convert the embeddings table to a compact storage mode in place
+Usage: python scripts/migrate_vector_storage.py --storage halfvec [--dimensions 512 --truncate]
+
+Storage modes (pgvector >= 0.7):
+    vector   full-precision float32 column, HNSW on vector_cosine_ops (schema.sql default)
+    halfvec  float16 column (half the row and index size), HNSW on halfvec_cosine_ops
+    binary   float32 column kept for re-scoring, HNSW on binary_quantize(embedding)::bit(n);
+             match_documents over-fetches match_count * rescore_factor candidates by Hamming
+             distance and re-ranks them by full-precision cosine distance
+
+--dimensions with --truncate shortens stored vectors to their first N components and
+re-normalizes them. This is only valid for text-embedding-3-* models (their embeddings can
+be shortened this way); set EMBEDDING_MODEL and EMBEDDING_DIMENSIONS to the same values so
+query embeddings match. ada-002 embeddings must be re-indexed instead. An empty table can be
+given any --dimensions, e.g. before re-indexing with a local embedding model.
+
+The file-summaries table (--summary-table, skipped when it does not exist) is converted in
+the same transaction to the same dimensions, and match_file_summaries is recreated with it.
+Summaries use halfvec in halfvec mode and full-precision vector otherwise.
+
+Index size, build time and query latency are reported after every run.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from embeddings.pg_maintenance import (
+    current_layout,
+    measure_queries,
+    sample_query_vectors,
+    storage_report
+)
+from embeddings.schema_sql import (
+    DROP_MATCH_DOCUMENTS_SQL,
+    HNSW_SEARCH_SETUP_SQL,
+    INDEX_VERSIONS_TABLE_SQL,
+    STORAGE_MODES,
+    embedding_column_type,
+    hnsw_index_sql,
+    index_name,
+    match_documents_in_files_sql,
+    match_documents_sql,
+    match_file_summaries_sql,
+    summary_storage
+)
+from utils.config import get_settings
+from utils.db import get_pg_connection
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def convert_expression(storage: str, current_dims: int, dimensions: int) -> str:
+    """USING expression that converts the existing column to the target type"""
+    source = "embedding::vector"
+    if dimensions < current_dims:
+        source = f"l2_normalize(subvector(embedding::vector, 1, {dimensions}))"
+    return f"({source})::{embedding_column_type(storage, dimensions)}"
+
+
+def table_exists(conn, table: str) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+        return cur.fetchone()[0]
+
+
+def migration_sql(
+    table: str,
+    storage: str,
+    dimensions: int,
+    current_dims: int,
+    rescore_factor: int,
+    m: int = None,
+    ef_construction: int = None,
+    summary_table: str = None,
+    summary_dims: int = None
+) -> List[str]:
+    """
+    Statements converting the chunk table (and the file-summaries table, when given) and
+    recreating their HNSW indexes and match functions
+    """
+    statements = [
+        f"DROP INDEX IF EXISTS {index_name(table)}",
+        f"ALTER TABLE {table} ALTER COLUMN embedding TYPE "
+        f"{embedding_column_type(storage, dimensions)} "
+        f"USING {convert_expression(storage, current_dims, dimensions)}",
+        hnsw_index_sql(table, storage, dimensions, m=m, ef_construction=ef_construction),
+    ]
+    if summary_table:
+        # Summaries are embedded with the same model, so they must follow the chunks' dimensions
+        statements += [
+            f"DROP INDEX IF EXISTS {index_name(summary_table)}",
+            f"ALTER TABLE {summary_table} ALTER COLUMN embedding TYPE "
+            f"{embedding_column_type(summary_storage(storage), dimensions)} "
+            f"USING {convert_expression(summary_storage(storage), summary_dims or dimensions, dimensions)}",
+            hnsw_index_sql(summary_table, summary_storage(storage), dimensions, m=m, ef_construction=ef_construction),
+        ]
+    statements += [
+        DROP_MATCH_DOCUMENTS_SQL,
+        INDEX_VERSIONS_TABLE_SQL,  # Read by the match functions
+        HNSW_SEARCH_SETUP_SQL,
+        match_documents_sql(table, storage, dimensions, rescore_factor),
+        match_documents_in_files_sql(table, storage, dimensions),
+    ]
+    if summary_table:
+        statements.append(match_file_summaries_sql(summary_table, storage, dimensions))
+    return statements
+
+
+def migrate(conn, statements: List[str], table: str, summary_table: str = None) -> float:
+    """Run the migration statements in one transaction; returns seconds spent building HNSW indexes"""
+    build_s = 0.0
+    with conn.transaction():
+        with conn.cursor() as cur:
+            for statement in statements:
+                if statement.startswith("CREATE INDEX"):
+                    logger.info(f"Building index: {statement}")
+                    start = time.perf_counter()
+                    cur.execute(statement)
+                    build_s += time.perf_counter() - start
+                else:
+                    cur.execute(statement)
+    with conn.cursor() as cur:
+        cur.execute(f"ANALYZE {table}")
+        if summary_table:
+            cur.execute(f"ANALYZE {summary_table}")
+    return build_s
+
+
+def check_resize(parser, table: str, current_dims: int, rows: int, dimensions: int, truncate: bool):
+    """Reject growing stored vectors, and shortening them without --truncate"""
+    # An empty table (e.g. emptied to switch EMBEDDING_PROVIDER before re-indexing) can take any size
+    if not (current_dims and rows > 0):
+        return
+    if dimensions > current_dims:
+        parser.error(f"Cannot grow {table} embeddings from {current_dims} to {dimensions} dimensions; re-index instead")
+    if dimensions < current_dims and not truncate:
+        parser.error(
+            f"Shortening {table} {current_dims} -> {dimensions} dimensions requires --truncate "
+            "(text-embedding-3-* embeddings only)"
+        )
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Convert the embeddings table to compact vector storage")
+    parser.add_argument("--storage", choices=STORAGE_MODES, default=settings.vector_storage)
+    parser.add_argument("--dimensions", type=int, default=settings.embedding_dimensions,
+                        help="Target dimensionality (default: keep current)")
+    parser.add_argument("--truncate", action="store_true",
+                        help="Allow shortening existing text-embedding-3-* vectors to --dimensions")
+    parser.add_argument("--rescore-factor", type=int, default=4,
+                        help="binary mode: candidates fetched per requested match before re-scoring")
+    parser.add_argument("--m", type=int, help="HNSW m (default: pgvector default)")
+    parser.add_argument("--ef-construction", type=int, help="HNSW ef_construction (default: pgvector default)")
+    parser.add_argument("--table", default=settings.supabase_vector_table)
+    parser.add_argument("--summary-table", default=settings.supabase_summary_table,
+                        help="File-summaries table migrated alongside (skipped when it does not exist)")
+    parser.add_argument("--dsn", help="Postgres connection string (default: DATABASE_URL)")
+    parser.add_argument("--queries", type=int, default=50, help="Sample queries for the latency report")
+    parser.add_argument("--k", type=int, default=10, help="match_count for the latency report")
+    parser.add_argument("--report-only", action="store_true", help="Only report the current layout")
+    parser.add_argument("--dry-run", action="store_true", help="Print the SQL without executing it")
+    args = parser.parse_args()
+
+    conn = get_pg_connection(args.dsn, autocommit=True)
+    try:
+        layout = current_layout(conn, args.table)
+        before = storage_report(conn, args.table)
+        current_dims = layout["dimensions"]
+        dimensions = args.dimensions or current_dims
+        check_resize(parser, args.table, current_dims, before["rows"], dimensions, args.truncate)
+        summary_table = args.summary_table if args.summary_table and table_exists(conn, args.summary_table) else None
+        summary_dims = None
+        if summary_table:
+            summary_dims = current_layout(conn, summary_table)["dimensions"]
+            summary_rows = storage_report(conn, summary_table)["rows"]
+            check_resize(parser, summary_table, summary_dims, summary_rows, dimensions, args.truncate)
+        statements = migration_sql(
+            args.table, args.storage, dimensions, current_dims, args.rescore_factor,
+            args.m, args.ef_construction, summary_table, summary_dims
+        )
+        if args.storage == "vector" and dimensions > 2000:
+            logger.warning("HNSW supports at most 2000 dimensions for vector; consider --storage halfvec")
+
+        report = {"table": args.table, "before": {**layout, **before}}
+
+        if args.dry_run:
+            for statement in statements:
+                print(statement if statement.endswith(";") else statement + ";")
+            return
+
+        if not args.report_only:
+            logger.info(f"Migrating {args.table}: {layout['column_type']} -> {args.storage}({dimensions})")
+            report["build_s"] = round(migrate(conn, statements, args.table, summary_table), 3)
+            report["after"] = {**current_layout(conn, args.table), **storage_report(conn, args.table)}
+            report["settings"] = {
+                "storage": args.storage,
+                "dimensions": dimensions,
+                "rescore_factor": args.rescore_factor if args.storage == "binary" else None,
+            }
+        vectors = sample_query_vectors(conn, args.table, args.queries)
+        report["query_latency"] = measure_queries(conn, vectors, args.k)["latency"]
+        print(json.dumps(report, indent=2))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
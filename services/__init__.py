@@ -1,5 +1,6 @@
 from .repository_service import RepositoryService
 from .analysis_service import AnalysisService
+from .bulk_indexer import BulkIndexer
+from .upload_service import UploadService
 
-__all__ = ["RepositoryService", "AnalysisService"]
-
+__all__ = ["RepositoryService", "AnalysisService", "BulkIndexer", "UploadService"]
@@ -1,7 +1,11 @@
-from chains.qa_chain import RepositoryQAChain
-from chains.validation_chain import ChangeValidationChain
-from chains.impact_chain import ImpactAnalysisChain
-from chains.decision_chain import DecisionChain
+import re
+from functools import cached_property
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+from chains.llm_cache import llm_cache_bypassed
+from chains.retrieval import build_change_search_query
 from models.schemas import (
     QuestionRequest,
     QuestionResponse,
@@ -10,47 +14,133 @@ from models.schemas import (
     ImpactAssessment,
     DecisionResponse
 )
+from utils.config import get_settings
+from utils.index_version import get_index_version
 from utils.logger import get_logger
+from utils.singleflight import SingleFlight, make_flight_key
 
 logger = get_logger()
 
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_payload(value: Any) -> Any:
+    """Request payload with insignificant whitespace collapsed, for coalescing keys"""
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {k: normalize_payload(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [normalize_payload(v) for v in value]
+    return value
+
 
 class AnalysisService:
-    """Service for orchestrating analysis chains"""
+    """
+    Service for orchestrating analysis chains
+    
+    Chains (and the LLM / vector store clients behind them) are imported and built on
+    first use, so constructing the service is cheap and /health stays fast on a cold worker.
+    
+    Concurrent identical requests (same operation, normalized payload, index version and
+    retrieval overrides) are coalesced: one computation runs and every caller gets its result.
+    """
     
     def __init__(self):
-        self.qa_chain = RepositoryQAChain()
-        self.validation_chain = ChangeValidationChain()
-        self.impact_chain = ImpactAnalysisChain()
-        self.decision_chain = DecisionChain()
+        self.settings = get_settings()
+        self._inflight = SingleFlight("analysis")
+    
+    @cached_property
+    def qa_chain(self):
+        from chains.qa_chain import RepositoryQAChain
+        return RepositoryQAChain()
+    
+    @cached_property
+    def validation_chain(self):
+        from chains.validation_chain import ChangeValidationChain
+        return ChangeValidationChain()
+    
+    @cached_property
+    def impact_chain(self):
+        from chains.impact_chain import ImpactAnalysisChain
+        return ImpactAnalysisChain()
+    
+    @cached_property
+    def decision_chain(self):
+        from chains.decision_chain import DecisionChain
+        return DecisionChain()
+    
+    @cached_property
+    def vector_store(self):
+        from embeddings.vector_store import get_vector_store
+        return get_vector_store()
+    
+    def _coalesced(self, operation: str, request: BaseModel, compute: Callable[[Any], BaseModel]) -> BaseModel:
+        """Run compute(request), sharing the computation with identical in-flight requests"""
+        if not self.settings.request_coalescing_enabled:
+            return compute(request)
+        key = make_flight_key(
+            operation,
+            normalize_payload(request.model_dump(mode="json")),
+            get_index_version(),
+            llm_cache_bypassed(),
+            self.vector_store.get_ef_search()
+        )
+        response, leader = self._inflight.do(key, lambda: compute(request))
+        if not leader:
+            logger.info(f"Coalesced {operation} request with an identical in-flight request")
+            # Each caller gets its own copy; routes attach per-request metadata to the response
+            response = response.model_copy(deep=True)
+        return response
     
     def answer_question(self, request: QuestionRequest) -> QuestionResponse:
         """Answer a repository question"""
+        return self._coalesced("question", request, self._answer_question)
+    
+    def _answer_question(self, request: QuestionRequest) -> QuestionResponse:
         logger.info(f"Processing question: {request.question}")
         return self.qa_chain.answer_question(request)
     
     def validate_change(self, request: ChangeRequest) -> ChangeValidationResponse:
         """Validate a change request"""
+        return self._coalesced("validate", request, self._validate_change)
+    
+    def _validate_change(self, request: ChangeRequest) -> ChangeValidationResponse:
         logger.info(f"Validating change: {request.description}")
         return self.validation_chain.validate_change(request)
     
     def analyze_impact(self, request: ChangeRequest) -> ImpactAssessment:
         """Analyze impact of a change request"""
+        return self._coalesced("impact", request, self._analyze_impact)
+    
+    def _analyze_impact(self, request: ChangeRequest) -> ImpactAssessment:
         logger.info(f"Analyzing impact: {request.description}")
         return self.impact_chain.analyze_impact(request)
     
     def full_analysis(self, request: ChangeRequest) -> DecisionResponse:
         """Perform full analysis: validation + impact + decision"""
+        return self._coalesced("analyze", request, self._full_analysis)
+    
+    def _full_analysis(self, request: ChangeRequest) -> DecisionResponse:
         logger.info(f"Performing full analysis: {request.description}")
         
+        # Embed the shared retrieval query once for both chains
+        query_embedding = self.vector_store.embed_query(build_change_search_query(request))
+        
         # Run validation
-        validation = self.validate_change(request)
+        validation = self.validation_chain.validate_change(request, query_embedding=query_embedding)
         
         # Run impact analysis
-        impact = self.analyze_impact(request)
+        impact = self.impact_chain.analyze_impact(request, query_embedding=query_embedding)
         
         # Make decision
         decision = self.decision_chain.make_decision(request, validation, impact)
         
         return decision
-
+    
+    def get_stats(self) -> dict:
+        """Runtime statistics of the analysis pipeline"""
+        return {
+            "decision_rules": self.decision_chain.rules_engine.get_stats(),
+            "request_coalescing": self._inflight.get_stats()
+        }
@@ -0,0 +1,288 @@
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+from loaders.repository_loader import RepositoryLoader
+from services.repository_service import LoadedRepository, RepositoryService
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Chunk batches a loader process may have waiting for the indexing thread
+LOADER_QUEUE_BATCHES = 2
+QUEUE_POLL_S = 1.0
+
+
+@dataclass
+class RepositorySpec:
+    """One manifest entry"""
+    path: str
+    name: Optional[str] = None
+    branch: Optional[str] = None
+    depth: Optional[int] = None
+    exclude: List[str] = field(default_factory=list)  # Extra ignore patterns for the loader
+
+
+@dataclass
+class RepositoryResult:
+    """Outcome and stage timings of indexing one repository"""
+    name: str
+    path: str
+    status: str = "pending"  # ok | empty | failed
+    error: Optional[str] = None
+    files: int = 0
+    chunks: int = 0
+    clone_s: float = 0.0
+    load_s: float = 0.0
+    embed_s: float = 0.0
+    total_s: float = 0.0
+
+
+def stream_repository_batches(
+    repository_path: str,
+    repository_name: str,
+    ignore_patterns: List[str],
+    batch_size: int,
+    batches: "queue.Queue",
+    cancelled: "threading.Event"
+):
+    """
+    Loader process entry point: put chunk batches on a bounded queue as files are parsed
+
+    Sends ("batch", documents) messages, then ("done", LoadedRepository without documents)
+    carrying the summaries and static-analysis artifacts, or ("error", message). Stops
+    early once the indexing side sets cancelled.
+    """
+    def send(message) -> bool:
+        while not cancelled.is_set():
+            try:
+                batches.put(message, timeout=QUEUE_POLL_S)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        loader = RepositoryLoader(repository_path, repository_name=repository_name, ignore_patterns=ignore_patterns)
+        for batch in loader.iter_chunk_batches(batch_size):
+            if not send(("batch", batch)):
+                return
+        send(("done", LoadedRepository(
+            documents=[],
+            dependency_graph=loader.dependency_graph,
+            endpoint_catalogue=loader.endpoint_catalogue,
+            summary_documents=loader.summary_documents,
+        )))
+    except Exception as e:
+        send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _StreamedLoad:
+    """Indexing-thread side of stream_repository_batches"""
+
+    def __init__(self, batches: "queue.Queue", future: Future):
+        self.batches = batches
+        self.future = future
+        self.loaded: Optional[LoadedRepository] = None
+
+    def __iter__(self) -> Iterator[List[Document]]:
+        while True:
+            try:
+                kind, payload = self.batches.get(timeout=QUEUE_POLL_S)
+            except queue.Empty:
+                if self.future.done():
+                    self.future.result()  # Re-raises if the process died
+                    raise RuntimeError("Loader process exited without finishing")
+                continue
+            if kind == "error":
+                raise RuntimeError(f"Loading failed: {payload}")
+            if kind == "done":
+                self.loaded = payload
+                return
+            yield payload
+
+    def finish(self) -> LoadedRepository:
+        return self.loaded
+
+
+def load_manifest(path: str) -> List[RepositorySpec]:
+    """
+    Read a JSON or YAML manifest
+
+    Either a list of entries or {"defaults": {...}, "repositories": [...]}; an entry is a
+    path / Git URL string or a mapping with path, name, branch, depth and exclude.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    if path.lower().endswith((".yml", ".yaml")):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("PyYAML is required for YAML manifests. Install it with: pip install pyyaml") from e
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+
+    defaults: Dict[str, Any] = {}
+    if isinstance(data, dict):
+        defaults = data.get("defaults") or {}
+        data = data.get("repositories") or []
+    if not isinstance(data, list):
+        raise ValueError("Manifest must be a list of repositories or contain a 'repositories' list")
+
+    specs = []
+    for entry in data:
+        options = {"path": entry} if isinstance(entry, str) else dict(entry)
+        if "path" not in options:
+            raise ValueError(f"Manifest entry without 'path': {entry}")
+        specs.append(RepositorySpec(**{**defaults, **options}))
+    return specs
+
+
+class BulkIndexer:
+    """
+    Indexes many repositories in parallel with global caps on concurrent clones,
+    loader processes and in-flight embedding requests
+    """
+
+    def __init__(
+        self,
+        max_parallel: int = 4,
+        max_clones: int = 2,
+        max_loader_processes: int = 4,
+        max_embedding_requests: int = 4,
+        embedding_batch_size: int = 256
+    ):
+        self.max_parallel = max_parallel
+        self.max_loader_processes = max_loader_processes
+        self._clone_limiter = threading.Semaphore(max_clones)
+        self.repository_service = RepositoryService(
+            embedding_limiter=threading.Semaphore(max_embedding_requests),
+            embedding_batch_size=embedding_batch_size
+        )
+
+    def run(self, specs: List[RepositorySpec]) -> Dict[str, Any]:
+        """Index every repository and return the run summary"""
+        start = time.perf_counter()
+        loader_pool = manager = None
+        if self.max_loader_processes > 0:
+            # spawn: forking a process that already runs indexing threads (locks, HTTP clients) is unsafe
+            context = multiprocessing.get_context("spawn")
+            loader_pool = ProcessPoolExecutor(max_workers=self.max_loader_processes, mp_context=context)
+            manager = context.Manager()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="bulk-index") as pool:
+                results = list(pool.map(lambda spec: self._index_one(spec, loader_pool, manager), specs))
+        finally:
+            if loader_pool is not None:
+                loader_pool.shutdown()
+                manager.shutdown()
+        return self._summary(results, time.perf_counter() - start)
+
+    def _index_one(
+        self,
+        spec: RepositorySpec,
+        loader_pool: Optional[ProcessPoolExecutor],
+        manager: Optional[Any]
+    ) -> RepositoryResult:
+        """Clone, load and embed one repository, recording failures instead of raising"""
+        service = self.repository_service
+        name = spec.name or service.repository_name(spec.path)
+        result = RepositoryResult(name=name, path=spec.path)
+        started = time.perf_counter()
+        temp_dir = None
+        cancelled = None
+        try:
+            stage_start = time.perf_counter()
+            with self._clone_limiter:
+                actual_path, temp_dir = service.prepare_source(spec.path, branch=spec.branch, depth=spec.depth)
+            result.clone_s = time.perf_counter() - stage_start
+
+            # Batches are embedded while later files are still being parsed; time spent
+            # waiting for the next batch counts as load_s, the rest as embed_s
+            batch_size = service.settings.index_batch_size
+            stage_start = time.perf_counter()
+            if loader_pool is not None:
+                batches, cancelled = manager.Queue(maxsize=LOADER_QUEUE_BATCHES), manager.Event()
+                streamed = _StreamedLoad(batches, loader_pool.submit(
+                    stream_repository_batches, str(actual_path), name, spec.exclude, batch_size, batches, cancelled
+                ))
+                version = service.store_batches(name, self._track(streamed, result), streamed.finish)
+            else:
+                loader = RepositoryLoader(str(actual_path), repository_name=name, ignore_patterns=spec.exclude)
+                version = service.store_batches(
+                    name,
+                    self._track(loader.iter_chunk_batches(batch_size), result),
+                    lambda: LoadedRepository(
+                        documents=[],
+                        dependency_graph=loader.dependency_graph,
+                        endpoint_catalogue=loader.endpoint_catalogue,
+                        summary_documents=loader.summary_documents,
+                    )
+                )
+            result.embed_s = time.perf_counter() - stage_start - result.load_s
+
+            if version is None:
+                result.status = "empty"
+                logger.warning(f"[{name}] No documents found to index")
+                return result
+            result.status = "ok"
+            logger.info(f"[{name}] Indexed {result.chunks} chunks from {result.files} files")
+        except Exception as e:
+            result.status = "failed"
+            result.error = f"{type(e).__name__}: {e}"
+            logger.error(f"[{name}] Indexing failed: {result.error}")
+        finally:
+            if cancelled is not None:
+                cancelled.set()  # Release a loader process still waiting to hand over a batch
+            if temp_dir:
+                service.cleanup_temp_dir(temp_dir)
+            result.total_s = time.perf_counter() - started
+        return result
+
+    def _track(self, batches: Iterable[List[Document]], result: RepositoryResult) -> Iterator[List[Document]]:
+        """Pass batches through, recording chunk and file counts and the time spent waiting for them"""
+        files = set()
+        iterator = iter(batches)
+        while True:
+            stage_start = time.perf_counter()
+            batch = next(iterator, None)
+            result.load_s += time.perf_counter() - stage_start
+            if batch is None:
+                return
+            result.chunks += len(batch)
+            files.update(doc.metadata.get("file_path") for doc in batch)
+            result.files = len(files)
+            yield batch
+
+    def _summary(self, results: List[RepositoryResult], elapsed_s: float) -> Dict[str, Any]:
+        """Per-repository rows plus overall throughput and failures"""
+        chunks = sum(r.chunks for r in results if r.status == "ok")
+        files = sum(r.files for r in results if r.status == "ok")
+        repositories = []
+        for r in results:
+            row = {k: round(v, 2) if isinstance(v, float) else v for k, v in asdict(r).items()}
+            row["chunks_per_s"] = round(r.chunks / r.total_s, 1) if r.status == "ok" and r.total_s else None
+            repositories.append(row)
+        return {
+            "repositories": repositories,
+            "totals": {
+                "repositories": len(results),
+                "ok": sum(r.status == "ok" for r in results),
+                "empty": sum(r.status == "empty" for r in results),
+                "failed": sum(r.status == "failed" for r in results),
+                "files": files,
+                "chunks": chunks,
+                "elapsed_s": round(elapsed_s, 2),
+                "chunks_per_s": round(chunks / elapsed_s, 1) if elapsed_s else None,
+                "files_per_s": round(files / elapsed_s, 1) if elapsed_s else None,
+            },
+            "failures": {r.name: r.error for r in results if r.status == "failed"},
+        }
@@ -1,21 +1,54 @@
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, List, Optional, Tuple
+import threading
 import tempfile
 import shutil
 
+from langchain_core.documents import Document
+
 from loaders.repository_loader import RepositoryLoader
+from loaders.dependency_graph import ARTIFACT_NAME as DEPENDENCY_GRAPH_ARTIFACT, DependencyGraph
+from loaders.endpoint_catalogue import ARTIFACT_NAME as ENDPOINT_CATALOGUE_ARTIFACT, EndpointCatalogue
 from embeddings.vector_store import get_vector_store
+from utils.artifacts import ArtifactStore
+from utils.config import get_settings
+from utils.index_version import new_build_version
 from utils.logger import get_logger
 from utils.github_clone import clone_github_repo, is_github_url
 
 logger = get_logger()
 
 
+@dataclass
+class LoadedRepository:
+    """Output of the load stage (picklable, so it can be produced in a worker process)"""
+    documents: List[Document]
+    dependency_graph: DependencyGraph
+    endpoint_catalogue: EndpointCatalogue
+    summary_documents: List[Document] = field(default_factory=list)
+
+
 class RepositoryService:
     """Service for managing repository embeddings"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        embedding_limiter: Optional[threading.Semaphore] = None,
+        embedding_batch_size: int = 256
+    ):
+        """
+        Args:
+            embedding_limiter: Optional semaphore bounding concurrent embedding requests
+                (shared across services when indexing repositories in parallel)
+            embedding_batch_size: Documents per add_documents call when a limiter is set
+        """
+        self.settings = get_settings()
         self.vector_store = get_vector_store()
+        self.artifact_store = ArtifactStore()
+        self.embedding_limiter = embedding_limiter
+        self.embedding_batch_size = embedding_batch_size
         self._is_indexed = False
         self._temp_dirs = []  # Track temp directories for cleanup
     
@@ -34,57 +67,253 @@ class RepositoryService:
         try:
             logger.info(f"Starting repository indexing: {repository_path}")
             
-            # Check if it's a GitHub URL
-            if is_github_url(repository_path):
-                logger.info("Detected GitHub URL, cloning repository...")
-                temp_dir = clone_github_repo(repository_path)
-                actual_path = temp_dir
-                self._temp_dirs.append(temp_dir)
-            else:
-                actual_path = Path(repository_path)
-                if not actual_path.exists():
-                    logger.error(f"Path does not exist: {repository_path}")
-                    return False
-                
-                # If it's a single file, use it directly
-                if actual_path.is_file():
-                    logger.info(f"Detected single file: {actual_path.name}")
-            
-            # Load repository or file
             try:
-                loader = RepositoryLoader(str(actual_path))
-                documents = loader.load_repository()
-            except Exception as e:
-                logger.error(f"Error loading documents: {e}", exc_info=True)
-                if cleanup and temp_dir:
-                    self._cleanup_temp_dir(temp_dir)
+                actual_path, temp_dir = self.prepare_source(repository_path)
+            except FileNotFoundError as e:
+                logger.error(str(e))
                 return False
             
-            if not documents:
+            repository_name = self.repository_name(repository_path)
+            
+            if self.settings.pdf_streaming and actual_path.is_file() and actual_path.suffix.lower() == '.pdf':
+                if self.index_pdf(actual_path, repository_name) is None:
+                    logger.warning("No text found in PDF to index")
+                    return False
+                self._is_indexed = True
+                logger.info("PDF indexing completed successfully")
+                return True
+            
+            # Load, chunk and embed file by file
+            loader = RepositoryLoader(str(actual_path), repository_name=repository_name)
+            if self.store_repository(repository_name, loader) is None:
                 logger.warning("No documents found to index")
-                if cleanup and temp_dir:
-                    self._cleanup_temp_dir(temp_dir)
                 return False
             
-            # Add to vector store
-            self.vector_store.add_documents(documents)
-            
             self._is_indexed = True
             logger.info("Repository indexing completed successfully")
-            
-            # Cleanup temp directory if requested
-            if cleanup and temp_dir:
-                self._cleanup_temp_dir(temp_dir)
-            
             return True
-            
+        
         except Exception as e:
             logger.error(f"Failed to index repository: {e}")
-            if cleanup and temp_dir:
-                self._cleanup_temp_dir(temp_dir)
             return False
+        finally:
+            # Cleanup temp directory if requested
+            if cleanup and temp_dir:
+                self.cleanup_temp_dir(temp_dir)
+    
+    def prepare_source(
+        self,
+        repository_path: str,
+        branch: Optional[str] = None,
+        depth: Optional[int] = None
+    ) -> Tuple[Path, Optional[Path]]:
+        """
+        Resolve a local path or clone a GitHub URL
+        
+        Returns:
+            (path to load, temporary clone directory or None)
+        """
+        # Check if it's a GitHub URL
+        if is_github_url(repository_path):
+            logger.info("Detected GitHub URL, cloning repository...")
+            temp_dir = clone_github_repo(repository_path, branch=branch, depth=depth)
+            self._temp_dirs.append(temp_dir)
+            return temp_dir, temp_dir
+        
+        actual_path = Path(repository_path)
+        if not actual_path.exists():
+            raise FileNotFoundError(f"Path does not exist: {repository_path}")
+        
+        # If it's a single file, use it directly
+        if actual_path.is_file():
+            logger.info(f"Detected single file: {actual_path.name}")
+        return actual_path, None
+    
+    def store_documents(self, repository_name: str, loaded: LoadedRepository) -> str:
+        """
+        Embed and store loaded chunks (and summaries) as a new index version, then promote it
+        
+        The new rows stay invisible to searches until promotion, which switches the
+        repository to them in one step; older versions are garbage-collected afterwards.
+        
+        Returns:
+            The promoted index version
+        """
+        return self.store_batches(repository_name, [loaded.documents], lambda: loaded)
     
-    def _cleanup_temp_dir(self, temp_dir: Path):
+    def store_repository(self, repository_name: str, loader: RepositoryLoader) -> Optional[str]:
+        """
+        Stream a repository into a new index version, INDEX_BATCH_SIZE chunks at a time
+        
+        Files are loaded, split and embedded batch by batch, so only the current batch
+        (not the whole repository, nor a whole large JSON file) is held in memory.
+        
+        Returns:
+            The promoted index version, or None if there was nothing to index
+        """
+        batches = loader.iter_chunk_batches(self.settings.index_batch_size)
+        return self.store_batches(repository_name, batches, lambda: LoadedRepository(
+            documents=[],
+            dependency_graph=loader.dependency_graph,
+            endpoint_catalogue=loader.endpoint_catalogue,
+            summary_documents=loader.summary_documents,
+        ))
+    
+    def store_batches(
+        self,
+        repository_name: str,
+        batches: Iterable[List[Document]],
+        finish: Callable[[], LoadedRepository]
+    ) -> Optional[str]:
+        """
+        Add chunk batches under a new version, then summaries and artifacts, then promote
+        
+        finish() is called once the batches are exhausted and supplies the summaries and
+        static-analysis artifacts (its documents are ignored).
+        
+        Returns:
+            The promoted index version, or None if there were no chunks
+        """
+        version = new_build_version()
+        chunks = 0
+        # Batches are added unsaved; a local index is written once, before promotion
+        for batch in batches:
+            for doc in batch:
+                doc.metadata["index_version"] = version
+            self._add_documents(batch, partial(self.vector_store.add_documents, persist=False))
+            chunks += len(batch)
+        if not chunks:
+            return None
+        
+        loaded = finish()
+        if self.settings.hierarchical_retrieval:
+            for doc in loaded.summary_documents:
+                doc.metadata["index_version"] = version
+            self._add_documents(loaded.summary_documents, partial(self.vector_store.add_summary_documents, persist=False))
+        self.vector_store.save()
+        
+        # Persist index-time artifacts alongside the embeddings
+        self._save_artifacts(repository_name, loaded.dependency_graph, loaded.endpoint_catalogue)
+        self._promote(repository_name, version)
+        logger.info(f"Stored {chunks} chunks for {repository_name} as index version {version}")
+        return version
+    
+    def index_pdf(self, pdf_path: Path, repository_name: str) -> Optional[str]:
+        """
+        Stream a PDF into the index batch by batch of pages, as a new index version
+        
+        Pages are extracted in parallel processes while earlier batches are embedded.
+        Pages whose page_hash matches a page of the active version reuse its chunks and
+        embeddings instead of being re-embedded.
+        
+        Returns:
+            The promoted index version, or None if the PDF has no text
+        """
+        from loaders.pdf_loader import StreamingPDFLoader, iter_batches
+        
+        version = new_build_version()
+        active = None
+        if self.settings.pdf_reuse_unchanged_pages:
+            active = self.vector_store.get_index_versions().get(repository_name, {}).get("active_version")
+        splitter = RepositoryLoader(str(pdf_path), repository_name=repository_name).pdf_splitter
+        loader = StreamingPDFLoader(
+            str(pdf_path),
+            workers=self.settings.pdf_workers,
+            pages_per_task=self.settings.pdf_pages_per_task
+        )
+        file_metadata = {
+            'file_path': pdf_path.name,
+            'file_name': pdf_path.name,
+            'file_type': pdf_path.suffix,
+            'source': str(pdf_path),
+            'repository': repository_name,
+            'index_version': version,
+        }
+        
+        chunk_index = pages_seen = pages_reused = 0
+        for pages in iter_batches(loader.lazy_load(), self.settings.pdf_page_batch_size):
+            reusable = {}
+            if active:
+                reusable = self.vector_store.get_page_chunks(
+                    repository_name, pdf_path.name, active, [page.metadata['page_hash'] for page in pages]
+                )
+            new_chunks: List[Document] = []
+            reused_chunks: List[Document] = []
+            reused_vectors = []
+            for page in pages:
+                page.metadata.update(file_metadata)
+                previous = reusable.get(page.metadata['page_hash'])
+                if previous:
+                    pages_reused += 1
+                    for doc, vector in previous:
+                        doc.metadata.update(
+                            file_metadata,
+                            page=page.metadata['page'],
+                            total_pages=page.metadata['total_pages'],
+                            chunk_index=chunk_index
+                        )
+                        doc.metadata.pop('total_chunks', None)
+                        reused_chunks.append(doc)
+                        reused_vectors.append(vector)
+                        chunk_index += 1
+                else:
+                    for chunk in splitter.split_documents([page]):
+                        chunk.metadata['chunk_index'] = chunk_index
+                        new_chunks.append(chunk)
+                        chunk_index += 1
+            pages_seen += len(pages)
+            
+            self.vector_store.add_embedded_documents(reused_chunks, reused_vectors, persist=False)
+            if new_chunks:
+                self._add_documents(new_chunks, partial(self.vector_store.add_documents, persist=False))
+            logger.info(f"Indexed {pages_seen} pages of {pdf_path.name} ({pages_reused} unchanged, {chunk_index} chunks)")
+        
+        if not chunk_index:
+            return None
+        self.vector_store.save()
+        self._promote(repository_name, version)
+        return version
+    
+    def _promote(self, repository_name: str, version: str):
+        """Make a fully written build live, then garbage-collect older ones"""
+        self.vector_store.promote_index_version(repository_name, version)
+        if self.settings.index_gc_on_promote:
+            try:
+                self.vector_store.gc_index_versions(repository_name, keep_previous=True)
+            except Exception as e:
+                # The new version is already live; stale rows are only wasted space
+                logger.warning(f"Failed to garbage-collect old index versions of {repository_name}: {e}")
+    
+    def _add_documents(self, documents: List[Document], add):
+        """Add documents, in limiter-guarded batches when embedding concurrency is capped"""
+        if self.embedding_limiter is None:
+            add(documents)
+            return
+        for start in range(0, len(documents), self.embedding_batch_size):
+            with self.embedding_limiter:
+                add(documents[start:start + self.embedding_batch_size])
+    
+    def repository_name(self, repository_path: str) -> str:
+        """Stable repository name for metadata and artifacts (URL basename or path name)"""
+        if is_github_url(repository_path):
+            name = repository_path.rstrip("/").split("/")[-1]
+            return name[:-4] if name.endswith(".git") else name
+        return Path(repository_path).resolve().name
+    
+    def _save_artifacts(self, repository_name: str, graph: DependencyGraph, catalogue: EndpointCatalogue):
+        """
+        Persist the dependency graph and endpoint catalogue built while loading
+        
+        Empty ones are saved too, so a re-index that removed every module or route does not
+        leave the previous build's artifacts behind.
+        """
+        self.artifact_store.save(repository_name, DEPENDENCY_GRAPH_ARTIFACT, graph.to_dict())
+        logger.info(f"Saved dependency graph for {repository_name} ({len(graph.modules)} modules)")
+        
+        self.artifact_store.save(repository_name, ENDPOINT_CATALOGUE_ARTIFACT, catalogue.to_dict())
+        logger.info(f"Saved endpoint catalogue for {repository_name} ({len(catalogue.endpoints)} endpoints)")
+    
+    def cleanup_temp_dir(self, temp_dir: Path):
         """Clean up temporary directory"""
         try:
             if temp_dir and temp_dir.exists():
@@ -96,4 +325,3 @@ class RepositoryService:
     def is_indexed(self) -> bool:
         """Check if repository is indexed"""
         return self._is_indexed
-
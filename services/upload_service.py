@@ -0,0 +1,261 @@
+import hashlib
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+
+from utils.artifacts import ArtifactCache, ArtifactStore
+from utils.config import get_settings
+from utils.index_version import get_active_builds
+from utils.logger import get_logger
+
+logger = get_logger()
+
+ARTIFACT_NAME = "upload"
+JOB_ARTIFACT_NAME = "job"
+JOBS_DIR = "jobs"
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """An uploaded file exceeded the configured size limit"""
+
+
+@dataclass
+class StoredUpload:
+    """An upload written to disk, addressed by its content hash"""
+    filename: str
+    sha256: str
+    size: int
+    path: str
+
+
+@dataclass
+class IndexJob:
+    """Asynchronous indexing of one uploaded file"""
+    id: str
+    filename: str
+    sha256: str
+    status: str = "queued"  # queued | running | succeeded | failed
+    error: Optional[str] = None
+    index_version: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, owned by another user
+    return True
+
+
+def safe_filename(filename: str) -> str:
+    """Basename of a client-supplied filename (no directories, never empty)"""
+    name = os.path.basename(filename.replace("\\", "/")).strip().lstrip(".")
+    return name or "upload"
+
+
+class UploadService:
+    """
+    Content-addressed file uploads indexed in the background
+
+    Uploads are copied to disk in chunks while their SHA-256 is computed. A file whose
+    hash is the live index version of its repository is not indexed again; otherwise an
+    indexing job is queued (one per hash at a time) and can be polled by id.
+
+    Job records are written to <upload_dir>/jobs/<id>/job.json on every status change, so
+    any worker process sharing upload_dir can report a job, including after a restart. A
+    queued or running job whose process on this host has exited is reported as failed.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.settings = get_settings()
+        self.root = Path(self.settings.upload_dir)
+        self.artifact_store = ArtifactStore()
+        self._records = ArtifactCache(ARTIFACT_NAME, lambda data: data, self.artifact_store)
+        self._job_store = ArtifactStore(str(self.root / JOBS_DIR))
+        self._owner = {"host": socket.gethostname(), "pid": os.getpid()}
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or self.settings.upload_index_workers,
+            thread_name_prefix="upload-index"
+        )
+        self._jobs: Dict[str, IndexJob] = {}
+        self._futures: Dict[str, Future] = {}
+        self._active_by_hash: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def save(self, stream: BinaryIO, filename: str) -> StoredUpload:
+        """
+        Copy an upload to <upload_dir>/<sha256 prefix>-<random>/<filename> in chunks
+
+        Each upload gets its own directory (named after its hash) so a duplicate can be
+        discarded without touching the copy an in-flight job is indexing.
+
+        Raises:
+            UploadTooLarge: if the file exceeds upload_max_file_mb (nothing is kept)
+        """
+        limit = self.settings.upload_max_file_mb * 1024 * 1024
+        name = safe_filename(filename)
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(COPY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > limit:
+                        raise UploadTooLarge(
+                            f"{name} exceeds the {self.settings.upload_max_file_mb} MB upload limit"
+                        )
+                    digest.update(chunk)
+                    out.write(chunk)
+            sha256 = digest.hexdigest()
+            target = Path(tempfile.mkdtemp(dir=self.root, prefix=f"{sha256[:16]}-")) / name
+            os.replace(tmp_path, target)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return StoredUpload(filename=name, sha256=sha256, size=size, path=str(target))
+
+    def find_indexed(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """Upload record of content that is currently live in the index, if any"""
+        active = get_active_builds()
+        for repository, record in self._records.get().items():
+            if record.get("sha256") == sha256 and active.get(record.get("repository", repository)) == record.get("index_version"):
+                return record
+        return None
+
+    def submit(self, upload: StoredUpload) -> IndexJob:
+        """Queue indexing of a stored upload (joins the in-flight job for the same content)"""
+        with self._lock:
+            job_id = self._active_by_hash.get(upload.sha256)
+            if job_id is not None:
+                self.discard(upload)
+                return self._jobs[job_id]
+            job = IndexJob(id=uuid.uuid4().hex, filename=upload.filename, sha256=upload.sha256)
+            self._jobs[job.id] = job
+            self._active_by_hash[upload.sha256] = job.id
+            self._save_job(job)
+            self._futures[job.id] = self._executor.submit(self._run, job, upload)
+        logger.info(f"Queued indexing job {job.id} for {upload.filename} ({upload.sha256[:12]})")
+        return job
+
+    def wait(self, job_id: str, timeout: Optional[float] = None):
+        """Block until a job has finished (no-op for finished or unknown jobs)"""
+        future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    def get_job(self, job_id: str) -> Optional[IndexJob]:
+        """A job of this process, or one recorded by another worker (or before a restart)"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        try:
+            data = self._job_store.load(job_id, JOB_ARTIFACT_NAME)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read indexing job {job_id}: {e}")
+            return None
+        if data is None:
+            return None
+        owner = data.pop("owner", None) or {}
+        job = IndexJob(**data)
+        if (job.finished_at is None and owner.get("host") == self._owner["host"]
+                and not _process_alive(owner.get("pid", 0))):
+            job.status, job.error = "failed", "Interrupted: the server process running the job exited"
+            job.finished_at = time.time()
+            self._save_job(job)
+        return job
+
+    def job_dict(self, job: IndexJob) -> Dict[str, Any]:
+        with self._lock:
+            return asdict(job)
+
+    def _run(self, job: IndexJob, upload: StoredUpload):
+        from services.repository_service import RepositoryService
+
+        with self._lock:
+            job.status = "running"
+            self._save_job(job)
+        try:
+            # A service per job: RepositoryService keeps per-run state
+            service = RepositoryService()
+            repository = service.repository_name(upload.path)
+            if not service.index_repository(upload.path, cleanup=False):
+                raise RuntimeError("Indexing failed; check server logs for details")
+            version = get_active_builds().get(repository)
+            self.artifact_store.save(repository, ARTIFACT_NAME, {
+                "repository": repository,
+                "filename": upload.filename,
+                "sha256": upload.sha256,
+                "size": upload.size,
+                "index_version": version,
+                "indexed_at": time.time(),
+            })
+            with self._lock:
+                job.status, job.index_version = "succeeded", version
+        except Exception as e:
+            logger.error(f"Indexing job {job.id} for {upload.filename} failed: {e}", exc_info=True)
+            with self._lock:
+                job.status, job.error = "failed", str(e)
+        finally:
+            with self._lock:
+                job.finished_at = time.time()
+                self._active_by_hash.pop(upload.sha256, None)
+                self._futures.pop(job.id, None)
+                self._save_job(job)
+            self.discard(upload)
+            self._prune_jobs()
+
+    def discard(self, upload: StoredUpload):
+        """Remove a stored upload (its hash stays recorded once indexed)"""
+        try:
+            shutil.rmtree(Path(upload.path).parent)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove uploaded file {upload.path}: {e}")
+
+    def _save_job(self, job: IndexJob):
+        """Persist a job record (under the lock for jobs of this process)"""
+        try:
+            self._job_store.save(job.id, JOB_ARTIFACT_NAME, {**asdict(job), "owner": self._owner})
+        except OSError as e:
+            logger.warning(f"Failed to record indexing job {job.id}: {e}")
+
+    def _prune_jobs(self):
+        """Forget finished jobs beyond the most recent upload_job_history (in memory and on disk)"""
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.finished_at is not None),
+                key=lambda job: job.finished_at
+            )
+            for job in finished[:max(0, len(finished) - self.settings.upload_job_history)]:
+                del self._jobs[job.id]
+
+        try:
+            records = self._job_store.load_all(JOB_ARTIFACT_NAME)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to list indexing jobs: {e}")
+            return
+        finished_ids = sorted(
+            (job_id for job_id, data in records.items() if data.get("finished_at") is not None),
+            key=lambda job_id: records[job_id]["finished_at"]
+        )
+        for job_id in finished_ids[:max(0, len(finished_ids) - self.settings.upload_job_history)]:
+            shutil.rmtree(self._job_store.path(job_id, JOB_ARTIFACT_NAME).parent, ignore_errors=True)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Regression test for the incremental JSON parser: values must not depend on where reads end
+"""
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from loaders.structured_loader import JsonStream, iter_json_values
+
+DOCUMENTS = [
+    '[1.5]',
+    '[-0.25e-3, 12.5E+2, 7, -8]',
+    '{"notes": "xxxxxxxx", "price": 12.5, "tax": 1e-2}',
+    '{"a": {"b": [1.25, {"c": 3.5e10}], "d": true, "e": null}, "f": [], "g": {}}',
+    '  {"s": "a \\"quoted\\" 1.5", "n": [0.5, 1.75]}  ',
+]
+
+
+def parse(text: str, read_size: int, stream_depth: int):
+    stream = JsonStream(io.StringIO(text), read_size=read_size)
+    values = list(iter_json_values(stream, stream_depth))
+    stream.end()
+    return values
+
+
+def test_values_do_not_depend_on_read_size():
+    for text in DOCUMENTS:
+        for stream_depth in (0, 1, 2, 3):
+            expected = parse(text, len(text) + 1, stream_depth)
+            for read_size in range(1, len(text) + 1):
+                assert parse(text, read_size, stream_depth) == expected, (text, read_size, stream_depth)
+
+
+def test_number_cut_at_read_boundary():
+    # A read ending right after "12." used to yield 12 and then fail on the leftover ".5"
+    prefix = '{"notes": "' + "x" * 50 + '", "price": 12.'
+    text = prefix + '5}'
+    assert parse(text, len(prefix), stream_depth=1)[-1] == ("$.price", 12.5)
+    assert parse(text, len(prefix), stream_depth=0) == [("$", json.loads(text))]
+
+
+if __name__ == "__main__":
+    test_values_do_not_depend_on_read_size()
+    test_number_cut_at_read_boundary()
+    print("✓ Incremental JSON parsing is independent of read boundaries")
@@ -3,10 +3,40 @@
 
 -- Create match_documents function (required by LangChain SupabaseVectorStore)
 -- Fixed: Using table alias to avoid ambiguous column reference
+-- ef_search (optional) sets hnsw.ef_search for this call; the old 3-argument
+-- version is dropped so calls are not ambiguous
+-- Only rows of each repository's active index version are returned (blue/green builds);
+-- prepare_hnsw_search raises ef_search so the version filter does not starve the results
+CREATE TABLE IF NOT EXISTS repository_index_versions (
+    repository TEXT PRIMARY KEY,
+    active_version TEXT NOT NULL,
+    previous_version TEXT,
+    promoted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION prepare_hnsw_search(candidates int, ef_search int DEFAULT NULL)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  pgvector_version int[] := (SELECT string_to_array(extversion, '.')::int[] FROM pg_extension WHERE extname = 'vector');
+BEGIN
+  PERFORM set_config('hnsw.ef_search', LEAST(1000, GREATEST(
+    COALESCE(ef_search, NULLIF(current_setting('hnsw.ef_search', true), '')::int, 40),
+    2 * candidates
+  ))::text, true);
+  IF pgvector_version >= ARRAY[0, 8] THEN
+    PERFORM set_config('hnsw.iterative_scan', 'strict_order', true);
+  END IF;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS match_documents(vector, int, jsonb);
 CREATE OR REPLACE FUNCTION match_documents(
   query_embedding vector(1536),
   match_count int DEFAULT 5,
-  filter jsonb DEFAULT '{}'::jsonb
+  filter jsonb DEFAULT '{}'::jsonb,
+  ef_search int DEFAULT NULL
 )
 RETURNS TABLE (
   id uuid,
@@ -17,7 +47,11 @@ RETURNS TABLE (
 )
 LANGUAGE plpgsql
 AS $$
+DECLARE
+  active_versions jsonb := (SELECT COALESCE(jsonb_object_agg(v.repository, v.active_version), '{}'::jsonb)
+                            FROM repository_index_versions v);
 BEGIN
+  PERFORM prepare_hnsw_search(match_count, ef_search);
   RETURN QUERY
   SELECT
     re.id,
@@ -28,8 +62,21 @@ BEGIN
   FROM repository_embeddings re
   WHERE 1=1
     AND (filter = '{}'::jsonb OR re.metadata @> filter)
+    AND (active_versions->>(re.metadata->>'repository') = re.metadata->>'index_version'
+         OR (re.metadata->>'index_version' IS NULL
+             AND NOT active_versions ? COALESCE(re.metadata->>'repository', '')))
   ORDER BY re.embedding <=> query_embedding
   LIMIT match_count;
 END;
 $$;
 
+
+-- Hierarchical retrieval (HIERARCHICAL_RETRIEVAL=true): run Step 7 of schema.sql to add
+-- the repository_file_summaries table, match_file_summaries and match_documents_in_files
+
+-- Blue/green index versions: run Step 8 of schema.sql to add promote_index_version,
+-- rollback_index_version, gc_index_versions, repository_index_version_history and the
+-- version indexes (and re-run Step 7's functions if hierarchical retrieval is enabled)
+
+-- Neighbour expansion: run Step 9 of schema.sql to add match_chunks (without it, neighbour
+-- chunks are fetched with one query per file)
@@ -0,0 +1,90 @@
+"""Persistent per-repository index artifacts (JSON files next to the embedding index)"""
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import get_settings
+
+
+def repository_key(name: str) -> str:
+    """Filesystem-safe key for a repository name"""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._") or "default"
+
+
+class ArtifactStore:
+    """Reads and writes JSON artifacts under <index_artifacts_dir>/<repository>/<name>.json"""
+    
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or get_settings().index_artifacts_dir)
+    
+    def path(self, repository: str, name: str) -> Path:
+        return self.root / repository_key(repository) / f"{name}.json"
+    
+    def save(self, repository: str, name: str, data: Any):
+        """Atomically write an artifact"""
+        target = self.path(repository, name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, target)
+    
+    def load(self, repository: str, name: str) -> Optional[Any]:
+        """Read an artifact, or None if it does not exist"""
+        target = self.path(repository, name)
+        if not target.exists():
+            return None
+        with open(target, encoding="utf-8") as f:
+            return json.load(f)
+    
+    def repositories(self) -> List[str]:
+        """Repositories that have at least one artifact"""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+    
+    def load_all(self, name: str) -> Dict[str, Any]:
+        """Load one artifact type for every repository"""
+        artifacts = {}
+        for repository in self.repositories():
+            data = self.load(repository, name)
+            if data is not None:
+                artifacts[repository] = data
+        return artifacts
+    
+    def fingerprint(self, name: str) -> tuple:
+        """Cheap change detector (paths and mtimes) for one artifact type"""
+        if not self.root.exists():
+            return ()
+        return tuple(sorted(
+            (str(p), p.stat().st_mtime_ns)
+            for p in self.root.glob(f"*/{name}.json")
+        ))
+
+
+class ArtifactCache:
+    """In-process view of one artifact type for all repositories, reloaded when the files change"""
+    
+    def __init__(self, name: str, factory: Callable[[Any], Any], store: Optional[ArtifactStore] = None):
+        self.name = name
+        self.factory = factory
+        self.store = store or ArtifactStore()
+        self._items: Dict[str, Any] = {}
+        self._fingerprint: tuple = ()
+        self._lock = threading.Lock()
+    
+    def get(self) -> Dict[str, Any]:
+        """Current objects keyed by repository"""
+        fingerprint = self.store.fingerprint(self.name)
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._items = {
+                    repository: self.factory(data)
+                    for repository, data in self.store.load_all(self.name).items()
+                }
+                self._fingerprint = fingerprint
+            return self._items
@@ -7,15 +7,106 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str
     
-    # Supabase (required)
-    supabase_url: str
-    supabase_key: str
+    # Vector backend: "supabase" (default) or "local" (in-process, for offline use and benchmarks)
+    vector_backend: str = "supabase"
+    local_index_path: Optional[str] = None  # Persist directory for the local backend
+    
+    # Supabase (required for the supabase backend)
+    supabase_url: str = ""
+    supabase_key: str = ""
     supabase_vector_table: str = "repository_embeddings"
+    database_url: Optional[str] = None  # Direct Postgres DSN for maintenance tools and COPY ingest
+    pg_bulk_load_enabled: bool = True  # With DATABASE_URL set, ingest via COPY instead of PostgREST
+    pg_pool_size: int = 4
+    pg_copy_batch_size: int = 1000  # Documents embedded and copied per round trip
+    
+    # Embeddings
+    embedding_provider: str = "openai"  # openai | local (in-process sentence-transformers model)
+    embedding_model: str = "text-embedding-ada-002"  # With the local provider, a sentence-transformers name
+    embedding_dimensions: Optional[int] = None  # text-embedding-3-* or local models; must match the table schema
+    local_embedding_device: str = "cpu"
+    local_embedding_backend: str = "torch"  # torch | onnx
+    local_embedding_batch_size: int = 64  # Texts per encode call
+    local_embedding_workers: int = 2  # Threads encoding document batches concurrently
+    vector_storage: str = "vector"  # vector | halfvec | binary (see scripts/migrate_vector_storage.py)
+    supabase_summary_table: str = "repository_file_summaries"
+    hnsw_ef_search: Optional[int] = None  # Per-query hnsw.ef_search (None keeps the server default of 40)
+    query_embedding_cache_size: int = 1024  # In-memory LRU of query embeddings (0 disables)
+    
+    # Re-ranking
+    rerank_enabled: bool = False
+    rerank_model: str = "lexical"  # "lexical" or a sentence-transformers cross-encoder name
+    rerank_fetch_k: int = 50  # Candidates fetched from the vector store before re-scoring
+    rerank_top_n: Optional[int] = None  # Optional cap on chunks passed to the LLM
+    rerank_lexical_weight: float = 0.5  # Blend of lexical score vs. vector similarity
+    
+    # Adaptive top-k: keep fewer chunks when scores fall off (chain k becomes the upper bound)
+    adaptive_k_enabled: bool = False
+    adaptive_k_min: int = 2  # Always keep at least this many chunks
+    adaptive_k_max: Optional[int] = None  # Upper bound overriding the per-chain k
+    adaptive_k_min_score: Optional[float] = None  # Stop below this vector similarity, e.g. 0.3
+    adaptive_k_knee_factor: Optional[float] = 3.0  # Stop at a drop this many times the average drop (None disables)
+    
+    # Hierarchical (coarse-to-fine) retrieval over file-level summaries
+    hierarchical_retrieval: bool = False  # Also index file/directory summaries; QA searches top files first
+    hierarchical_top_files: int = 8  # Files selected by the coarse stage
+    hierarchical_directory_overviews: int = 2  # Directory summaries added to the QA context
+    
+    # Blue/green index versions: builds are promoted atomically once complete
+    index_gc_on_promote: bool = True  # Delete superseded versions (except the previous one) after each promotion
+    index_gc_abandoned_after_s: int = 86400  # GC also deletes never-promoted builds older than this (0 keeps them)
+    
+    # Index-time artifacts (dependency graph, endpoint catalogue, ...)
+    index_artifacts_dir: str = "data/index_artifacts"
     
     # Application
     log_level: str = "INFO"
     max_chunk_size: int = 1000
     chunk_overlap: int = 200
+    chunk_mode: str = "standard"  # standard (MAX_CHUNK_SIZE/CHUNK_OVERLAP) or small (non-overlapping)
+    small_chunk_size: int = 400  # Chunk size in small mode
+    neighbour_window: Optional[int] = None  # Chunks fetched either side of each hit (None: 1 in small mode, else 0)
+    json_stream_depth: int = 2  # JSON container depth parsed incrementally (values below it are decoded whole)
+    index_batch_size: int = 512  # Chunks embedded and stored together while streaming a repository into the index
+    
+    # Single-file PDF ingestion
+    pdf_streaming: bool = True  # Extract pages in parallel and embed them batch by batch
+    pdf_workers: Optional[int] = None  # Extraction processes (None: one per CPU)
+    pdf_pages_per_task: int = 16  # Pages extracted per worker task
+    pdf_page_batch_size: int = 64  # Pages chunked and embedded together
+    pdf_reuse_unchanged_pages: bool = True  # Copy chunks/embeddings of pages whose page_hash is already indexed
+    
+    # File uploads (POST /index/file)
+    upload_dir: str = "data/uploads"  # Uploads are staged here until their indexing job finishes
+    upload_max_file_mb: int = 200  # Larger files are rejected with 413
+    upload_max_files: int = 10  # Files per request
+    upload_max_request_mb: int = 1024  # Flask MAX_CONTENT_LENGTH (whole request body)
+    upload_index_workers: int = 2  # Background indexing jobs run at once
+    upload_job_history: int = 100  # Finished jobs whose status is kept (in memory and under upload_dir/jobs)
+    
+    # LLM routing
+    llm_model: str = "gpt-4"  # Large model, used directly or as the cascade fallback
+    llm_fast_model: str = "gpt-4o-mini"  # First attempt when llm_routing_mode is "cascade"
+    llm_routing_mode: str = "static"  # static | cascade
+    llm_cascade_min_confidence: float = 0.7
+    qa_model: Optional[str] = None
+    validation_model: Optional[str] = None
+    impact_model: Optional[str] = None
+    decision_model: Optional[str] = None
+    
+    # Persistent LLM response cache (SQLite), keyed by model, rendered prompt and index version
+    llm_cache_enabled: bool = False
+    llm_cache_path: str = "data/llm_cache.sqlite3"
+    llm_cache_ttl_s: int = 86400  # 0 disables expiry
+    llm_cache_max_entries: int = 10000
+    index_version_ttl_s: float = 5.0  # Supabase: how often the cache key re-reads repository_index_versions
+    
+    # Concurrent identical /question, /validate, /impact and /analyze requests share one computation
+    request_coalescing_enabled: bool = True
+    
+    # Decision fast path: comma-separated rules evaluated before the LLM decision call
+    decision_rules_enabled: bool = True
+    decision_rules: str = "invalid_request,critical_breaking_changes,no_impact"
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,74 @@
+"""Direct Postgres access for maintenance tools and bulk ingest (optional psycopg dependency)"""
+from typing import Iterable, Optional
+
+from .config import get_settings
+
+
+def get_pg_connection(dsn: Optional[str] = None, autocommit: bool = True):
+    """
+    Open a psycopg connection to the Supabase Postgres database
+    
+    Args:
+        dsn: Connection string; defaults to DATABASE_URL from settings
+        autocommit: Whether statements commit immediately
+    """
+    try:
+        import psycopg
+    except ImportError as e:
+        raise ImportError(
+            "psycopg is required for direct database access. "
+            "Install it with: pip install 'psycopg[binary]'"
+        ) from e
+    
+    return psycopg.connect(_resolve_dsn(dsn), autocommit=autocommit)
+
+
+def get_pg_pool(dsn: Optional[str] = None, min_size: int = 1, max_size: int = 4):
+    """
+    Open a psycopg connection pool (autocommit connections with pgvector adapters registered)
+    
+    Args:
+        dsn: Connection string; defaults to DATABASE_URL from settings
+        min_size: Connections kept open
+        max_size: Upper bound on concurrent connections
+    """
+    try:
+        from psycopg_pool import ConnectionPool
+    except ImportError as e:
+        raise ImportError(
+            "psycopg_pool is required for pooled database access. "
+            "Install it with: pip install 'psycopg[binary,pool]'"
+        ) from e
+    return ConnectionPool(
+        _resolve_dsn(dsn),
+        min_size=min_size,
+        max_size=max_size,
+        kwargs={"autocommit": True},
+        configure=register_vector_types,
+        open=True
+    )
+
+
+def register_vector_types(conn) -> bool:
+    """Register pgvector's psycopg adapters (enables binary COPY of vectors) if installed"""
+    try:
+        from pgvector.psycopg import register_vector
+    except ImportError:
+        return False
+    register_vector(conn)
+    return True
+
+
+def _resolve_dsn(dsn: Optional[str]) -> str:
+    dsn = dsn or get_settings().database_url
+    if not dsn:
+        raise ValueError(
+            "DATABASE_URL is required for direct database access. "
+            "Use the Postgres connection string from Supabase project settings."
+        )
+    return dsn
+
+
+def vector_literal(values: Iterable[float]) -> str:
+    """pgvector text representation of an embedding"""
+    return "[" + ",".join(repr(float(v)) for v in values) + "]"
@@ -3,19 +3,25 @@ import tempfile
 import shutil
 from pathlib import Path
 from typing import Optional
-from git import Repo
 from utils.logger import get_logger
 
 logger = get_logger()
 
 
-def clone_github_repo(github_url: str, target_dir: Optional[str] = None) -> Path:
+def clone_github_repo(
+    github_url: str,
+    target_dir: Optional[str] = None,
+    branch: Optional[str] = None,
+    depth: Optional[int] = None
+) -> Path:
     """
     Clone a GitHub repository to a temporary or specified directory
     
     Args:
         github_url: GitHub repository URL (e.g., https://github.com/user/repo.git)
         target_dir: Optional target directory. If None, uses a temp directory.
+        branch: Optional branch or tag to check out
+        depth: Optional shallow clone depth
     
     Returns:
         Path to the cloned repository
@@ -44,7 +50,13 @@ def clone_github_repo(github_url: str, target_dir: Optional[str] = None) -> Path
         logger.info(f"Cloning {repo_url} to {target_path}")
         
         # Clone the repository
-        Repo.clone_from(repo_url, str(target_path))
+        clone_options = {}
+        if branch:
+            clone_options["branch"] = branch
+        if depth:
+            clone_options["depth"] = depth
+        from git import Repo  # GitPython is slow to import; only needed when cloning
+        Repo.clone_from(repo_url, str(target_path), **clone_options)
         
         logger.info(f"Successfully cloned repository to {target_path}")
         return target_path
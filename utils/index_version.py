@@ -0,0 +1,184 @@
+"""
+Index version tokens used to key caches on the state of the embedding index
+
+The token covers the local artifacts (shared by every process using the same
+INDEX_ARTIFACTS_DIR) and, with the Supabase backend, the repository_index_versions table,
+re-read at most every INDEX_VERSION_TTL_S seconds so promotions made by other hosts are seen.
+
+Also the local record of blue/green builds: each repository's artifact keeps the active
+and previous build versions (authoritative for the local backend; mirrors
+repository_index_versions for Supabase).
+"""
+import hashlib
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from .artifacts import ArtifactCache, ArtifactStore
+from .config import get_settings
+from .logger import get_logger
+
+logger = get_logger()
+
+ARTIFACT_NAME = "index_version"
+
+_cache: Optional[ArtifactCache] = None
+
+_remote_lock = threading.Lock()
+_remote_client = None
+_remote_token: Optional[str] = None
+_remote_checked_at = 0.0
+
+
+def _get_cache() -> ArtifactCache:
+    global _cache
+    if _cache is None:
+        _cache = ArtifactCache(ARTIFACT_NAME, lambda data: data)
+    return _cache
+
+
+BUILD_VERSION_FORMAT = "%Y%m%dT%H%M%S"
+_BUILD_VERSION = re.compile(r"^\d{8}T\d{6}-")
+
+
+def new_build_version() -> str:
+    """Time-ordered id for a new index build (later builds sort after earlier ones)"""
+    return time.strftime(BUILD_VERSION_FORMAT, time.gmtime()) + "-" + uuid.uuid4().hex[:8]
+
+
+def build_started_before(version: str, timestamp: float) -> bool:
+    """Whether a new_build_version() id was created before a Unix timestamp"""
+    return bool(_BUILD_VERSION.match(version)) and version < time.strftime(BUILD_VERSION_FORMAT, time.gmtime(timestamp))
+
+
+def bump_index_version(repository: str, store: Optional[ArtifactStore] = None) -> str:
+    """Record that a repository's index content changed; returns the new version"""
+    store = store or ArtifactStore()
+    version = uuid.uuid4().hex
+    store.save(repository, ARTIFACT_NAME, {
+        **(store.load(repository, ARTIFACT_NAME) or {}),
+        "repository": repository,
+        "version": version,
+        "updated_at": time.time(),
+    })
+    return version
+
+
+def record_active_build(repository: str, build: str, store: Optional[ArtifactStore] = None) -> Optional[str]:
+    """Point a repository at a promoted build; returns the build it replaced"""
+    store = store or ArtifactStore()
+    current = store.load(repository, ARTIFACT_NAME) or {}
+    previous = current.get("active_build")
+    store.save(repository, ARTIFACT_NAME, {
+        "repository": repository,
+        "version": build,
+        "updated_at": time.time(),
+        "active_build": build,
+        "previous_build": previous if previous != build else current.get("previous_build"),
+        "promoted_builds": sorted({*_promoted_builds(current), build}),
+    })
+    return previous
+
+
+def _promoted_builds(record: Dict) -> List[str]:
+    """Builds a repository has ever promoted (records from before the list: active and previous)"""
+    if "promoted_builds" in record:
+        return list(record["promoted_builds"])
+    return [build for build in (record.get("active_build"), record.get("previous_build")) if build]
+
+
+def forget_promoted_builds(repository: str, builds: List[str], store: Optional[ArtifactStore] = None):
+    """Drop garbage-collected builds from a repository's promotion history"""
+    store = store or ArtifactStore()
+    current = store.load(repository, ARTIFACT_NAME) or {}
+    if not current:
+        return
+    store.save(repository, ARTIFACT_NAME, {
+        **current,
+        "promoted_builds": [build for build in _promoted_builds(current) if build not in builds],
+    })
+
+
+def rollback_active_build(repository: str, store: Optional[ArtifactStore] = None) -> Optional[str]:
+    """Swap the active and previous builds; returns the now-active build (None if there is none)"""
+    store = store or ArtifactStore()
+    current = store.load(repository, ARTIFACT_NAME) or {}
+    if not current.get("previous_build"):
+        return None
+    store.save(repository, ARTIFACT_NAME, {
+        **current,
+        "version": current["previous_build"],
+        "updated_at": time.time(),
+        "active_build": current["previous_build"],
+        "previous_build": current.get("active_build"),
+    })
+    return current["previous_build"]
+
+
+def get_index_builds() -> Dict[str, Dict[str, Any]]:
+    """Active, previous and all promoted builds per repository that has promoted a versioned build"""
+    return {
+        data.get("repository", key): {
+            "active_build": data["active_build"],
+            "previous_build": data.get("previous_build"),
+            "promoted_builds": _promoted_builds(data),
+        }
+        for key, data in _get_cache().get().items()
+        if data.get("active_build")
+    }
+
+
+def get_active_builds() -> Dict[str, str]:
+    """Active build version per repository"""
+    return {repository: builds["active_build"] for repository, builds in get_index_builds().items()}
+
+
+def _remote_version_token() -> Optional[str]:
+    """Digest of repository_index_versions (Supabase backend only), cached for INDEX_VERSION_TTL_S"""
+    global _remote_client, _remote_token, _remote_checked_at
+    settings = get_settings()
+    if settings.vector_backend != "supabase" or not settings.supabase_url or not settings.supabase_key:
+        return None
+    with _remote_lock:
+        now = time.monotonic()
+        if _remote_token is not None and now - _remote_checked_at < settings.index_version_ttl_s:
+            return _remote_token
+        _remote_checked_at = now
+        try:
+            if _remote_client is None:
+                from supabase import create_client
+                _remote_client = create_client(settings.supabase_url, settings.supabase_key)
+            rows = _remote_client.table("repository_index_versions").select(
+                "repository,active_version,promoted_at"
+            ).execute().data or []
+        except Exception as e:
+            # Keep the last known token until the next check rather than failing the request
+            logger.warning(f"Could not read repository_index_versions: {e}")
+            _remote_token = _remote_token or "unavailable"
+            return _remote_token
+        digest = hashlib.sha256()
+        for row in sorted(rows, key=lambda row: row["repository"]):
+            digest.update(f"{row['repository']}={row['active_version']}@{row.get('promoted_at')};".encode("utf-8"))
+        _remote_token = digest.hexdigest()[:16]
+        return _remote_token
+
+
+def get_index_version() -> str:
+    """
+    Token that changes whenever any repository is re-indexed or a build is promoted
+
+    With the Supabase backend a promotion made by another host is seen within
+    INDEX_VERSION_TTL_S seconds; until then cached LLM answers may come from the old build.
+    """
+    versions = _get_cache().get()
+    remote = _remote_version_token()
+    if not versions and remote is None:
+        return "empty"
+    digest = hashlib.sha256()
+    for repository in sorted(versions):
+        digest.update(f"{repository}={versions[repository].get('version', '')};".encode("utf-8"))
+    if remote is not None:
+        digest.update(f"remote={remote}".encode("utf-8"))
+    return digest.hexdigest()[:16]
@@ -0,0 +1,178 @@
+"""In-process metrics with Prometheus text exposition and per-request timing breakdowns"""
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_request_timings: contextvars.ContextVar[Optional[Dict[str, Dict[str, float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by name and label set"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Dict[str, object]]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None, help: str = ""):
+        """Increment a counter"""
+        with self._lock:
+            if help:
+                self._help.setdefault(name, help)
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None, help: str = ""):
+        """Record a histogram observation"""
+        with self._lock:
+            if help:
+                self._help.setdefault(name, help)
+            series = self._histograms.setdefault(name, {})
+            key = _label_key(labels)
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist["buckets"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def get_counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        """Current value of a counter series"""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(series.items()):
+                    for bound, count in zip(self.buckets, hist["buckets"]):
+                        lines.append(f"{name}_bucket{_format_labels(key, {'le': str(bound)})} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, {'le': '+Inf'})} {hist['count']}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist['sum']}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist['count']}")
+
+            # Derived cache hit ratios for dashboards that cannot compute rates
+            cache_series = self._counters.get("cache_requests_total", {})
+            ratios: Dict[str, Dict[str, float]] = {}
+            for key, value in cache_series.items():
+                labels = dict(key)
+                bucket = ratios.setdefault(labels.get("cache", ""), {"hit": 0.0, "miss": 0.0})
+                bucket[labels.get("result", "miss")] = bucket.get(labels.get("result", "miss"), 0.0) + value
+            if ratios:
+                lines.append("# TYPE cache_hit_ratio gauge")
+                for cache, counts in sorted(ratios.items()):
+                    total = counts["hit"] + counts["miss"]
+                    ratio = counts["hit"] / total if total else 0.0
+                    lines.append(f"cache_hit_ratio{_format_labels((('cache', cache),))} {ratio:.4f}")
+
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    return _registry
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    """
+    Time a hot-path stage
+
+    Records stage_duration_seconds{stage}, counts failures in stage_errors_total{stage}
+    and adds the duration to the current request's timing breakdown, if one is active.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        _registry.inc("stage_errors_total", labels={"stage": stage}, help="Errors raised per stage")
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _registry.observe("stage_duration_seconds", elapsed, labels={"stage": stage}, help="Stage latency")
+        timings = _request_timings.get()
+        if timings is not None:
+            entry = timings.setdefault(stage, {"ms": 0.0, "calls": 0})
+            entry["ms"] = round(entry["ms"] + elapsed * 1000, 3)
+            entry["calls"] += 1
+
+
+def timed(stage: str):
+    """Decorator form of observe_stage"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with observe_stage(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup"""
+    _registry.inc(
+        "cache_requests_total",
+        labels={"cache": cache, "result": "hit" if hit else "miss"},
+        help="Cache lookups by result"
+    )
+
+
+def record_tokens(chain: str, model: str, prompt_tokens: int, completion_tokens: int):
+    """Count LLM tokens"""
+    _registry.inc("llm_tokens_total", prompt_tokens, {"chain": chain, "model": model, "type": "prompt"}, help="LLM tokens")
+    _registry.inc("llm_tokens_total", completion_tokens, {"chain": chain, "model": model, "type": "completion"})
+
+
+@contextmanager
+def request_timings() -> Iterator[Dict[str, Dict[str, float]]]:
+    """Collect a per-request stage timing breakdown for the duration of the block"""
+    timings: Dict[str, Dict[str, float]] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
@@ -0,0 +1,87 @@
+"""Single-flight execution: concurrent calls with the same key share one computation"""
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+from .metrics import get_metrics, observe_stage
+
+T = TypeVar("T")
+
+
+def make_flight_key(*parts: Any) -> str:
+    """Stable hash of JSON-serialisable key parts"""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """One in-flight computation"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key
+
+    The first caller (the leader) runs the function; callers arriving while it is in
+    flight wait and receive the same result or exception. Nothing is cached: once the
+    leader finishes, the next call with that key runs again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Run fn once per concurrent key; returns (result, whether this caller ran it)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+
+        if not leader:
+            get_metrics().inc(
+                "coalesced_requests_total",
+                labels={"group": self.name},
+                help="Requests served by an identical in-flight computation"
+            )
+            with observe_stage(f"{self.name}.coalesced_wait"):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Executions, coalesced callers and currently in-flight keys"""
+        with self._lock:
+            requests = self._executions + self._coalesced
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+                "coalesced_ratio": round(self._coalesced / requests, 3) if requests else 0.0,
+            }